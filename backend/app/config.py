@@ -3,6 +3,35 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def safe_int_env(var_name: str, default: int) -> int:
+    val = os.getenv(var_name)
+    try:
+        return int(val) if val is not None else default
+    except ValueError:
+        return default
+
+
+def safe_float_env(var_name: str, default: float) -> float:
+    val = os.getenv(var_name)
+    try:
+        return float(val) if val is not None else default
+    except ValueError:
+        return default
+
+
+def parse_float_map(raw: str) -> dict:
+    """"resume=1,code=0.8" -> {"resume": 1.0, "code": 0.8}; malformed entries are skipped"""
+    values = {}
+    for part in raw.split(","):
+        name, _, value = part.partition("=")
+        try:
+            values[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return values
+
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 SENDER_EMAIL = os.getenv("SENDER_EMAIL", "")
 APP_PASSWORD = os.getenv("APP_PASSWORD", "")
@@ -10,3 +39,11 @@ APP_PASSWORD = os.getenv("APP_PASSWORD", "")
 # Vectorstore split sizes
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+# Document grading: "batch" (one LLM call for all documents), "concurrent"
+# (one call per document, fanned out) or "serial" (one call at a time)
+GRADING_MODE = os.getenv("GRADING_MODE", "batch")
+GRADING_MAX_CONCURRENCY = int(os.getenv("GRADING_MAX_CONCURRENCY", "4"))
+# Documents below this cosine similarity to the question are dropped before
+# any LLM call; 0 disables the pre-filter
+GRADING_PREFILTER_MIN_SIMILARITY = float(os.getenv("GRADING_PREFILTER_MIN_SIMILARITY", "0"))
@@ -1,5 +1,6 @@
 from app.utils.vectorstore import load_vectorstore
 from app.workflow import build_workflow
+from app.utils.tracing import span
 
 def run_app():
     retriever = load_vectorstore()
@@ -9,7 +10,8 @@ def run_app():
     app = build_workflow(retriever)
     user_question = "how is candidate's profile and also list its credentials?"
     inputs = {"question": user_question}
-    for output in app.stream(inputs):
-        for key, value in output.items():
-            if key == "generate":
-                print(f"Final Answer: {value.get('solution')}")
+    with span("workflow.request"):
+        for output in app.stream(inputs):
+            for key, value in output.items():
+                if key == "generate":
+                    print(f"Final Answer: {value.get('solution')}")
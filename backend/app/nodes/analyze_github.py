@@ -1,4 +1,5 @@
 from app.services.github_service import fetch_and_analyze_github
+from app.utils.tracing import current_span
 
 def analyze_github_node(state):
     github_url = state.get("github") or state.get("linkedin") or ""
@@ -7,5 +8,6 @@ def analyze_github_node(state):
         return {**state, "projects": []}
     username = github_url.rstrip("/").split("/")[-1]
     projects = fetch_and_analyze_github(username)
+    current_span().set(repositories=len(projects))
     print("✅ Extracted Projects:", [p.get("repo") for p in projects])
     return {**state, "projects": projects}
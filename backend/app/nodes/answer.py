@@ -1,8 +1,8 @@
-from langchain_groq import ChatGroq
+from app.services.groq_pool import get_llm
 from langchain_core.output_parsers import StrOutputParser
 from app.utils.prompts import resume_answer_prompt
 
-llm = ChatGroq(temperature=0, model_name="gemma2-9b-it")
+llm = get_llm(model="gemma2-9b-it", temperature=0)
 rag_chain = resume_answer_prompt | llm | StrOutputParser()
 
 def generate_answer(state):
@@ -1,35 +1,53 @@
-from app.utils.prompts import contact_prompt, cgpa_prompt
-from langchain_groq import ChatGroq
-from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+import json
+from app.utils.prompts import missing_details_prompt
+from app.utils.extractors import extract_resume_fields, CONTACT_FIELDS, NOT_MENTIONED
+from app.services.groq_pool import get_llm
+from app.utils.tracing import current_span
+from langchain_core.output_parsers import JsonOutputParser
 
-llm = ChatGroq(temperature=0, model_name="gemma2-9b-it")
+llm = get_llm(model="gemma2-9b-it", temperature=0)
 
-def extract_contact_details(state):
-    print("---EXTRACTING CONTACT DETAILS---")
-    documents = state.get("documents", [])
-    resume_text = "\n".join(documents)
-    extractor_chain = contact_prompt | llm | JsonOutputParser()
+
+def _to_cgpa(value) -> float:
     try:
-        extracted = extractor_chain.invoke({"resume": resume_text})
-    except Exception as e:
-        print("contact extraction error", e)
-        extracted = {}
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def extract_resume_details(state):
+    """
+    Extracts contact details and the UG CGPA in one pass.
+    Regex patterns settle what they can; the LLM is called once, and only
+    for fields that are still missing or ambiguous.
+    """
+    print("---EXTRACTING RESUME DETAILS---")
+    resume_text = "\n".join(state.get("documents", []))
+    result = extract_resume_fields(resume_text)
+    fields, unresolved = result["fields"], result["unresolved"]
+    current_span().set(llm_fields=list(unresolved))
+
+    if unresolved:
+        print(f"---ASKING LLM FOR: {', '.join(unresolved)}---")
+        extractor_chain = missing_details_prompt | llm | JsonOutputParser()
+        try:
+            extracted = extractor_chain.invoke({
+                "fields": ", ".join(unresolved),
+                "candidates": json.dumps(unresolved),
+                "resume": resume_text,
+            })
+        except Exception as e:
+            print("details extraction error", e)
+            extracted = {}
+        for field in unresolved:
+            if field in extracted:
+                fields[field] = extracted[field]
+    else:
+        print("---ALL DETAILS FOUND BY PATTERN — NO LLM CALL---")
+
     return {
         **state,
-        "phone_number": extracted.get("phone_number", "Not mentioned"),
-        "email_id": extracted.get("email_id", "Not mentioned"),
-        "linkedin": extracted.get("linkedin", "Not mentioned"),
-        "github": extracted.get("github", "Not mentioned"),
-        "other_links": extracted.get("other_links", []),
+        **{field: fields.get(field, NOT_MENTIONED) for field in CONTACT_FIELDS},
+        "other_links": fields.get("other_links", []),
+        "ug_cgpa": _to_cgpa(fields.get("ug_cgpa", 0)),
     }
-
-def extract_ug_cgpa(state):
-    print("---EXTRACTING UG CGPA---")
-    resume_text = "\n".join(state.get("documents", []))
-    extractor_chain = cgpa_prompt | llm | StrOutputParser()
-    try:
-        cgpa_str = extractor_chain.invoke({"resume": resume_text})
-        cgpa_val = float(cgpa_str.strip())
-    except Exception:
-        cgpa_val = 0.0
-    return {**state, "ug_cgpa": cgpa_val}
@@ -1,22 +1,95 @@
-from app.utils.prompts import grading_prompt
-from langchain_groq import ChatGroq
-from langchain_core.output_parsers import StrOutputParser
+import math
+from app import config
+from app.utils.prompts import grading_prompt, batch_grading_prompt
+from app.services.groq_pool import get_llm
+from app.utils.tracing import current_span
+from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 
-grading_llm = ChatGroq(temperature=0, model_name="gemma2-9b-it")
+grading_llm = get_llm(model="gemma2-9b-it", temperature=0)
 grader = grading_prompt | grading_llm | StrOutputParser()
+batch_grader = batch_grading_prompt | grading_llm | JsonOutputParser()
 
-def grade_documents(state):
-    print("---CHECKING DOCUMENT RELEVANCE---")
-    question = state.get("question", "")
-    documents = state.get("documents", [])
+
+def _is_relevant(score) -> bool:
+    return "yes" in str(score).lower()
+
+
+def _prefilter(question, documents):
+    """Drops documents whose embedding is clearly unrelated to the question."""
+    threshold = config.GRADING_PREFILTER_MIN_SIMILARITY
+    if threshold <= 0 or not documents:
+        return documents
+    from app.services.embedding_service import get_embedding_model
+
+    embeddings = get_embedding_model()
+    q = embeddings.embed_query(question)
+    q_norm = math.sqrt(sum(x * x for x in q)) or 1.0
+    kept = []
+    for d, vec in zip(documents, embeddings.embed_documents(documents)):
+        d_norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+        if sum(a * b for a, b in zip(q, vec)) / (q_norm * d_norm) >= threshold:
+            kept.append(d)
+    if len(kept) < len(documents):
+        print(f"---PRE-FILTER DROPPED {len(documents) - len(kept)} DOCUMENT(S)---")
+    return kept
+
+
+def _grade_serial(question, documents):
     relevant_docs = []
     for d in documents:
         try:
             score = grader.invoke({"question": question, "document": d})
-            if "yes" in score.lower():
+            if _is_relevant(score):
                 relevant_docs.append(d)
         except Exception as e:
             print("grading error", e)
+    return relevant_docs
+
+
+def _grade_concurrent(question, documents):
+    scores = grader.batch(
+        [{"question": question, "document": d} for d in documents],
+        config={"max_concurrency": config.GRADING_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    relevant_docs = []
+    for d, score in zip(documents, scores):
+        if isinstance(score, Exception):
+            print("grading error", score)
+        elif _is_relevant(score):
+            relevant_docs.append(d)
+    return relevant_docs
+
+
+def _grade_batched(question, documents):
+    numbered = "\n\n".join(f"[{i + 1}] {d}" for i, d in enumerate(documents))
+    try:
+        verdicts = batch_grader.invoke({"question": question, "documents": numbered})
+        if not isinstance(verdicts, list) or len(verdicts) != len(documents):
+            raise ValueError(f"expected {len(documents)} verdicts, got {verdicts!r}")
+    except Exception as e:
+        # Fall back to per-document calls so a bad batch answer never changes the outcome
+        print("batch grading error, grading per document:", e)
+        return _grade_concurrent(question, documents)
+    return [d for d, verdict in zip(documents, verdicts) if _is_relevant(verdict)]
+
+
+GRADERS = {
+    "serial": _grade_serial,
+    "concurrent": _grade_concurrent,
+    "batch": _grade_batched,
+}
+
+
+def grade_documents(state):
+    print("---CHECKING DOCUMENT RELEVANCE---")
+    question = state.get("question", "")
+    documents = _prefilter(question, state.get("documents", []))
+    relevant_docs = []
+    if documents:
+        relevant_docs = GRADERS.get(config.GRADING_MODE, _grade_batched)(question, documents)
+    current_span().set(mode=config.GRADING_MODE, documents=len(state.get("documents", [])),
+                       after_prefilter=len(documents), relevant=len(relevant_docs))
     if not relevant_docs:
         print("---NO RELEVANT DOCUMENTS FOUND — RETRYING RETRIEVAL---")
         return {**state, "route": "retrieve"}
@@ -1,3 +1,6 @@
+from app.utils.tracing import current_span
+
+
 def retrieve_docs(state, retriever):
     print("---RETRIEVING DOCUMENTS---")
     question = state.get("question", "")
@@ -5,4 +8,5 @@ def retrieve_docs(state, retriever):
         return {**state, "documents": []}
     documents = [doc.page_content for doc in retriever.invoke(question)]
     print(f"Retrieved {len(documents)} documents.")
+    current_span().set(documents=len(documents))
     return {**state, "documents": documents}
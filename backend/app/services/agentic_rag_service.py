@@ -1,16 +1,34 @@
 import os
-import random
-import faiss
 import json
-import pickle
 import re
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_groq import ChatGroq
+import time
+import asyncio
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from langchain_core.documents import Document
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from qualification_service import send_email_gmail
+from .qualification_service import send_email_gmail
+from .embedding_service import UNIFIED_DIR, UNIFIED_INDEX, get_embedding_model
+from .bm25_index import get_bm25
+from .index_manager import index_manager, resolve_index_base
+from .intent_router import ROUTER_CONFIDENCE_THRESHOLD, get_intent_router
+from .semantic_cache import semantic_cache
+from .groq_pool import get_llm
+from .context_packer import format_context, log_context, pack_context
+from ..utils.tracing import current_span, span, traced
+from ..config import parse_float_map
+
+# Off-request work (cache writes) so it never delays the response
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-background")
+
+# Event loop the sync entry point runs the async pipeline on, started on first use
+_pipeline_loop = None
+_pipeline_loop_lock = threading.Lock()
 
 # def send_meeting_email(to_email: str, subject: str, body: str):
 #     """
@@ -41,20 +59,6 @@ from qualification_service import send_email_gmail
 
 
 
-# ================================================================
-# Helper: Random LLM selector
-# ================================================================
-def get_random_llm(model="openai/gpt-oss-120b", temperature=0.7):
-    api_keys = [
-        os.getenv("GROQ_API_KEY_1"),
-        os.getenv("GROQ_API_KEY_2"),
-        os.getenv("GROQ_API_KEY_3"),
-        os.getenv("GROQ_API_KEY_4"),
-        os.getenv("GROQ_API_KEY_5"),
-    ]
-    key = random.choice([k for k in api_keys if k])
-    return ChatGroq(api_key=key, model=model, temperature=temperature)
-
 def load_user_resume_json(json_path: str):
     """
     Loads user's raw resume JSON and converts it into readable text for LLM.
@@ -88,78 +92,29 @@ def load_user_resume_json(json_path: str):
     return "\n".join(sections)
 
 
-def load_flat_faiss(index_base_path: str, embeddings):
-    """
-    Load FAISS index when stored as flat files:
-    <index_base_path>.faiss + <index_base_path>.pkl
-
-    Supports multiple legacy and modern formats.
-    """
-    faiss_path = index_base_path + ".faiss"
-    pkl_path = index_base_path + ".pkl"
-
-    if not (os.path.exists(faiss_path) and os.path.exists(pkl_path)):
-        raise FileNotFoundError(f"Missing FAISS files: {faiss_path} or {pkl_path}")
-
-    print(f"✅ Loading FAISS from flat files: {faiss_path}")
-    index = faiss.read_index(faiss_path)
-
-    with open(pkl_path, "rb") as f:
-        data = pickle.load(f)
-
-    # --- Handle different saved formats ---
-    docstore = None
-    index_to_docstore_id = None
-
-    # Case 1: Dict-based (modern)
-    if isinstance(data, dict):
-        docstore = data.get("docstore")
-        index_to_docstore_id = data.get("index_to_docstore_id")
-
-    # Case 2: Tuple (older LC versions)
-    elif isinstance(data, tuple):
-        for item in data:
-            from langchain_community.docstore.in_memory import InMemoryDocstore
-            if isinstance(item, InMemoryDocstore):
-                docstore = item
-            elif isinstance(item, dict):
-                index_to_docstore_id = item
-        if not index_to_docstore_id:
-            # fallback: use numeric mapping
-            index_to_docstore_id = {i: str(i) for i in range(index.ntotal)}
-
-    else:
-        raise ValueError(f"Unexpected FAISS pickle format: {type(data)}")
-
-    # --- Safety net ---
-    if not docstore:
-        from langchain_community.docstore.in_memory import InMemoryDocstore
-        docstore = InMemoryDocstore()
-
-    if not index_to_docstore_id:
-        index_to_docstore_id = {i: str(i) for i in range(index.ntotal)}
-
-    # --- Build FAISS object ---
-    db = FAISS(
-        embedding_function=embeddings,
-        index=index,
-        docstore=docstore,
-        index_to_docstore_id=index_to_docstore_id
-    )
-
-    print(f"✅ Successfully reconstructed FAISS store — {index.ntotal} vectors loaded.")
-    return db
-
-
 # ================================================================
 # 1️⃣ ROUTER AGENT  (LLM-A)
 # ================================================================
-def route_query(user_query: str) -> str:
+@traced("rag.route")
+def route_query(user_query: str, query_vector=None) -> str:
     """
-    Decide which knowledge base to use: resume / project / both
+    Decide which knowledge base to use: resume / project / both / meeting.
+    The local embedding router answers when it is confident enough;
+    otherwise the LLM router decides.
     """
-    llm = get_random_llm(temperature=0.3)
-    prompt = f"""
+    route, confidence = get_intent_router().classify(user_query, query_vector)
+    current_span().set(local_route=route, confidence=round(confidence, 4),
+                       llm_fallback=confidence < ROUTER_CONFIDENCE_THRESHOLD)
+    if confidence >= ROUTER_CONFIDENCE_THRESHOLD:
+        print(f"🧭 Local router: {route} (confidence {confidence:.2f})")
+        return route
+
+    print(f"🧭 Local router unsure ({route}, {confidence:.2f}) — asking LLM router")
+    return route_query_llm(user_query)
+
+
+def build_route_prompt(user_query: str) -> str:
+    return f"""
     You are a routing AI deciding which knowledge base best answers the user's query.
 
     Knowledge bases available:
@@ -171,8 +126,10 @@ def route_query(user_query: str) -> str:
 
     Reply with only one word: resume, project,both or meeting.
     """
-    resp = llm.invoke(prompt)
-    answer = getattr(resp, "content", str(resp)).strip().lower()
+
+
+def parse_route(text: str) -> str:
+    answer = text.strip().lower()
 
     if "project" in answer and "resume" in answer:
         return "both"
@@ -184,52 +141,305 @@ def route_query(user_query: str) -> str:
         return "resume"
 
 
-def retrieve_answer(user_query: str, source: str) -> str:
+def route_query_llm(user_query: str) -> str:
     """
-    Retrieves context and generates response from flat FAISS indexes.
+    Decide which knowledge base to use: resume / project / both
     """
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    llm = ChatGroq(api_key=os.getenv("GROQ_API_KEY_1"), model="openai/gpt-oss-120b", temperature=0.6)
+    llm = get_llm(temperature=0.3)
+    resp = llm.invoke(build_route_prompt(user_query))
+    return parse_route(getattr(resp, "content", str(resp)))
+
+
+async def route_query_llm_async(user_query: str) -> str:
+    llm = get_llm(temperature=0.3)
+    resp = await llm.ainvoke(build_route_prompt(user_query))
+    return parse_route(getattr(resp, "content", str(resp)))
+
+
+@traced("rag.route")
+async def route_query_async(user_query: str, query_vector=None) -> str:
+    """Async `route_query`: only the LLM fallback is awaited, the local router is instant."""
+    route, confidence = get_intent_router().classify(user_query, query_vector)
+    current_span().set(local_route=route, confidence=round(confidence, 4),
+                       llm_fallback=confidence < ROUTER_CONFIDENCE_THRESHOLD)
+    if confidence >= ROUTER_CONFIDENCE_THRESHOLD:
+        print(f"🧭 Local router: {route} (confidence {confidence:.2f})")
+        return route
+
+    print(f"🧭 Local router unsure ({route}, {confidence:.2f}) — asking LLM router")
+    return await route_query_llm_async(user_query)
+
+
+def get_answer_llm():
+    return get_llm(temperature=0.6)
+
+
+# Candidates taken from each index; the context packer picks what fits the budget
+SEARCH_K = {"resume": 12, "project": 8}
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")  # "hybrid" | "dense" | "bm25"
+RRF_K = 60  # reciprocal rank fusion constant
+
+# Recent per-leg retrieval latencies (seconds), keyed "<kind>.<leg>"
+retrieval_latency = {}
 
-    # --- Your actual paths ---
+# Indexes searched for each route when there is no unified index
+SOURCE_INDEXES = {
+    "resume": ("resume",),
+    "project": ("project",),
+    "both": ("resume", "project"),
+}
+
+# Sources of the unified index each route may draw from
+ROUTE_SOURCES = {
+    "resume": ("resume",),
+    "project": ("project", "code"),
+    "both": ("resume", "project", "code"),
+}
+UNIFIED_SEARCH_K = 20
+
+
+# Multiplies the fused relevance of each source's hits in the unified ranking
+SOURCE_WEIGHTS = parse_float_map(os.getenv("RETRIEVAL_SOURCE_WEIGHTS", "resume=1,project=1,code=0.8"))
+
+
+def _index_base(kind: str):
     base_dir = os.path.join("data", "embeddings")
-    resume_path = os.path.join(base_dir, "resume", "resume_index","index")
-    project_path = os.path.join(base_dir, "projects", "projects_index")
+    if kind == "resume":
+        return resolve_index_base(os.path.join(base_dir, "resume"), "resume_index")
+    return resolve_index_base(os.path.join(base_dir, "projects"), "projects_index")
+
+
+def _cosine(a, b) -> float:
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denom) if denom else 0.0
+
+
+def _source_of(metadata: dict, kind: str) -> str:
+    return (metadata or {}).get("source") or kind
+
+
+def _vector_candidates(db, kind: str, query_vector, k: int, sources=None) -> list:
+    """
+    Top-k hits of a FAISS store as packer candidates, with their stored
+    vectors. With `sources`, only documents whose metadata source is listed
+    count; the search then looks deeper so k of them can still be found.
+    """
+    fetch_k = min(k if sources is None else k * 4, db.index.ntotal)
+    if fetch_k <= 0:
+        return []
+    _, positions = db.index.search(np.asarray([query_vector], dtype=np.float32), fetch_k)
+    candidates = []
+    for pos in positions[0]:
+        if pos < 0:
+            continue
+        doc_id = db.index_to_docstore_id[int(pos)]
+        doc = db.docstore.search(doc_id)
+        if not isinstance(doc, Document):
+            continue
+        source = _source_of(doc.metadata, kind)
+        if sources is not None and source not in sources:
+            continue
+        vector = db.index.reconstruct(int(pos))
+        candidates.append({
+            "id": doc_id,
+            "text": doc.page_content,
+            "source": source,
+            "metadata": doc.metadata,
+            "similarity": _cosine(query_vector, vector),
+            "vector": vector,
+        })
+        if len(candidates) == k:
+            break
+    return candidates
+
+
+# db -> (ntotal, {doc id: FAISS position}) for looking up stored vectors by id
+_store_positions = weakref.WeakKeyDictionary()
+
+
+def _positions_by_id(db) -> dict:
+    cached = _store_positions.get(db)
+    if cached is None or cached[0] != db.index.ntotal:
+        cached = (db.index.ntotal, {doc_id: int(pos) for pos, doc_id in db.index_to_docstore_id.items()})
+        _store_positions[db] = cached
+    return cached[1]
+
+
+def _keyword_candidates(bm25, db, kind: str, user_query: str, query_vector, k: int, sources=None) -> list:
+    """
+    Top-k BM25 hits as packer candidates, with the vectors already stored
+    in `db` (nothing is embedded on the query path). Hits missing from the
+    store are dropped.
+    """
+    hits = bm25.search(user_query, k if sources is None else k * 4)
+    if sources is not None:
+        hits = [(doc_id, score) for doc_id, score in hits
+                if _source_of(bm25.document(doc_id)["metadata"], kind) in sources][:k]
+    positions = _positions_by_id(db) if hits else {}
+    candidates = []
+    for doc_id, score in hits:
+        pos = positions.get(doc_id)
+        if pos is None:
+            continue
+        d = bm25.document(doc_id)
+        vector = db.index.reconstruct(pos)
+        candidates.append({
+            "id": doc_id,
+            "text": d["text"],
+            "source": _source_of(d["metadata"], kind),
+            "metadata": d["metadata"],
+            "similarity": _cosine(query_vector, vector),
+            "vector": vector,
+            "bm25": score,
+        })
+    return candidates
+
+
+def fuse_rankings(rankings, k: int) -> list:
+    """
+    Reciprocal rank fusion of ranked candidate lists (same ids across lists).
+    Each fused candidate gets "rrf" and a "relevance" in [0, 1] relative to
+    the best possible score (rank 1 in every list).
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, candidate in enumerate(ranking, start=1):
+            entry = fused.setdefault(candidate["id"], dict(candidate, rrf=0.0))
+            entry["rrf"] += 1.0 / (RRF_K + rank)
+            if candidate.get("bm25") is not None:
+                entry["bm25"] = candidate["bm25"]
+    best_possible = len(rankings) / (RRF_K + 1)
+    ordered = sorted(fused.values(), key=lambda c: c["rrf"], reverse=True)[:k]
+    for c in ordered:
+        c["relevance"] = c["rrf"] / best_possible
+    return ordered
+
+
+def _record_latency(leg: str, seconds: float):
+    retrieval_latency.setdefault(leg, deque(maxlen=500)).append(seconds)
+
+
+def retrieval_latency_stats() -> dict:
+    """p50/p95 milliseconds per retrieval leg over the recent queries."""
+    stats = {}
+    for leg, samples in retrieval_latency.items():
+        ordered = sorted(samples)
+        if ordered:
+            stats[leg] = {
+                "n": len(ordered),
+                "p50_ms": ordered[len(ordered) // 2] * 1000,
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            }
+    return stats
+
+
+@traced("rag.search")
+def _hybrid_search(index_base: str, kind: str, user_query: str, query_vector, k: int, sources=None):
+    """Dense and BM25 legs on one index fused with RRF, timing each leg under `kind`."""
+    # Stores stay resident in the index manager; only the first query loads them
+    embeddings = get_embedding_model()
+    db = index_manager.get(index_base, embeddings)
+    if query_vector is None:
+        query_vector = embeddings.embed_query(user_query)
+
+    rankings, timings = [], {}
+    if RETRIEVAL_MODE != "bm25":
+        started = time.perf_counter()
+        rankings.append(_vector_candidates(db, kind, query_vector, k, sources))
+        timings["dense"] = time.perf_counter() - started
+
+    bm25 = get_bm25(index_base) if RETRIEVAL_MODE != "dense" else None
+    if bm25 is not None:
+        started = time.perf_counter()
+        rankings.append(_keyword_candidates(bm25, db, kind, user_query, query_vector, k, sources))
+        timings["bm25"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    candidates = fuse_rankings(rankings, k)
+    timings["fusion"] = time.perf_counter() - started
+
+    for leg, seconds in timings.items():
+        _record_latency(f"{kind}.{leg}", seconds)
+    current_span().set(
+        index=kind, k=k, sources=list(sources or ()), candidates=len(candidates),
+        top_relevance=[round(c["relevance"], 4) for c in candidates[:5]],
+        **{f"{leg}_ms": round(seconds * 1000, 3) for leg, seconds in timings.items()},
+    )
+    print(f"⏱️ {kind} retrieval: " + ", ".join(f"{leg} {s * 1000:.1f} ms" for leg, s in timings.items()))
+    return candidates
 
-    print(f"Resume path: {os.path.abspath(resume_path)}")
-    print(f"Project path: {os.path.abspath(project_path)}")
 
-    dbs = []
-    if source in ["resume", "both"] and os.path.exists(resume_path + ".faiss"):
-        dbs.append(load_flat_faiss(resume_path, embeddings))
-    if source in ["project", "both"] and os.path.exists(project_path + ".faiss"):
-        dbs.append(load_flat_faiss(project_path, embeddings))
+def search_index(kind: str, user_query: str, query_vector=None, k: int = None):
+    """
+    Hybrid search on the "resume" or "project" index: dense FAISS hits and
+    BM25 keyword hits fused with reciprocal rank fusion (RETRIEVAL_MODE
+    selects "hybrid", "dense" or "bm25"). Returns scored candidates for
+    `pack_context`, or None when that index hasn't been built yet.
+    """
+    index_base = _index_base(kind)
+    if not index_base:
+        return None
+    return _hybrid_search(index_base, kind, user_query, query_vector, k or SEARCH_K[kind])
 
-    if not dbs:
-        return "⚠️ No embeddings found. Please re-upload resume or fetch projects first."
 
-    # Combine contexts if both are used
-    all_docs = []
-    for db in dbs:
-        docs = db.similarity_search(user_query, k=4)
-        all_docs.extend(docs)
+def search_unified(user_query: str, query_vector=None, sources=None, k: int = None):
+    """
+    One hybrid search over the unified index (resume, project and code
+    vectors together), restricted to `sources` and ranked globally: each
+    hit's fused relevance is scaled by its SOURCE_WEIGHTS entry. Returns
+    candidates best first, or None when the unified index hasn't been built.
+    """
+    index_base = resolve_index_base(UNIFIED_DIR, UNIFIED_INDEX)
+    if not index_base:
+        return None
+    sources = tuple(sources or ROUTE_SOURCES["both"])
+    candidates = _hybrid_search(index_base, "unified", user_query, query_vector, k or UNIFIED_SEARCH_K, sources)
+    for c in candidates:
+        c["relevance"] *= SOURCE_WEIGHTS.get(c["source"], 1.0)
+    candidates.sort(key=lambda c: c["relevance"], reverse=True)
+    return candidates
+
+
+@traced("rag.retrieve")
+def retrieve(user_query: str, source: str, query_vector=None) -> dict:
+    """
+    Candidates for a route, as {index: candidates}: a single unified search
+    when that index exists, otherwise one search per per-source index.
+    """
+    candidates = search_unified(user_query, query_vector, ROUTE_SOURCES[source])
+    if candidates is not None:
+        return {"unified": candidates}
+    return {kind: search_index(kind, user_query, query_vector) for kind in SOURCE_INDEXES[source]}
+
+
+def build_answer_prompt(user_query: str, source: str, retrieved: dict = None, query_vector=None) -> tuple:
+    """
+    Retrieves context from flat FAISS indexes and builds the answer prompt.
+    `retrieved` maps index -> search candidates when the search already ran.
+    Returns (prompt, None), or (None, message) when there is nothing to answer from.
+    """
+    if retrieved is None:
+        retrieved = retrieve(user_query, source, query_vector)
 
-    if not all_docs:
-        return "I found the embeddings, but they didn’t contain relevant information for your query."
+    found = [candidates for candidates in retrieved.values() if candidates is not None]
+    if not found:
+        return None, "⚠️ No embeddings found. Please re-upload resume or fetch projects first."
 
-    # Build context
-    context = "\n\n".join(doc.page_content for doc in all_docs)
+    # Combine candidates from every searched index (a single list with the unified index)
+    candidates = [c for group in found for c in group]
 
-    if source in ["resume", "both"]:
-        resume_json_path = os.path.join("data", "user_data.json")
-        with open(resume_json_path, "r", encoding="utf-8") as f:
-            resume_raw_text = f.read()
-            context = f"\n\n[Raw Resume Data]\n{resume_raw_text}"
+    if not candidates:
+        return None, "I found the embeddings, but they didn’t contain relevant information for your query."
 
-        # print(resume_raw_text)
-        # if resume_raw_text:
-        #     context = f"\n\n[Raw Resume Data]\n{resume_raw_text}"
-        #     print("📎 Added raw resume JSON content to context.")
+    # Build context: best, non-redundant chunks within the token budget
+    with span("rag.pack") as s:
+        chosen, report = pack_context(candidates)
+        s.set(candidates=len(candidates), chunks=report["chunks"], tokens=report["tokens"],
+              budget=report["budget"], dropped_duplicates=report["dropped_duplicates"],
+              dropped_over_budget=report["dropped_over_budget"])
+    log_context(user_query, chosen, report)
+    context = format_context(chosen)
 
     prompt = f"""
     You are an intelligent assistant using embedded context data.
@@ -242,7 +452,18 @@ def retrieve_answer(user_query: str, source: str) -> str:
 
     Give a precise and factual answer based only on the context.
     """
-    resp = llm.invoke(prompt)
+    return prompt, None
+
+
+def retrieve_answer(user_query: str, source: str, query_vector=None) -> str:
+    """
+    Retrieves context and generates response from flat FAISS indexes.
+    """
+    prompt, message = build_answer_prompt(user_query, source, query_vector=query_vector)
+    if prompt is None:
+        return message
+    with span("rag.answer"):
+        resp = get_answer_llm().invoke(prompt)
     return getattr(resp, "content", str(resp))
 
 
@@ -250,12 +471,8 @@ def retrieve_answer(user_query: str, source: str) -> str:
 # ================================================================
 # 3️⃣ GRADER AGENT  (LLM-B)
 # ================================================================
-def grade_answer(user_query: str, answer: str) -> tuple:
-    """
-    Uses another LLM (LLM-B) to send pass .
-    """
-    llm = get_random_llm(temperature=0.0)
-    prompt = f"""
+def build_grade_prompt(user_query: str, answer: str) -> str:
+    return f"""
     You are an evaluator checking if an AI's answer satisfies a user's query.
 
     Question: {user_query}
@@ -268,8 +485,9 @@ def grade_answer(user_query: str, answer: str) -> tuple:
       "feedback": "Explain why it passed"
     }}
     """
-    resp = llm.invoke(prompt)
-    text = getattr(resp, "content", str(resp))
+
+
+def parse_grade(text: str) -> tuple:
     match = re.search(r'\{[\s\S]*\}', text)
 
     if match:
@@ -282,6 +500,27 @@ def grade_answer(user_query: str, answer: str) -> tuple:
             return (False, "Invalid grader JSON")
     return (False, "Could not parse grader response.")
 
+
+@traced("rag.grade")
+def grade_answer(user_query: str, answer: str) -> tuple:
+    """
+    Uses another LLM (LLM-B) to send pass .
+    """
+    llm = get_llm(temperature=0.0)
+    resp = llm.invoke(build_grade_prompt(user_query, answer))
+    passed, feedback = parse_grade(getattr(resp, "content", str(resp)))
+    current_span().set(passed=passed)
+    return passed, feedback
+
+
+@traced("rag.grade")
+async def grade_answer_async(user_query: str, answer: str) -> tuple:
+    llm = get_llm(temperature=0.0)
+    resp = await llm.ainvoke(build_grade_prompt(user_query, answer))
+    passed, feedback = parse_grade(getattr(resp, "content", str(resp)))
+    current_span().set(passed=passed)
+    return passed, feedback
+
 def meeting_scheduler_node():
 
     subject = "📅 Congrats Meeting Scheduled Notification"
@@ -296,6 +535,31 @@ def meeting_scheduler_node():
     send_email_gmail(subject, body)
 
 
+def build_correction_prompt(user_query: str, feedback: str) -> str:
+    return f"""
+        Your last answer did not meet expectations because:
+        {feedback}
+
+        Please revise the answer to fully satisfy the user's query:
+        {user_query}
+        """
+
+
+@traced("rag.revise")
+def revise_answer(user_query: str, feedback: str) -> str:
+    """Asks for a new answer after a failed grade."""
+    llm = get_llm(temperature=0.5)
+    resp = llm.invoke(build_correction_prompt(user_query, feedback))
+    return getattr(resp, "content", str(resp))
+
+
+@traced("rag.revise")
+async def revise_answer_async(user_query: str, feedback: str) -> str:
+    llm = get_llm(temperature=0.5)
+    resp = await llm.ainvoke(build_correction_prompt(user_query, feedback))
+    return getattr(resp, "content", str(resp))
+
+
 # ================================================================
 # 4️⃣ MAIN AGENTIC PIPELINE
 # ================================================================
@@ -306,13 +570,47 @@ def agentic_rag_pipeline(user_query: str) -> str:
     2. Retrieve & answer
     3. Grade
     4. Retry if failed
+
+    Runs `agentic_rag_pipeline_async` on one long-lived background loop,
+    so pooled async connections are reused across requests and callers
+    that already run an event loop can call it too.
+    """
+    future = asyncio.run_coroutine_threadsafe(agentic_rag_pipeline_async(user_query), _get_pipeline_loop())
+    return future.result()
+
+
+def _get_pipeline_loop():
+    global _pipeline_loop
+    with _pipeline_loop_lock:
+        if _pipeline_loop is None:
+            _pipeline_loop = asyncio.new_event_loop()
+            threading.Thread(target=_pipeline_loop.run_forever, name="rag-pipeline-loop", daemon=True).start()
+    return _pipeline_loop
+
+
+@traced("rag.request", pipeline="sequential")
+def agentic_rag_pipeline_sequential(user_query: str, use_cache: bool = True) -> str:
+    """
+    The same flow with every stage run one after another on blocking calls.
+    Kept as the baseline for latency comparisons.
     """
     print("\n========== AGENTIC RAG START ==========")
     print("User Query:", user_query)
+    started = time.perf_counter()
+
+    # ----- Step 0: Semantic cache -----
+    query_vector = get_embedding_model().embed_query(user_query)
+    cached = semantic_cache.lookup(query_vector) if use_cache else None
+    current_span().set(query_chars=len(user_query), semantic_cache_hit=bool(cached))
+    if cached:
+        print(f"⚡ Semantic cache hit ({cached['similarity']:.3f}) — source: {cached['source']}")
+        print("========== AGENTIC RAG END ==========\n")
+        return cached["answer"]
 
     # ----- Step 1: Routing -----
-    source = route_query(user_query)
+    source = route_query(user_query, query_vector)
     print("🔍 Router decided:", source)
+    current_span().set(source=source)
 
     if(source == "meeting"):
         meeting_scheduler_node()
@@ -320,27 +618,181 @@ def agentic_rag_pipeline(user_query: str) -> str:
 
 
     # ----- Step 2: Retrieve Answer -----
-    answer = retrieve_answer(user_query, source)
+    answer = retrieve_answer(user_query, source, query_vector)
     print("📚 Retrieved answer snippet:", answer[:250])
 
 
     # ----- Step 3: Grade -----
     passed, feedback = grade_answer(user_query, answer)
     print("🧠 Grader result:", "PASS" if passed else "FAIL", "-", feedback)
+    current_span().set(passed=passed)
 
     # ----- Step 4: Retry loop if needed -----
     if not passed:
-        correction_prompt = f"""
-        Your last answer did not meet expectations because:
-        {feedback}
+        answer = revise_answer(user_query, feedback)
+        print("🔁 Revised answer generated.")
 
-        Please revise the answer to fully satisfy the user's query:
-        {user_query}
-        """
-        llm = get_random_llm(temperature=0.5)
-        resp = llm.invoke(correction_prompt)
+    # Meetings never reach this point, so every cached answer is side-effect free
+    if use_cache:
+        semantic_cache.store(query_vector, source, answer, time.perf_counter() - started)
+
+    print("========== AGENTIC RAG END ==========\n")
+    return answer
+
+
+def _discard_result(task):
+    # Retrieve the outcome of an abandoned task so asyncio doesn't log it
+    if not task.cancelled():
+        task.exception()
+
+
+@traced("rag.request", pipeline="async")
+async def agentic_rag_pipeline_async(user_query: str, use_cache: bool = True) -> str:
+    """
+    Async agentic RAG flow. Every source is searched while the router is
+    still deciding (one unified search, or one per index without it); hits
+    from sources the route excludes are thrown away. The cache write
+    happens in the background, after the answer is returned.
+    """
+    print("\n========== AGENTIC RAG (ASYNC) START ==========")
+    print("User Query:", user_query)
+    started = time.perf_counter()
+
+    # ----- Step 0: Semantic cache -----
+    query_vector = await asyncio.to_thread(get_embedding_model().embed_query, user_query)
+    cached = semantic_cache.lookup(query_vector) if use_cache else None
+    current_span().set(query_chars=len(user_query), semantic_cache_hit=bool(cached))
+    if cached:
+        print(f"⚡ Semantic cache hit ({cached['similarity']:.3f}) — source: {cached['source']}")
+        print("========== AGENTIC RAG (ASYNC) END ==========\n")
+        return cached["answer"]
+
+    # ----- Step 1: Routing, with speculative retrieval on every source -----
+    if resolve_index_base(UNIFIED_DIR, UNIFIED_INDEX):
+        # Deep enough that whichever sources the route keeps still fill UNIFIED_SEARCH_K
+        k = UNIFIED_SEARCH_K * len(ROUTE_SOURCES["both"])
+        searches = {"unified": asyncio.create_task(
+            asyncio.to_thread(search_unified, user_query, query_vector, ROUTE_SOURCES["both"], k)
+        )}
+    else:
+        searches = {
+            kind: asyncio.create_task(asyncio.to_thread(search_index, kind, user_query, query_vector))
+            for kind in ("resume", "project")
+        }
+    try:
+        source = await route_query_async(user_query, query_vector)
+    except BaseException:
+        for task in searches.values():
+            task.add_done_callback(_discard_result)
+        raise
+    print("🔍 Router decided:", source)
+    current_span().set(source=source)
+
+    wanted = ("unified",) if "unified" in searches and source in ROUTE_SOURCES else SOURCE_INDEXES.get(source, ())
+    for kind, task in searches.items():
+        if kind not in wanted:
+            task.add_done_callback(_discard_result)
+
+    if source == "meeting":
+        await asyncio.to_thread(meeting_scheduler_node)
+        return "✅ Meeting scheduled! Email notification sent."
+
+    # ----- Step 2: Answer from the kept branch -----
+    retrieved = {kind: await searches[kind] for kind in wanted}
+    if retrieved.get("unified") is not None:
+        kept = ROUTE_SOURCES[source]
+        retrieved["unified"] = [c for c in retrieved["unified"] if c["source"] in kept][:UNIFIED_SEARCH_K]
+    prompt, message = build_answer_prompt(user_query, source, retrieved)
+    if prompt is None:
+        answer = message
+    else:
+        with span("rag.answer"):
+            resp = await get_answer_llm().ainvoke(prompt)
         answer = getattr(resp, "content", str(resp))
+    print("📚 Retrieved answer snippet:", answer[:250])
+
+    # ----- Step 3: Grade -----
+    passed, feedback = await grade_answer_async(user_query, answer)
+    print("🧠 Grader result:", "PASS" if passed else "FAIL", "-", feedback)
+    current_span().set(passed=passed)
+
+    # ----- Step 4: Retry if needed -----
+    if not passed:
+        answer = await revise_answer_async(user_query, feedback)
         print("🔁 Revised answer generated.")
 
-    print("========== AGENTIC RAG END ==========\n")
+    if use_cache:
+        _background.submit(semantic_cache.store, query_vector, source, answer, time.perf_counter() - started)
+
+    print("========== AGENTIC RAG (ASYNC) END ==========\n")
     return answer
+
+
+# ================================================================
+# 5️⃣ STREAMING AGENTIC PIPELINE
+# ================================================================
+def agentic_rag_pipeline_stream(user_query: str):
+    """
+    Same flow as `agentic_rag_pipeline`, but yields (phase, text) pieces
+    as soon as the LLM produces them:
+    - ("answer", token)   the first answer, streamed
+    - ("revision", token) a revised answer, only if grading failed
+
+    Grading runs on the finished answer text, after the last "answer" piece.
+    """
+    with span("rag.request", pipeline="stream") as request:
+        print("\n========== AGENTIC RAG STREAM START ==========")
+        print("User Query:", user_query)
+        started = time.perf_counter()
+
+        query_vector = get_embedding_model().embed_query(user_query)
+        cached = semantic_cache.lookup(query_vector)
+        request.set(query_chars=len(user_query), semantic_cache_hit=bool(cached))
+        if cached:
+            print(f"⚡ Semantic cache hit ({cached['similarity']:.3f}) — source: {cached['source']}")
+            yield "answer", cached["answer"]
+            return
+
+        source = route_query(user_query, query_vector)
+        print("🔍 Router decided:", source)
+        request.set(source=source)
+
+        if source == "meeting":
+            meeting_scheduler_node()
+            yield "answer", "✅ Meeting scheduled! Email notification sent."
+            return
+
+        prompt, message = build_answer_prompt(user_query, source, query_vector=query_vector)
+        if prompt is None:
+            yield "answer", message
+            return
+
+        pieces = []
+        with span("rag.answer") as answer_span:
+            for chunk in get_answer_llm().stream(prompt):
+                token = getattr(chunk, "content", str(chunk))
+                if token:
+                    if not pieces:
+                        answer_span.set(first_token_after_request_ms=round((time.perf_counter() - started) * 1000, 1))
+                    pieces.append(token)
+                    yield "answer", token
+        answer = "".join(pieces)
+
+        passed, feedback = grade_answer(user_query, answer)
+        print("🧠 Grader result:", "PASS" if passed else "FAIL", "-", feedback)
+        request.set(passed=passed, revised=not passed)
+
+        if not passed:
+            pieces = []
+            with span("rag.revise", phase="revision"):
+                llm = get_llm(temperature=0.5)
+                for chunk in llm.stream(build_correction_prompt(user_query, feedback)):
+                    token = getattr(chunk, "content", str(chunk))
+                    if token:
+                        pieces.append(token)
+                        yield "revision", token
+            answer = "".join(pieces)
+            print("🔁 Revised answer streamed.")
+
+        semantic_cache.store(query_vector, source, answer, time.perf_counter() - started)
+        print("========== AGENTIC RAG STREAM END ==========\n")
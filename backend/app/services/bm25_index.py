@@ -0,0 +1,151 @@
+# backend/app/services/bm25_index.py
+#
+# In-process BM25 keyword index kept next to each FAISS index
+# (<index_base>.bm25.json). It catches exact names and keywords
+# ("LangGraph", a company name) that dense MiniLM vectors rank poorly.
+
+import os
+import re
+import json
+import math
+import threading
+from collections import Counter
+
+BM25_SUFFIX = ".bm25.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Keeps "c++", "node.js", "gpt-4" and similar as single terms
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#._-]*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for", "from", "has", "have",
+    "he", "her", "his", "how", "i", "in", "is", "it", "its", "me", "my", "of", "on", "or", "she",
+    "that", "the", "their", "them", "they", "this", "to", "use", "used", "was", "were", "what",
+    "when", "where", "which", "who", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> list:
+    tokens = (t.rstrip("._-") for t in _TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t and t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a set of documents keyed by docstore id. Collection
+    statistics are maintained on every add/remove, so updates are
+    incremental.
+    """
+
+    def __init__(self):
+        self.docs = {}   # id -> {"text", "metadata", "tf": Counter, "length"}
+        self.df = Counter()
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc_id: str, text: str, metadata: dict = None):
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        tf = Counter(tokens)
+        self.docs[doc_id] = {"text": text, "metadata": metadata or {}, "tf": tf, "length": len(tokens)}
+        self.df.update(tf.keys())
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.df.subtract(doc["tf"].keys())
+        self.df += Counter()  # drop terms whose count reached zero
+        self.total_length -= doc["length"]
+
+    def search(self, query: str, k: int = 4) -> list:
+        """[(doc_id, score)] best first; documents sharing no term with the query are left out."""
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        n = len(self.docs)
+        avgdl = self.total_length / n or 1.0
+        idf = {t: math.log(1 + (n - self.df[t] + 0.5) / (self.df[t] + 0.5)) for t in terms if self.df[t]}
+
+        scores = []
+        for doc_id, doc in self.docs.items():
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc["length"] / avgdl)
+            for t, weight in idf.items():
+                tf = doc["tf"].get(t)
+                if tf:
+                    score += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scores.append((doc_id, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:k]
+
+    def document(self, doc_id: str) -> dict:
+        return self.docs[doc_id]
+
+    # ---------- persistence ----------
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = {doc_id: {"text": d["text"], "metadata": d["metadata"]} for doc_id, d in self.docs.items()}
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        index = cls()
+        for doc_id, d in payload.items():
+            index.add(doc_id, d["text"], d.get("metadata"))
+        return index
+
+    @classmethod
+    def from_store(cls, db) -> "BM25Index":
+        """Builds the keyword index from every document of a FAISS store."""
+        index = cls()
+        for doc_id in db.index_to_docstore_id.values():
+            doc = db.docstore.search(doc_id)
+            if hasattr(doc, "page_content"):
+                index.add(doc_id, doc.page_content, doc.metadata)
+        return index
+
+
+# ======================================================
+# Resident copies for the query path
+# ======================================================
+_resident = {}  # path -> (signature, BM25Index)
+_resident_lock = threading.Lock()
+
+
+def _signature(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_bm25(index_base_path: str):
+    """
+    The BM25 index saved next to `index_base_path`, kept in memory and
+    reloaded when the file changes. None if the index has no BM25 file yet.
+    """
+    path = index_base_path + BM25_SUFFIX
+    signature = _signature(path)
+    if signature is None:
+        return None
+    cached = _resident.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with _resident_lock:
+        cached = _resident.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, BM25Index.load(path))
+            _resident[path] = cached
+    return cached[1]
@@ -2,10 +2,10 @@
 
 import os
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.chains import create_retrieval_chain, create_stuff_documents_chain
-from langchain_groq import ChatGroq
+from .groq_pool import get_llm
+from .embedding_service import get_embedding_model
 
 
 def query_rag_response(query: str) -> str:
@@ -14,7 +14,7 @@ def query_rag_response(query: str) -> str:
     Updated for new LangChain version (no RetrievalQA).
     """
     try:
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        embeddings = get_embedding_model()
 
         resume_path = "data/embeddings/resume/resume_index.faiss"
         project_path = "data/embeddings/projects/projects_index.faiss"
@@ -29,11 +29,7 @@ def query_rag_response(query: str) -> str:
         retriever = db.as_retriever(search_type="similarity", search_kwargs={"k": 4})
 
         # ✅ Groq LLM
-        llm = ChatGroq(
-            api_key=os.getenv("GROQ_API_KEY_1"),
-            model="openai/gpt-oss-120b",
-            temperature=0
-        )
+        llm = get_llm(temperature=0)
 
         # ✅ Modern prompt style
         prompt = ChatPromptTemplate.from_template("""
@@ -0,0 +1,146 @@
+# backend/app/services/context_packer.py
+#
+# Context assembly for the answer prompt: scored candidates from every
+# searched index are de-duplicated with MMR (maximal marginal relevance)
+# and packed into a token budget, with an optional cap per source.
+
+import os
+import json
+import time
+import math
+import numpy as np
+from ..config import parse_float_map, safe_float_env
+
+
+CONTEXT_TOKEN_BUDGET = int(safe_float_env("CONTEXT_TOKEN_BUDGET", 1500))
+CONTEXT_MMR_LAMBDA = safe_float_env("CONTEXT_MMR_LAMBDA", 0.7)          # 1 = relevance only
+CONTEXT_DUPLICATE_SIMILARITY = safe_float_env("CONTEXT_DUPLICATE_SIMILARITY", 0.95)
+CONTEXT_MIN_SIMILARITY = safe_float_env("CONTEXT_MIN_SIMILARITY", 0.0)  # dense-only hits below are never packed
+# Largest share of the budget one source may take when several sources compete
+CONTEXT_SOURCE_QUOTAS = parse_float_map(os.getenv("CONTEXT_SOURCE_QUOTAS", "resume=0.65,project=0.65"))
+CONTEXT_LOG_PATH = os.getenv("CONTEXT_LOG_PATH", "")  # JSONL of every packed context; empty disables
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; no tokenizer needed for budgeting
+    return max(1, math.ceil(len(text) / 4))
+
+
+def _unit(vector):
+    vec = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _truncate(text: str, tokens: int) -> str:
+    return text[: tokens * 4].rsplit(" ", 1)[0] + " …"
+
+
+def pack_context(candidates, budget: int = CONTEXT_TOKEN_BUDGET, mmr_lambda: float = CONTEXT_MMR_LAMBDA,
+                 duplicate_similarity: float = CONTEXT_DUPLICATE_SIMILARITY, quotas: dict = None):
+    """
+    Chooses which candidates go into the prompt.
+
+    `candidates` are dicts with "text", "source", "similarity" (to the
+    query) and optionally "relevance" (fused rank score, used instead of
+    the similarity for ranking), "bm25", "vector" and "metadata". They are picked greedily
+    by MMR score, skipping near-duplicates of already chosen text, until
+    the token budget is spent. Per-source quotas (share of the budget)
+    only apply when more than one source has candidates.
+
+    Returns (chosen candidates in pick order, report dict).
+    """
+    quotas = CONTEXT_SOURCE_QUOTAS if quotas is None else quotas
+    pool = [
+        dict(c, tokens=estimate_tokens(c["text"])) for c in candidates
+        # Keyword hits stay even when their embedding is far from the query
+        if c.get("text") and (c["similarity"] >= CONTEXT_MIN_SIMILARITY or c.get("bm25"))
+    ]
+    for c in pool:
+        c["unit"] = _unit(c["vector"]) if c.get("vector") is not None else None
+
+    sources = {c["source"] for c in pool}
+    limits = {
+        s: int(budget * quotas[s]) if len(sources) > 1 and s in quotas else budget
+        for s in sources
+    }
+    used = {s: 0 for s in sources}
+    chosen, duplicates, over_budget = [], 0, 0
+    remaining = budget
+
+    while pool and remaining > 0:
+        best, best_score, best_redundancy = None, -math.inf, 0.0
+        for c in pool:
+            redundancy = max(
+                (float(np.dot(c["unit"], s["unit"])) for s in chosen
+                 if c["unit"] is not None and s["unit"] is not None),
+                default=0.0,
+            )
+            score = mmr_lambda * c.get("relevance", c["similarity"]) - (1 - mmr_lambda) * redundancy
+            if score > best_score:
+                best, best_score, best_redundancy = c, score, redundancy
+        pool.remove(best)
+
+        if best_redundancy >= duplicate_similarity or any(best["text"] == s["text"] for s in chosen):
+            duplicates += 1
+            continue
+        room = min(remaining, limits[best["source"]] - used[best["source"]])
+        if best["tokens"] > room:
+            if chosen or room <= 0:
+                over_budget += 1
+                continue
+            # Nothing fits yet: a truncated top hit beats an empty context
+            best["text"], best["tokens"] = _truncate(best["text"], room), room
+        chosen.append(best)
+        used[best["source"]] += best["tokens"]
+        remaining -= best["tokens"]
+
+    report = {
+        "budget": budget,
+        "tokens": budget - remaining,
+        "chunks": len(chosen),
+        "by_source": {s: sum(1 for c in chosen if c["source"] == s) for s in sources},
+        "dropped_duplicates": duplicates,
+        "dropped_over_budget": over_budget + len(pool),
+    }
+    return chosen, report
+
+
+def format_context(chosen) -> str:
+    """Chosen chunks grouped by source, each labelled with where it came from."""
+    blocks = []
+    for source in dict.fromkeys(c["source"] for c in chosen):
+        for c in chosen:
+            if c["source"] != source:
+                continue
+            section = (c.get("metadata") or {}).get("section") or (c.get("metadata") or {}).get("repository")
+            label = f"{source} · {section}" if section else source
+            blocks.append(f"[{label}]\n{c['text']}")
+    return "\n\n".join(blocks)
+
+
+def log_context(user_query: str, chosen, report: dict):
+    """Prints the packed context summary and, if CONTEXT_LOG_PATH is set, appends it as JSONL."""
+    print(
+        f"🧩 Context: {report['chunks']} chunks, {report['tokens']}/{report['budget']} tokens "
+        f"{report['by_source']}, dropped {report['dropped_duplicates']} duplicates / "
+        f"{report['dropped_over_budget']} over budget"
+    )
+    for c in chosen:
+        print(f"   · {c['source']:<8}{c.get('relevance', c['similarity']):.3f}  {c['tokens']:>4}t  {c['text'][:70]!r}")
+
+    if CONTEXT_LOG_PATH:
+        record = {
+            "time": time.time(),
+            "query": user_query,
+            **report,
+            "chosen": [
+                {"source": c["source"], "similarity": c["similarity"], "relevance": c.get("relevance"),
+                 "bm25": c.get("bm25"), "tokens": c["tokens"],
+                 "metadata": c.get("metadata") or {}, "text": c["text"]}
+                for c in chosen
+            ],
+        }
+        os.makedirs(os.path.dirname(CONTEXT_LOG_PATH) or ".", exist_ok=True)
+        with open(CONTEXT_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
@@ -0,0 +1,86 @@
+# backend/app/services/embedding_cache.py
+#
+# Document vectors keyed by (embedding model, sha256 of the text), kept in
+# SQLite so re-indexing unchanged text never reaches the model again.
+
+import os
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH", os.path.join("data", "embeddings", "embedding_cache.sqlite")
+)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._counters = {"hits": 0, "misses": 0}
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS vectors (
+                       model TEXT NOT NULL,
+                       text_hash TEXT NOT NULL,
+                       vector BLOB NOT NULL,
+                       PRIMARY KEY (model, text_hash)
+                   )"""
+            )
+        return self._conn
+
+    def embed_documents(self, embeddings, model_name: str, texts):
+        """
+        Vectors for `texts`, in order. Only texts not cached for
+        `model_name` are sent to `embeddings.embed_documents`, in one batch.
+        """
+        hashes = [text_hash(t) for t in texts]
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for h in set(hashes):
+                row = conn.execute(
+                    "SELECT vector FROM vectors WHERE model = ? AND text_hash = ?", (model_name, h)
+                ).fetchone()
+                if row is not None:
+                    found[h] = np.frombuffer(row[0], dtype=np.float32).tolist()
+
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in found:
+                missing.setdefault(h, t)
+        if missing:
+            vectors = embeddings.embed_documents(list(missing.values()))
+            with self._lock:
+                conn = self._connection()
+                for h, vec in zip(missing, vectors):
+                    found[h] = list(vec)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?)",
+                        (model_name, h, np.asarray(vec, dtype=np.float32).tobytes()),
+                    )
+                conn.commit()
+
+        with self._lock:
+            self._counters["hits"] += len(texts) - len(missing)
+            self._counters["misses"] += len(missing)
+        return [found[h] for h in hashes]
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._connection().execute("SELECT COUNT(*) FROM vectors").fetchone()
+            return {**self._counters, "entries": entries}
+
+
+# Process-wide instance shared by the index writers
+embedding_cache = EmbeddingCache()
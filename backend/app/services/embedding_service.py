@@ -1,35 +1,153 @@
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import re
+import threading
+from .index_manager import index_manager, load_flat_faiss, resolve_index_base, save_flat_faiss
+from .embedding_cache import embedding_cache, text_hash
+from .sqlite_docstore import DOCSTORE_SUFFIX
+from .bm25_index import BM25_SUFFIX, BM25Index
+from .semantic_cache import semantic_cache
+from .vector_backends import build_index, select_backend
 
-def get_embedding_model():
-    model_name = "sentence-transformers/all-MiniLM-L6-v2"
-    embeddings = HuggingFaceEmbeddings(
-        model_name=model_name
-    )
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# "torch" (sentence-transformers) or "onnx" (int8 export on onnxruntime, see onnx_embeddings)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+
+
+# ======================================================
+# Embedding Model Registry
+# ======================================================
+_embedding_models = {}
+_warmed_models = set()
+_registry_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def _normalize_model_name(model_name: str) -> str:
+    # "all-MiniLM-L6-v2" and "sentence-transformers/all-MiniLM-L6-v2" are the same model
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def _registry_key(model_name: str, backend: str) -> str:
+    # ONNX vectors differ slightly from torch ones, so they are registered and cached apart
+    return model_name if backend == "torch" else f"{model_name}+onnx-int8"
+
+
+def get_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL, backend: str = None):
+    """
+    Returns the process-wide embedding model for `model_name`, run by
+    `backend` ("torch" or "onnx"; EMBEDDING_BACKEND by default).
+    The model is loaded once on first use and shared by every caller.
+    """
+    model_name = _normalize_model_name(model_name)
+    backend = backend or EMBEDDING_BACKEND
+    key = _registry_key(model_name, backend)
+    embeddings = _embedding_models.get(key)
+    if embeddings is not None:
+        return embeddings
+
+    with _registry_lock:
+        # Another thread may have finished loading while we waited
+        embeddings = _embedding_models.get(key)
+        if embeddings is None:
+            print(f"🔄 Loading embedding model: {model_name} ({backend})")
+            if backend == "onnx":
+                from .onnx_embeddings import OnnxEmbeddings
+                embeddings = OnnxEmbeddings(model_name)
+            elif backend == "torch":
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+                embeddings = HuggingFaceEmbeddings(model_name=model_name)
+            else:
+                raise ValueError(f"Unknown embedding backend '{backend}', expected 'torch' or 'onnx'")
+            _embedding_models[key] = embeddings
     return embeddings
 
 
+def register_embedding_model(embeddings, model_name: str = DEFAULT_EMBEDDING_MODEL, backend: str = None):
+    """
+    Serves `embeddings` (any LangChain Embeddings) for `model_name` and
+    `backend` instead of loading the model, e.g. for offline benchmarks.
+    """
+    key = _registry_key(_normalize_model_name(model_name), backend or EMBEDDING_BACKEND)
+    with _registry_lock:
+        _embedding_models[key] = embeddings
+
+
+def warm_up_embedding_models(*model_names):
+    """
+    Loads the given models (the default one if none given) and runs a
+    dummy query through each, so the first real query doesn't pay for it.
+    Safe to call on every Streamlit rerun.
+    """
+    for model_name in model_names or (DEFAULT_EMBEDDING_MODEL,):
+        model_name = _normalize_model_name(model_name)
+        if model_name in _warmed_models:
+            continue
+        get_embedding_model(model_name).embed_query("warm-up")
+        _warmed_models.add(model_name)
+
+
+def warm_up_in_background(*model_names):
+    """
+    Runs `warm_up_embedding_models` on a daemon thread, once per process,
+    so startup doesn't wait for torch to load. A query arriving before it
+    finishes waits on the registry lock instead of loading a second copy.
+    """
+    global _warm_up_thread
+    with _registry_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=warm_up_embedding_models, args=model_names, name="embedding-warm-up", daemon=True
+            )
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+
+def embed_texts_cached(texts):
+    """Document vectors from the default model, through the on-disk embedding cache."""
+    return embedding_cache.embed_documents(
+        get_embedding_model(), _registry_key(_normalize_model_name(DEFAULT_EMBEDDING_MODEL), EMBEDDING_BACKEND), texts
+    )
+
+
+# ======================================================
+# Vector Index Factory
+# ======================================================
+def make_vector_index(vectors, backend: str = None):
+    """
+    Search index over `vectors` (n x d) with the backend suited to n:
+    a NumPy brute-force matrix up to VECTOR_NUMPY_MAX vectors, flat FAISS
+    up to VECTOR_FLAT_MAX, then VECTOR_LARGE_BACKEND (HNSW or IVF).
+    `backend` forces one of "numpy", "flat", "hnsw", "ivf".
+    Returns (index, backend).
+    """
+    backend = select_backend(len(vectors), backend)
+    return build_index(vectors, backend), backend
+
 
 # ======================================================
 # Helper Function
 # ======================================================
-def _save_faiss(db, save_dir: str, index_name: str):
+def _save_faiss(db, save_dir: str, index_name: str, bm25=None):
     """
-    Saves FAISS index using its native folder structure:
-    <save_dir>/<index_name>/index.faiss and index.pkl
+    Saves FAISS index in the pickle-free folder structure:
+    <save_dir>/<index_name>/index.faiss and index.docs.sqlite,
+    plus the BM25 keyword index (index.bm25.json). Pass `bm25` when it was
+    updated incrementally; otherwise it is built from the store.
     """
     os.makedirs(save_dir, exist_ok=True)
     save_path = os.path.join(save_dir, index_name)
-    db.save_local(save_path)
+    index_base = os.path.join(save_path, "index")
+    save_flat_faiss(db, index_base)
+    (bm25 if bm25 is not None else BM25Index.from_store(db)).save(index_base + BM25_SUFFIX)
 
-    # index_file = os.path.join(save_path, "index.faiss")
-    # meta_file = os.path.join(save_path, "index.pkl")
-    index_file = f"{save_path}.faiss"
-    meta_file = f"{save_path}.pkl"
+    index_file = f"{index_base}.faiss"
+    meta_file = f"{index_base}{DOCSTORE_SUFFIX}"
 
     if os.path.exists(index_file) and os.path.exists(meta_file):
         print(f"✅ FAISS index saved successfully at: {save_path}")
+        # Let resident copies pick up the new version in the background
+        index_manager.notify_saved(index_base)
     else:
         print(f"⚠️ Warning: FAISS index files not found at {save_path}")
 
@@ -37,94 +155,380 @@ def _save_faiss(db, save_dir: str, index_name: str):
 # ======================================================
 # Resume Embedding Function
 # ======================================================
+RESUME_DIR = os.path.join("data", "embeddings", "resume")
+RESUME_INDEX = "resume_index"
+RESUME_CHUNK_MAX_CHARS = 700   # longer entries are split into one chunk per bullet
+RESUME_SKIPPED_KEYS = ("qualification",)  # app bookkeeping stored next to the resume
+
+
+def _section_title(key: str) -> str:
+    """"relevantCoursework" / "technical_skills" -> "Relevant Coursework" / "Technical Skills"."""
+    words = re.sub(r"([a-z])([A-Z])", r"\1 \2", key).replace("_", " ").split()
+    return " ".join(w[:1].upper() + w[1:] for w in words)
+
+
+def _is_scalar(value) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _flatten(value) -> str:
+    if _is_scalar(value):
+        return str(value)
+    if isinstance(value, dict):
+        return "; ".join(f"{_section_title(k)}: {_flatten(v)}" for k, v in value.items() if v not in ("", None, [], {}))
+    if isinstance(value, list):
+        return ", ".join(_flatten(v) for v in value)
+    return ""
+
+
+def _entry_chunks(section: str, entry, header: str = ""):
+    """
+    Texts for one resume entry (an education row, a job, an achievement...).
+    Scalar fields form the entry header; nested lists of records (e.g. the
+    roles held at one company) become their own entries under that header;
+    bullet lists stay with the entry unless it is too long, in which case
+    every bullet becomes its own chunk carrying the header.
+    """
+    if not isinstance(entry, dict):
+        text = _flatten(entry)
+        return [f"{section}: {header}{text}"] if text else []
+
+    facts = [f"{_section_title(k)}: {v}" for k, v in entry.items() if _is_scalar(v) and str(v).strip()]
+    head = header + "; ".join(facts)
+    nested = {k: v for k, v in entry.items() if isinstance(v, list) and v and all(isinstance(x, dict) for x in v)}
+    bullets = {k: v for k, v in entry.items() if not _is_scalar(v) and k not in nested and v}
+
+    chunks = []
+    body = " ".join(f"{_section_title(k)}: {_flatten(v)}." for k, v in bullets.items())
+    whole = f"{section}: {head}. {body}".strip()
+    if bullets and len(whole) > RESUME_CHUNK_MAX_CHARS:
+        for k, v in bullets.items():
+            for item in (v if isinstance(v, list) else [v]):
+                chunks.append(f"{section}: {head}. {_section_title(k)}: {_flatten(item)}")
+    elif bullets or not nested:
+        # A header with only nested records is repeated in each record's chunk instead
+        chunks.append(whole)
+
+    for k, records in nested.items():
+        for record in records:
+            chunks.extend(_entry_chunks(section, record, header=f"{head}; " if head else ""))
+    return chunks
+
+
+def resume_chunks(parsed_resume):
+    """
+    Splits a parsed resume into section-aware chunks:
+    one for the profile/contact facts, one per entry of every list section
+    (each education row, job, project, achievement...) and one per group
+    of a dict section (e.g. each skills category).
+    Returns [(id, text, metadata)].
+    """
+    chunks = []
+
+    profile = [f"{_section_title(k)}: {v}" for k, v in parsed_resume.items() if _is_scalar(v) and str(v).strip()]
+    if profile:
+        name = parsed_resume.get("name", "the candidate")
+        chunks.append(("profile", 0, f"This is the resume of {name}. " + "; ".join(profile)))
+
+    for key, value in parsed_resume.items():
+        if _is_scalar(value) or not value or key.startswith(RESUME_SKIPPED_KEYS):
+            continue
+        section = _section_title(key)
+        if isinstance(value, list):
+            for i, entry in enumerate(value):
+                chunks.extend((key, i, text) for text in _entry_chunks(section, entry))
+        elif all(_is_scalar(v) for v in value.values()):
+            chunks.append((key, 0, f"{section}: {_flatten(value)}"))
+        else:
+            for i, (group, entry) in enumerate(value.items()):
+                chunks.extend((key, i, text) for text in _entry_chunks(section, entry, f"{_section_title(group)}: "))
+
+    # LLM-parsed resumes often repeat a section under two keys; keep one copy
+    result, seen = [], set()
+    for key, entry, text in chunks:
+        if text in seen:
+            continue
+        seen.add(text)
+        doc_id = f"resume:{key}:{entry}:{len(result)}"
+        result.append((doc_id, text, {"source": "resume", "section": _section_title(key), "key": key, "entry": entry}))
+    return result
+
+
 def embed_resume_text(parsed_resume):
     """
-    Create semantically rich embeddings from a structured resume JSON.
+    Create section-aware embeddings from a structured resume JSON:
+    one vector per section entry, tagged with its section, so retrieval
+    returns only the relevant slices of the resume.
     Saved to backend/data/embeddings/resume/resume_index/
     """
-    base_dir = os.path.join("data", "embeddings", "resume")
-    os.makedirs(base_dir, exist_ok=True)
-    index_name = "resume_index"
-
-    # --- Convert resume to descriptive text ---
-    resume_text = f"""
-    This is the resume of {parsed_resume.get('name', 'the candidate')}.
-
-    Contact Information:
-    Email: {parsed_resume.get('email', 'N/A')}
-    Phone: {parsed_resume.get('phone', 'N/A')}
-    LinkedIn: {parsed_resume.get('linkedin', 'N/A')}
-    GitHub: {parsed_resume.get('github', 'N/A')}
-
-    Education Background:
-    """ + "\n".join([
-        f"{e.get('degree', '')} at {e.get('institution', '')} ({e.get('period', '')}) "
-        f"with CGPA {e.get('cgpa', '')} in {e.get('location', '')}."
-        for e in parsed_resume.get("education", [])
-    ]) + """
-
-    Work Experience:
-    """ + "\n".join([
-        f"Served as {exp.get('role', '')} at {exp.get('company', '')} "
-        f"from {exp.get('start', '')} to {exp.get('end', '')}, "
-        f"where responsibilities included: {' '.join(exp.get('items', []))}"
-        for exp in parsed_resume.get("experience", [])
-    ]) + """
-
-    Achievements and Leadership:
-    """ + "\n".join([
-        f"{a.get('title', '')} ({a.get('category', '')}): {' '.join(a.get('items', []))}"
-        for a in parsed_resume.get("achievements", [])
-    ])
+    os.makedirs(RESUME_DIR, exist_ok=True)
+    chunks = resume_chunks(parsed_resume)
+    if not chunks:
+        raise ValueError("Parsed resume has no content to embed.")
 
     # --- Generate Embeddings ---
-    print("🔍 Generating embeddings for resume...")
+    print(f"🔍 Generating embeddings for {len(chunks)} resume chunks...")
     embeddings = get_embedding_model()
+    texts = [text for _, text, _ in chunks]
+    vectors = embed_texts_cached(texts)
 
-    db = FAISS.from_texts([resume_text], embedding=embeddings)
-    _save_faiss(db, base_dir, index_name)
+    from langchain_community.vectorstores import FAISS
+    db = FAISS.from_embeddings(
+        list(zip(texts, vectors)),
+        embeddings,
+        metadatas=[metadata for _, _, metadata in chunks],
+        ids=[doc_id for doc_id, _, _ in chunks],
+    )
+    _save_faiss(db, RESUME_DIR, RESUME_INDEX)
+    semantic_cache.invalidate("resume index rebuilt")
+    _sync_unified(chunks, "resume:", delete_missing=True)
 
-    print(f"✅ Resume embeddings stored successfully at {base_dir}\\{index_name}")
-    return os.path.join(base_dir, index_name)
+    print(f"✅ Resume embeddings stored successfully at {RESUME_DIR}\\{RESUME_INDEX}")
+    return os.path.join(RESUME_DIR, RESUME_INDEX)
 
 
 # ======================================================
 # Project Embedding Function
 # ======================================================
-def embed_project_summaries(projects):
-    """
-    Create semantic embeddings for summarized GitHub projects.
-    Saved to backend/data/embeddings/projects/projects_index/
-    """
-    base_dir = os.path.join("data", "embeddings", "projects")
-    os.makedirs(base_dir, exist_ok=True)
-    index_name = "projects_index"
+PROJECTS_DIR = os.path.join("data", "embeddings", "projects")
+PROJECTS_INDEX = "projects_index"
+PROJECT_ID_PREFIX = "project:"
 
-    # --- Convert each project to natural language ---
-    project_texts = []
-    for p in projects:
-        title = p.get("title", "Untitled Project")
-        tech = ", ".join(p.get("technologies", []))
-        features = "\n".join(p.get("features", []))
 
-        full_text = f"""
+def project_text(p):
+    """Natural-language form of a project summary; this is what gets embedded."""
+    title = p.get("title", "Untitled Project")
+    tech = ", ".join(p.get("technologies", []))
+    features = "\n".join(p.get("features", []))
+
+    full_text = f"""
         Project Title: {title}.
         Technologies Used: {tech}.
         Key Features:
         {features}.
         This project demonstrates skills in {tech} and practical experience in {title}.
         """
-        project_texts.append(full_text.strip())
+    return full_text.strip()
 
-    # --- Generate Embeddings ---
-    print(f"🔍 Generating embeddings for {len(project_texts)} projects...")
+
+def project_id(p):
+    """Index id of a project: its repository name (summaries without one fall back to the title)."""
+    return PROJECT_ID_PREFIX + (p.get("repository") or p.get("title") or "Untitled Project")
+
+
+# ======================================================
+# Incremental store updates (shared by the projects and unified indexes)
+# ======================================================
+def _load_store(save_dir, index_name, embeddings, id_prefixes):
+    """Writable copy of an index, or None if absent or holding ids it doesn't expect."""
+    index_base = resolve_index_base(save_dir, index_name)
+    if index_base is None:
+        return None
+    db = load_flat_faiss(index_base, embeddings, mmap=False)
+    ids = list(db.index_to_docstore_id.values())
+    if not all(str(i).startswith(id_prefixes) for i in ids):
+        print(f"🔁 {index_name} predates document ids — rebuilding it")
+        return None
+    return db
+
+
+def _load_bm25(db, save_dir, index_name):
+    """Keyword index matching `db`: the saved one if present, else built from the store."""
+    if db is None:
+        return BM25Index()
+    bm25_path = resolve_index_base(save_dir, index_name) + BM25_SUFFIX
+    if os.path.exists(bm25_path):
+        return BM25Index.load(bm25_path)
+    return BM25Index.from_store(db)
+
+
+def _stored_hashes(db):
+    hashes = {}
+    for doc_id in db.index_to_docstore_id.values():
+        doc = db.docstore.search(doc_id)
+        hashes[doc_id] = getattr(doc, "metadata", {}).get("text_hash")
+    return hashes
+
+
+def _sync_documents(save_dir, index_name, documents, scope, delete_missing=False, delete_ids=(),
+                    id_prefixes=None, reason="index updated"):
+    """
+    Brings the documents under `scope` (an id prefix) in line with
+    `documents` [(id, text, metadata)]: new and changed texts are embedded
+    (through the embedding cache) and added, stale vectors are deleted,
+    unchanged ones are left alone. With `delete_missing`, ids under `scope`
+    absent from `documents` are removed; `delete_ids` are always removed.
+    The FAISS store and its BM25 index are saved only if something moved.
+    Returns {"added", "updated", "deleted", "unchanged"} lists of ids.
+    """
     embeddings = get_embedding_model()
+    db = _load_store(save_dir, index_name, embeddings, id_prefixes or (scope,))
+    stored = _stored_hashes(db) if db is not None else {}
+
+    wanted = {doc_id: (text, text_hash(text), metadata) for doc_id, text, metadata in documents}
+
+    report = {"added": [], "updated": [], "deleted": [], "unchanged": []}
+    to_embed = []
+    for doc_id, (text, h, _) in wanted.items():
+        if doc_id not in stored:
+            report["added"].append(doc_id)
+            to_embed.append(doc_id)
+        elif stored[doc_id] != h:
+            report["updated"].append(doc_id)
+            to_embed.append(doc_id)
+        else:
+            report["unchanged"].append(doc_id)
+    report["deleted"] = [
+        doc_id for doc_id in stored
+        if doc_id not in wanted and (doc_id in delete_ids or (delete_missing and doc_id.startswith(scope)))
+    ]
+
+    if not to_embed and not report["deleted"]:
+        print(f"✅ {index_name} already up to date")
+        return report
+
+    bm25 = _load_bm25(db, save_dir, index_name)
+    stale = report["updated"] + report["deleted"]
+    if db is not None and stale:
+        db.delete(stale)
+        for doc_id in stale:
+            bm25.remove(doc_id)
+
+    if to_embed:
+        print(f"🔍 Generating embeddings for {len(to_embed)} documents of {index_name}...")
+        texts = [wanted[doc_id][0] for doc_id in to_embed]
+        vectors = embed_texts_cached(texts)
+        metadatas = [dict(wanted[doc_id][2], text_hash=wanted[doc_id][1]) for doc_id in to_embed]
+        pairs = list(zip(texts, vectors))
+        if db is None:
+            from langchain_community.vectorstores import FAISS
+            db = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas, ids=to_embed)
+        else:
+            db.add_embeddings(pairs, metadatas=metadatas, ids=to_embed)
+        for doc_id, text, metadata in zip(to_embed, texts, metadatas):
+            bm25.add(doc_id, text, metadata)
+
+    if db is not None:
+        _save_faiss(db, save_dir, index_name, bm25)
+        semantic_cache.invalidate(reason)
+    print(
+        f"✅ {index_name}: {len(report['added'])} added, {len(report['updated'])} updated, "
+        f"{len(report['deleted'])} deleted, {len(report['unchanged'])} unchanged"
+    )
+    return report
+
+
+def _project_documents(projects):
+    return [
+        (project_id(p), project_text(p),
+         {"source": "project", "repository": project_id(p)[len(PROJECT_ID_PREFIX):]})
+        for p in projects
+    ]
 
-    db = FAISS.from_texts(project_texts, embedding=embeddings)
-    _save_faiss(db, base_dir, index_name)
 
-    print(f"✅ Project embeddings stored successfully at {base_dir}\\{index_name}")
-    return os.path.join(base_dir, index_name)
+def upsert_project_summaries(projects, delete_missing=False):
+    """
+    Adds new projects and replaces changed ones in the projects index (and
+    the unified index), keyed by repository. Only texts never embedded
+    before reach the model (see embedding_cache); unchanged projects are
+    left untouched. With `delete_missing`, projects absent from `projects`
+    are removed.
+    Returns {"added", "updated", "deleted", "unchanged"} lists of repo ids.
+    """
+    documents = _project_documents(projects)
+    report = _sync_documents(PROJECTS_DIR, PROJECTS_INDEX, documents, PROJECT_ID_PREFIX,
+                             delete_missing=delete_missing, reason="projects index updated")
+    _sync_unified(documents, PROJECT_ID_PREFIX, delete_missing=delete_missing)
+    return report
+
+
+def delete_project_embeddings(repo_names):
+    """Removes the given repositories from the projects and unified indexes."""
+    ids = [PROJECT_ID_PREFIX + name for name in repo_names]
+    report = _sync_documents(PROJECTS_DIR, PROJECTS_INDEX, [], PROJECT_ID_PREFIX,
+                             delete_ids=ids, reason="projects removed from index")
+    code_prefixes = tuple(f"{CODE_ID_PREFIX}{name}:" for name in repo_names)
+    _sync_unified([], PROJECT_ID_PREFIX, delete_ids=ids + _unified_ids(code_prefixes))
+    return report["deleted"]
+
+
+def embed_project_summaries(projects):
+    """
+    Create semantic embeddings for summarized GitHub projects.
+    Saved to backend/data/embeddings/projects/projects_index/
+
+    The index ends up holding exactly `projects`, but only new or changed
+    projects are embedded; see `upsert_project_summaries`.
+    """
+    os.makedirs(PROJECTS_DIR, exist_ok=True)
+    upsert_project_summaries(projects, delete_missing=True)
+    print(f"✅ Project embeddings stored successfully at {PROJECTS_DIR}\\{PROJECTS_INDEX}")
+    return os.path.join(PROJECTS_DIR, PROJECTS_INDEX)
+
+
+# ======================================================
+# Unified Index (resume + projects + code, one search)
+# ======================================================
+UNIFIED_DIR = os.path.join("data", "embeddings", "unified")
+UNIFIED_INDEX = "unified_index"
+CODE_ID_PREFIX = "code:"
+UNIFIED_ID_PREFIXES = ("resume:", PROJECT_ID_PREFIX, CODE_ID_PREFIX)
+CODE_CHUNK_CHARS = 800
+CODE_CHUNKS_PER_REPO = 6
+
+
+def _sync_unified(documents, scope, delete_missing=False, delete_ids=()):
+    """Mirrors one source's documents into the unified index; every vector carries `source`."""
+    return _sync_documents(UNIFIED_DIR, UNIFIED_INDEX, documents, scope,
+                           delete_missing=delete_missing, delete_ids=delete_ids,
+                           id_prefixes=UNIFIED_ID_PREFIXES, reason="unified index updated")
+
+
+def _unified_ids(prefixes):
+    index_base = resolve_index_base(UNIFIED_DIR, UNIFIED_INDEX)
+    if index_base is None or not os.path.exists(index_base + BM25_SUFFIX):
+        return []
+    return [doc_id for doc_id in BM25Index.load(index_base + BM25_SUFFIX).docs if doc_id.startswith(prefixes)]
+
+
+def code_documents(analysis):
+    """
+    Code-side documents of one analysed repository (see github_service):
+    its README split into paragraphs packed up to CODE_CHUNK_CHARS, plus
+    the dependency file and the file list.
+    """
+    repo = analysis.get("repository", "UnnamedRepo")
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", analysis.get("readme") or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) > CODE_CHUNK_CHARS:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}".strip()[:CODE_CHUNK_CHARS]
+    if current:
+        chunks.append(current)
+    chunks = [f"README of repository {repo}:\n{c}" for c in chunks[:CODE_CHUNKS_PER_REPO - 2]]
+
+    if analysis.get("requirements"):
+        chunks.append(f"Dependencies of repository {repo}:\n{analysis['requirements'][:CODE_CHUNK_CHARS]}")
+    if analysis.get("files_name"):
+        chunks.append(f"Files in repository {repo}: " + ", ".join(analysis["files_name"])[:CODE_CHUNK_CHARS])
+
+    return [
+        (f"{CODE_ID_PREFIX}{repo}:{i}", text, {"source": "code", "repository": repo})
+        for i, text in enumerate(chunks)
+    ]
+
+
+def embed_repository_code(analyses):
+    """
+    Indexes README/dependency/file-list chunks of the analysed repositories
+    in the unified index; code of repositories not in `analyses` is removed.
+    """
+    documents = [doc for analysis in analyses for doc in code_documents(analysis)]
+    return _sync_unified(documents, CODE_ID_PREFIX, delete_missing=True)
 
 
 # ======================================================
@@ -3,8 +3,13 @@ import base64
 import ast
 import json
 import os
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from .http_cache import http_cache
+from ..config import safe_int_env
 
 load_dotenv()
 
@@ -13,13 +18,6 @@ EXCLUDED_DIRS = {"venv", "__pycache__", "node_modules", "dist", "build", ".git"}
 INCLUDE_EXTENSIONS = {".py", ".js", ".ts", ".ipynb", ".java"}
 
 
-def safe_int_env(var_name: str, default: int) -> int:
-    val = os.getenv(var_name)
-    try:
-        return int(val) if val is not None else default
-    except ValueError:
-        return default
-
 OUTPUT_DIR = "data/github_repos"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
@@ -29,6 +27,19 @@ HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 
 MAX_FILE_SIZE = safe_int_env("MAX_FILE_SIZE", 50000)  # default 50 KB
 MAX_LINES = safe_int_env("MAX_LINES", 500)            # default 500 lines
+MAX_REPO_WORKERS = safe_int_env("GITHUB_MAX_WORKERS", 8)  # repositories analyzed in parallel
+
+README_NAMES = ("readme.md", "readme.rst", "readme.txt", "readme")
+REQUIREMENTS_NAMES = ("requirements.txt", "setup.py", "pyproject.toml")
+
+
+# One pooled session for every GitHub call: connections are kept alive
+# across requests and shared by the worker threads. Requests go through
+# http_cache so unchanged resources come back as free 304s.
+session = requests.Session()
+session.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(MAX_REPO_WORKERS * 2, 10))
+session.mount("https://", _adapter)
 
 
 
@@ -36,23 +47,94 @@ MAX_LINES = safe_int_env("MAX_LINES", 500)            # default 500 lines
 # ---------- CORE FETCHERS ----------
 
 def fetch_github_repos(username: str) -> List[Dict]:
+    """All of the user's repositories, following the Link header page by page."""
     url = f"https://api.github.com/users/{username}/repos"
-    resp = requests.get(url, headers=HEADERS)
-    if resp.status_code != 200:
-        print(f"[ERROR] Failed to fetch repos: {resp.status_code}")
-        return []
-    data = resp.json()
+    params = {"per_page": 100}
+    data = []
+    while url:
+        resp = http_cache.get(session, url, params=params)
+        if resp.status_code != 200:
+            print(f"[ERROR] Failed to fetch repos: {resp.status_code}")
+            return data
+        data.extend(resp.json())
+        # The next-page URL already carries the query string
+        url, params = resp.links.get("next", {}).get("url"), None
     print(f"[INFO] Found {len(data)} repositories for '{username}'.")
     return data
 
 
+def _is_wanted(path: str, size: int) -> bool:
+    """Same filter for both crawlers: source extension, size cap, no vendored dirs."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in INCLUDE_EXTENSIONS or size > MAX_FILE_SIZE:
+        return False
+    return not any(ex in path.lower() for ex in EXCLUDED_DIRS)
+
+
+def fetch_default_branch(owner: str, repo: str) -> str:
+    resp = http_cache.get(session, f"https://api.github.com/repos/{owner}/{repo}")
+    if resp.status_code != 200:
+        print(f"[WARN] Cannot read '{repo}' metadata (HTTP {resp.status_code}); assuming 'main'")
+        return "main"
+    return resp.json().get("default_branch") or "main"
+
+
+def fetch_head_sha(owner: str, repo: str, branch: str) -> Optional[str]:
+    """Commit SHA at the tip of `branch`; None for empty or unreachable repositories."""
+    resp = http_cache.get(session, f"https://api.github.com/repos/{owner}/{repo}/branches/{quote(branch)}")
+    if resp.status_code != 200:
+        print(f"[WARN] Cannot read head of '{repo}' (HTTP {resp.status_code})")
+        return None
+    return resp.json().get("commit", {}).get("sha")
+
+
+def fetch_repo_tree(owner: str, repo: str, branch: str, all_files: List[str] = None) -> Optional[List[Dict]]:
+    """
+    Lists the whole repository with one recursive Git Trees call.
+
+    Records every file path in `all_files` and returns the filtered file
+    items in the same shape as the contents API (name, path, size, url,
+    download_url). Returns None when the tree is unavailable or truncated
+    by GitHub, so the caller can fall back to the per-directory walk.
+    """
+    if all_files is None:
+        all_files = []
+
+    url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{quote(branch)}"
+    resp = http_cache.get(session, url, params={"recursive": "1"})
+    if resp.status_code != 200:
+        print(f"[WARN] Cannot fetch tree of '{repo}' (HTTP {resp.status_code})")
+        return None
+    data = resp.json()
+    if data.get("truncated"):
+        print(f"[WARN] Tree of '{repo}' is truncated; walking directories instead")
+        return None
+
+    filtered_files = []
+    for entry in data.get("tree", []):
+        if entry.get("type") != "blob":
+            continue
+        path = entry["path"]
+        all_files.append(path)
+        if _is_wanted(path, entry.get("size", 0)):
+            filtered_files.append({
+                "name": os.path.basename(path),
+                "path": path,
+                "size": entry.get("size", 0),
+                "url": entry.get("url"),
+                # "#", "?", "%" and spaces are legal in names but not in a URL path
+                "download_url": f"https://raw.githubusercontent.com/{owner}/{repo}/{quote(branch)}/{quote(path)}",
+            })
+    return filtered_files
+
+
 def fetch_repo_contents(owner: str, repo: str, path: str = "", all_files: List[str] = None) -> List[Dict]:
     """Recursively fetch contents of a repository and record *all* file names."""
     if all_files is None:
         all_files = []
 
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    resp = requests.get(url, headers=HEADERS)
+    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path)}"
+    resp = http_cache.get(session, url)
     if resp.status_code != 200:
         print(f"[WARN] Cannot fetch '{path}' in '{repo}' (HTTP {resp.status_code})")
         return []
@@ -66,11 +148,9 @@ def fetch_repo_contents(owner: str, repo: str, path: str = "", all_files: List[s
             fetch_repo_contents(owner, repo, item["path"], all_files)
         elif item["type"] == "file":
             all_files.append(item["path"])  # ✅ record every file, regardless of filter
-            ext = os.path.splitext(item["name"])[1].lower()
-            if ext in INCLUDE_EXTENSIONS and item["size"] <= MAX_FILE_SIZE:
-                # filter only relevant files for deeper analysis
-                if not any(ex in item["path"].lower() for ex in EXCLUDED_DIRS):
-                    filtered_files.append(item)
+            # filter only relevant files for deeper analysis
+            if _is_wanted(item["path"], item["size"]):
+                filtered_files.append(item)
     return filtered_files
 
 
@@ -80,13 +160,13 @@ def fetch_file_text(item: Dict) -> str:
     """Fetch file content using download_url or Base64 API fallback."""
     url = item.get("download_url")
     if url:
-        resp = requests.get(url, headers=HEADERS)
+        resp = http_cache.get(session, url)
         if resp.status_code == 200:
             return resp.text
 
     api_url = item.get("url")
     if api_url:
-        resp = requests.get(api_url, headers=HEADERS)
+        resp = http_cache.get(session, api_url)
         if resp.status_code == 200:
             data = resp.json()
             if data.get("encoding") == "base64":
@@ -96,68 +176,135 @@ def fetch_file_text(item: Dict) -> str:
 
 # ---------- MAIN ANALYZER ----------
 
-def analyze_repository(owner: str, repo: str) -> Dict:
+def _find_root_file(all_files: List[str], candidates) -> Optional[str]:
+    """First of `candidates` (case-insensitive) present at the repository root."""
+    root_files = {path.lower(): path for path in all_files if "/" not in path}
+    for name in candidates:
+        if name in root_files:
+            return root_files[name]
+    return None
+
+
+def fetch_raw_file(owner: str, repo: str, branch: str, path: Optional[str]) -> str:
+    if not path:
+        return ""
+    resp = http_cache.get(session, f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}")
+    return resp.text if resp.status_code == 200 else ""
+
+
+def analyze_repository(owner: str, repo: str, default_branch: Optional[str] = None,
+                       head_sha: Optional[str] = None) -> Dict:
     print(f"\n[INFO] 🔍 Analyzing repository '{repo}'...")
+    branch = default_branch or fetch_default_branch(owner, repo)
+    # Pinning to the commit keeps the listing and the files consistent with head_sha
+    ref = head_sha or branch
 
     repo_data = {
         "repository": repo,
         "readme": "",
         "requirements": "",
-        "files_name": []
+        "files_name": [],
+        "default_branch": branch,
+        "head_sha": head_sha,
     }
 
-    # --- Fetch top-level README and requirements.txt ---
-    for file_name in ["README.md", "readme.md"]:
-        url = f"https://raw.githubusercontent.com/{owner}/{repo}/main/{file_name}"
-        resp = requests.get(url, headers=HEADERS)
-        if resp.status_code == 200:
-            repo_data["readme"] = resp.text
-            break
-
-    for req_file in ["requirements.txt", "setup.py"]:
-        url = f"https://raw.githubusercontent.com/{owner}/{repo}/main/{req_file}"
-        resp = requests.get(url, headers=HEADERS)
-        if resp.status_code == 200:
-            repo_data["requirements"] = resp.text
-            break
-
     all_files_collector = []
-    filtered_files = fetch_repo_contents(owner, repo, "", all_files_collector)
+    filtered_files = fetch_repo_tree(owner, repo, ref, all_files_collector)
+    if filtered_files is None:
+        all_files_collector = []
+        filtered_files = fetch_repo_contents(owner, repo, "", all_files_collector)
     repo_data["files_name"] = all_files_collector  # ✅ store all file names
 
+    # --- README and requirements: pick the real file names from the listing ---
+    repo_data["readme"] = fetch_raw_file(owner, repo, ref, _find_root_file(all_files_collector, README_NAMES))
+    repo_data["requirements"] = fetch_raw_file(
+        owner, repo, ref, _find_root_file(all_files_collector, REQUIREMENTS_NAMES)
+    )
+
     return repo_data
 
 
 # ---------- ENTRY POINT ----------
 
-def fetch_and_analyze_github(username: str):
+def _save_analysis(analysis: Dict, save_path: str):
+    with open(save_path, "w", encoding="utf-8") as f:
+        json.dump(analysis, f, ensure_ascii=False, indent=2)
+    print(f"[SAVED] 💾 {save_path}")
+
+
+def _refresh_repository(username: str, repo: Dict, save_path: str, existing: Optional[Dict]):
+    """
+    Re-crawls `repo` only when its head commit moved since `existing` was
+    saved. Returns (analysis, changed).
+    """
+    repo_name = repo.get("name")
+    branch = repo.get("default_branch") or fetch_default_branch(username, repo_name)
+    head_sha = fetch_head_sha(username, repo_name, branch)
+
+    if existing and (head_sha is None or existing.get("head_sha") == head_sha):
+        # Pushed to another branch (or head unreadable): keep the analysis, remember pushed_at
+        print(f"[SKIP] 💤 '{repo_name}' head unchanged. Skipping...")
+        existing["pushed_at"] = repo.get("pushed_at")
+        _save_analysis(existing, save_path)
+        return existing, False
+
+    analysis = analyze_repository(username, repo_name, branch, head_sha)
+    analysis["pushed_at"] = repo.get("pushed_at")
+    _save_analysis(analysis, save_path)
+    return analysis, True
+
+
+def sync_github_repos(username: str) -> Dict:
+    """
+    Brings data/github_repos up to date with the user's repositories.
+
+    Repos whose `pushed_at` matches the stored analysis are reused without
+    any request; the rest have their head SHA compared and are re-crawled
+    only if it changed. Returns {"repos": [...], "changed": [repo names]}.
+    """
     repos = fetch_github_repos(username)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    results = []
-    for r in repos:
+    results = [None] * len(repos)
+    changed = []
+    pending = []
+    for i, r in enumerate(repos):
         repo_name = r.get("name")
         save_path = os.path.join(OUTPUT_DIR, f"{repo_name}.json")
 
-        # ✅ Skip repo if JSON already exists
+        existing = None
         if os.path.exists(save_path):
-            print(f"[SKIP] 💤 '{repo_name}' already analyzed. Skipping...")
-            # Optionally, load the data instead of re-fetching
             with open(save_path, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-            results.append(existing_data)
-            continue
+                existing = json.load(f)
+            # ✅ Nothing pushed since the last analysis
+            if existing.get("head_sha") and existing.get("pushed_at") == r.get("pushed_at"):
+                print(f"[SKIP] 💤 '{repo_name}' already analyzed. Skipping...")
+                results[i] = existing
+                continue
+        pending.append((i, r, save_path, existing))
+
+    # Check/analyze the remaining repositories concurrently, keeping the listing order
+    if pending:
+        with ThreadPoolExecutor(max_workers=MAX_REPO_WORKERS, thread_name_prefix="github") as pool:
+            futures = [
+                (i, existing, pool.submit(_refresh_repository, username, r, path, existing))
+                for i, r, path, existing in pending
+            ]
+            for i, existing, future in futures:
+                try:
+                    results[i], was_changed = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Failed to analyze '{repos[i].get('name')}': {e}")
+                    results[i], was_changed = existing, False
+                if was_changed:
+                    changed.append(results[i]["repository"])
+
+    print(f"[INFO] {len(changed)} of {len(repos)} repositories changed since the last analysis.")
+    return {"repos": [r for r in results if r is not None], "changed": changed}
 
-        # Otherwise analyze normally
-        analysis = analyze_repository(username, repo_name)
-        results.append(analysis)
 
-        # Save the new analysis
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(analysis, f, ensure_ascii=False, indent=2)
-        print(f"[SAVED] 💾 {save_path}")
-
-    return results
+def fetch_and_analyze_github(username: str):
+    return sync_github_repos(username)["repos"]
 
 
 if __name__ == "__main__":
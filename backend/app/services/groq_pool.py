@@ -0,0 +1,432 @@
+# backend/app/services/groq_pool.py
+#
+# One shared pool of Groq clients for every LLM call in the app.
+# - one pooled HTTP connection per API key, reused by every model/temperature
+# - per-key request/token budgets tracked from Groq's x-ratelimit-* headers
+# - each call goes to the least-loaded healthy key
+# - 429 / 5xx / connection errors are retried with backoff on another key
+# - invoke/ainvoke answers are cached on disk (see llm_cache)
+# - invoke/ainvoke are traced as "llm.call" spans (key slot, tokens, cache hit)
+
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+import weakref
+import httpx
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from dotenv import load_dotenv
+from .llm_cache import LLM_CACHE_ENABLED, LeaderAbandoned, cache_key, llm_cache
+from ..utils.tracing import current_span, span
+from ..config import safe_int_env
+
+load_dotenv()
+
+
+POOL_MAX_RETRIES = safe_int_env("GROQ_POOL_MAX_RETRIES", 4)
+POOL_BACKOFF_BASE = 0.5   # seconds, doubled on every retry
+POOL_BACKOFF_MAX = 20.0
+POOL_MAX_CONNECTIONS = safe_int_env("GROQ_POOL_MAX_CONNECTIONS", 10)  # per key
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def _parse_duration(value) -> float:
+    """Groq reset headers look like "2m59.56s", "7.66s" or "120ms"."""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    scale = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(n) * scale[unit] for n, unit in _DURATION_RE.findall(value))
+
+
+def _load_api_keys():
+    keys = [os.getenv(f"GROQ_API_KEY_{i}") for i in range(1, 6)]
+    keys = [k for k in keys if k]
+    # Single-key setups (GROQ_API_KEY, as used by the LangGraph nodes) work too
+    if not keys and os.getenv("GROQ_API_KEY"):
+        keys = [os.getenv("GROQ_API_KEY")]
+    return keys
+
+
+# ======================================================
+# Per-key state
+# ======================================================
+class KeySlot:
+    """Budget and health of one API key, updated from every response it gets."""
+
+    def __init__(self, slot: int, api_key: str):
+        self.slot = slot
+        self.api_key = api_key
+        self.in_flight = 0
+        self.limit_requests = self.remaining_requests = None
+        self.limit_tokens = self.remaining_tokens = None
+        self.requests_reset_at = self.tokens_reset_at = 0.0
+        self.cooldown_until = 0.0
+        self.failures = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._http_client = None
+        # Async connections belong to the loop that opened them: one client per loop
+        self._http_async_clients = weakref.WeakKeyDictionary()
+
+    def update_from_headers(self, headers):
+        now = time.time()
+        with self._lock:
+            if "x-ratelimit-remaining-requests" in headers:
+                self.limit_requests = int(float(headers.get("x-ratelimit-limit-requests", 0))) or None
+                self.remaining_requests = int(float(headers["x-ratelimit-remaining-requests"]))
+                self.requests_reset_at = now + _parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if "x-ratelimit-remaining-tokens" in headers:
+                self.limit_tokens = int(float(headers.get("x-ratelimit-limit-tokens", 0))) or None
+                self.remaining_tokens = int(float(headers["x-ratelimit-remaining-tokens"]))
+                self.tokens_reset_at = now + _parse_duration(headers.get("x-ratelimit-reset-tokens"))
+
+    def _fraction_left(self, remaining, limit, reset_at, now):
+        if remaining is None or not limit or now >= reset_at:
+            return 1.0  # unknown or already refilled
+        return remaining / limit
+
+    def load_score(self, now: float) -> float:
+        """Higher is better: the tighter of request/token headroom, minus calls in flight."""
+        with self._lock:
+            headroom = min(
+                self._fraction_left(self.remaining_requests, self.limit_requests, self.requests_reset_at, now),
+                self._fraction_left(self.remaining_tokens, self.limit_tokens, self.tokens_reset_at, now),
+            )
+            return headroom - 0.05 * self.in_flight
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def cool_down(self, seconds: float):
+        with self._lock:
+            self.cooldown_until = max(self.cooldown_until, time.time() + seconds)
+            self.failures += 1
+
+    def http_client(self):
+        if self._http_client is None:
+            self._http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=POOL_MAX_CONNECTIONS),
+                event_hooks={"response": [lambda r: self.update_from_headers(r.headers)]},
+            )
+        return self._http_client
+
+    def http_async_client(self, loop):
+        with self._lock:
+            client = self._http_async_clients.get(loop)
+            if client is None:
+                async def on_response(response):
+                    self.update_from_headers(response.headers)
+
+                client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=POOL_MAX_CONNECTIONS),
+                    event_hooks={"response": [on_response]},
+                )
+                self._http_async_clients[loop] = client
+            return client
+
+    def snapshot(self, now: float) -> dict:
+        with self._lock:
+            return {
+                "slot": self.slot,
+                "healthy": now >= self.cooldown_until,
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "failures": self.failures,
+                "remaining_requests": self.remaining_requests,
+                "remaining_tokens": self.remaining_tokens,
+            }
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _is_retryable(exc) -> bool:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429 or (status is not None and status >= 500):
+        return True
+    import groq
+    return isinstance(exc, (groq.APIConnectionError, groq.APITimeoutError))
+
+
+def _retry_after(exc, attempt: int) -> float:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    if headers.get("retry-after"):
+        return _parse_duration(headers["retry-after"])
+    backoff = min(POOL_BACKOFF_MAX, POOL_BACKOFF_BASE * 2 ** attempt)
+    return backoff + random.uniform(0, backoff / 2)
+
+
+# ======================================================
+# Pool
+# ======================================================
+class GroqClientPool:
+    """
+    `client_factory(slot, model, temperature)` builds the chat model used
+    on a key; ChatGroq by default. Benchmarks pass one returning a stub.
+    Models built inside a running event loop are cached for that loop
+    only, since their async connections can't be used from another one.
+    """
+
+    def __init__(self, api_keys=None, client_factory=None):
+        self._slots = [KeySlot(i + 1, key) for i, key in enumerate(api_keys or _load_api_keys())]
+        self._client_factory = client_factory or self._groq_client
+        self._clients = {}
+        self._loop_clients = weakref.WeakKeyDictionary()  # loop -> {key: model}
+        self._lock = threading.Lock()
+
+    def _require_slots(self):
+        if not self._slots:
+            raise RuntimeError("No Groq API key configured (GROQ_API_KEY_1..5 or GROQ_API_KEY).")
+
+    def _pick_slot(self) -> tuple:
+        """Returns (slot, seconds to wait before using it)."""
+        self._require_slots()
+        now = time.time()
+        with self._lock:
+            healthy = [s for s in self._slots if s.healthy(now)]
+            if healthy:
+                # Ties (e.g. no headers seen yet) go to the key used least so far
+                slot = max(healthy, key=lambda s: (s.load_score(now), -s.calls))
+                wait = 0.0
+            else:
+                # Every key is cooling down: wait for the one that recovers first
+                slot = min(self._slots, key=lambda s: s.cooldown_until)
+                wait = slot.cooldown_until - now
+            slot.in_flight += 1
+            slot.calls += 1
+        return slot, wait
+
+    def _release(self, slot):
+        with self._lock:
+            slot.in_flight -= 1
+
+    def client(self, slot: KeySlot, model: str, temperature: float):
+        key = (slot.slot, model, temperature)
+        loop = _running_loop()
+        with self._lock:
+            clients = self._clients if loop is None else self._loop_clients.setdefault(loop, {})
+            llm = clients.get(key)
+        if llm is None:
+            llm = self._client_factory(slot, model, temperature)
+            with self._lock:
+                llm = clients.setdefault(key, llm)
+        return llm
+
+    @staticmethod
+    def _groq_client(slot: KeySlot, model: str, temperature: float):
+        from langchain_groq import ChatGroq  # groq SDK loads on the first call, not at import
+        loop = _running_loop()
+        async_client = {"http_async_client": slot.http_async_client(loop)} if loop is not None else {}
+        return ChatGroq(
+            api_key=slot.api_key,
+            model=model,
+            temperature=temperature,
+            max_retries=0,  # retries are scheduled here, onto other keys
+            http_client=slot.http_client(),
+            **async_client,
+        )
+
+    def run(self, model: str, temperature: float, call):
+        """Runs call(llm) on the best key, retrying on other keys when rate-limited or failing."""
+        for attempt in range(POOL_MAX_RETRIES + 1):
+            slot, wait = self._pick_slot()
+            current_span().set(key_slot=slot.slot, attempts=attempt + 1)
+            try:
+                if wait > 0:
+                    time.sleep(wait)
+                return call(self.client(slot, model, temperature))
+            except Exception as e:
+                if attempt == POOL_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _retry_after(e, attempt)
+                slot.cool_down(delay)
+                print(f"⏳ Groq key #{slot.slot} failed ({type(e).__name__}); retrying on another key")
+            finally:
+                self._release(slot)
+
+    async def arun(self, model: str, temperature: float, call):
+        """Async `run`; `call(llm)` must return an awaitable."""
+        for attempt in range(POOL_MAX_RETRIES + 1):
+            slot, wait = self._pick_slot()
+            current_span().set(key_slot=slot.slot, attempts=attempt + 1)
+            try:
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                return await call(self.client(slot, model, temperature))
+            except Exception as e:
+                if attempt == POOL_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                slot.cool_down(_retry_after(e, attempt))
+                print(f"⏳ Groq key #{slot.slot} failed ({type(e).__name__}); retrying on another key")
+            finally:
+                self._release(slot)
+
+    def healthy_key_count(self) -> int:
+        now = time.time()
+        return sum(1 for s in self._slots if s.healthy(now))
+
+    def stats(self) -> list:
+        now = time.time()
+        return [s.snapshot(now) for s in self._slots]
+
+
+class PooledChatGroq(Runnable):
+    """
+    Drop-in for ChatGroq: supports invoke / ainvoke / stream / astream and
+    `prompt | llm` chains, but every call is scheduled through the pool.
+
+    invoke/ainvoke go through the shared response cache unless the model
+    was created with `cache=False` or the call passes `cache=False`
+    (for prompts that should give a fresh answer each time). Streams are
+    never cached.
+    """
+
+    def __init__(self, pool: GroqClientPool, model: str, temperature: float, cache: bool = True):
+        self.pool = pool
+        self.model = model
+        self.temperature = temperature
+        self.cache = cache
+
+    def _cache_key(self, input, cache):
+        use_cache = self.cache if cache is None else cache
+        return cache_key(self.model, self.temperature, input) if use_cache and LLM_CACHE_ENABLED else None
+
+    @staticmethod
+    def _cached_message(content):
+        return AIMessage(content=content, response_metadata={"cached": True})
+
+    @staticmethod
+    def _record_usage(s, resp):
+        usage = getattr(resp, "usage_metadata", None) or {}
+        s.set(
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            cache_hit=bool(getattr(resp, "response_metadata", {}).get("cached")),
+        )
+        return resp
+
+    def invoke(self, input, config=None, cache=None, **kwargs):
+        with span("llm.call", model=self.model, temperature=self.temperature) as s:
+            return self._record_usage(s, self._invoke(input, config, cache, **kwargs))
+
+    async def ainvoke(self, input, config=None, cache=None, **kwargs):
+        with span("llm.call", model=self.model, temperature=self.temperature) as s:
+            return self._record_usage(s, await self._ainvoke(input, config, cache, **kwargs))
+
+    def _invoke(self, input, config=None, cache=None, **kwargs):
+        key = self._cache_key(input, cache)
+        if key is None:
+            return self.pool.run(self.model, self.temperature, lambda llm: llm.invoke(input, config, **kwargs))
+
+        while True:
+            content, in_flight = llm_cache.claim(key)
+            if content is not None:
+                return self._cached_message(content)
+            if in_flight is None:
+                break
+            try:
+                return self._cached_message(in_flight.result())
+            except LeaderAbandoned:
+                continue  # the caller asking the model was cancelled; ask again
+        try:
+            resp = self.pool.run(self.model, self.temperature, lambda llm: llm.invoke(input, config, **kwargs))
+        except BaseException as e:
+            # Always resolve the key, or identical calls would wait on it forever
+            llm_cache.finish(key, self.model, error=e)
+            raise
+        llm_cache.finish(key, self.model, content=resp.content)
+        return resp
+
+    async def _ainvoke(self, input, config=None, cache=None, **kwargs):
+        key = self._cache_key(input, cache)
+        if key is None:
+            return await self.pool.arun(self.model, self.temperature, lambda llm: llm.ainvoke(input, config, **kwargs))
+
+        while True:
+            content, in_flight = llm_cache.claim(key)
+            if content is not None:
+                return self._cached_message(content)
+            if in_flight is None:
+                break
+            try:
+                return self._cached_message(await asyncio.wrap_future(in_flight))
+            except LeaderAbandoned:
+                continue
+        try:
+            resp = await self.pool.arun(self.model, self.temperature, lambda llm: llm.ainvoke(input, config, **kwargs))
+        except BaseException as e:
+            # Includes CancelledError from an abandoned speculative task
+            llm_cache.finish(key, self.model, error=e)
+            raise
+        llm_cache.finish(key, self.model, content=resp.content)
+        return resp
+
+    def stream(self, input, config=None, **kwargs):
+        # Retry only before the first chunk: once tokens were shown they can't be taken back
+        def first_chunk(llm):
+            iterator = iter(llm.stream(input, config, **kwargs))
+            return next(iterator, None), iterator
+
+        chunk, iterator = self.pool.run(self.model, self.temperature, first_chunk)
+        if chunk is None:
+            return
+        yield chunk
+        yield from iterator
+
+    async def astream(self, input, config=None, **kwargs):
+        async def first_chunk(llm):
+            iterator = llm.astream(input, config, **kwargs).__aiter__()
+            try:
+                return await iterator.__anext__(), iterator
+            except StopAsyncIteration:
+                return None, iterator
+
+        chunk, iterator = await self.pool.arun(self.model, self.temperature, first_chunk)
+        if chunk is None:
+            return
+        yield chunk
+        async for chunk in iterator:
+            yield chunk
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> GroqClientPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = GroqClientPool()
+    return _pool
+
+
+def set_pool(pool: GroqClientPool):
+    """
+    Replaces the process-wide pool. Models already returned by `get_llm`
+    keep the pool they were created with, so call this before importing
+    modules that build their LLMs at import time (the LangGraph nodes).
+    """
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+def get_llm(model: str = "openai/gpt-oss-120b", temperature: float = 0.7, cache: bool = True) -> PooledChatGroq:
+    """Returns a pooled chat model; cheap to call, no client is built here."""
+    return PooledChatGroq(get_pool(), model, temperature, cache)
@@ -0,0 +1,197 @@
+# backend/app/services/http_cache.py
+#
+# Persistent conditional-request cache for the GitHub fetchers.
+# Every 200 response carrying an ETag or Last-Modified is stored in SQLite;
+# the next request for the same URL is sent with If-None-Match /
+# If-Modified-Since, and a 304 answer (which GitHub does not count against
+# the rate limit) is served from the stored body.
+#
+# Inspect or clear it with:
+#   python -m backend.app.services.http_cache [--clear]
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import requests
+from requests.utils import parse_header_links
+from ..config import safe_int_env
+
+
+HTTP_CACHE_PATH = os.getenv("GITHUB_HTTP_CACHE_PATH", os.path.join("data", "http_cache.sqlite"))
+HTTP_CACHE_MAX_ENTRIES = safe_int_env("GITHUB_HTTP_CACHE_MAX_ENTRIES", 5000)
+
+
+class CachedResponse:
+    """The parts of requests.Response the fetchers use, rebuilt from a cache row."""
+
+    def __init__(self, url: str, body: bytes, headers: dict):
+        self.url = url
+        self.status_code = 200
+        self.content = body
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    @property
+    def links(self) -> dict:
+        header = self.headers.get("link")
+        if not header:
+            return {}
+        return {link.get("rel") or link.get("url"): link for link in parse_header_links(header)}
+
+
+class HttpCache:
+    """
+    URL -> (validators, body) store, bounded to `max_entries` rows by
+    least-recent use. Safe to share between threads.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._counters = {"hits": 0, "misses": 0, "stored": 0}
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       url TEXT PRIMARY KEY,
+                       etag TEXT,
+                       last_modified TEXT,
+                       headers TEXT NOT NULL,
+                       body BLOB NOT NULL,
+                       fetched_at REAL NOT NULL,
+                       last_used REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        return self._conn
+
+    def validators(self, url: str) -> dict:
+        """Conditional headers for `url`, empty when nothing is cached."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return {}
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def load(self, url: str):
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT headers, body FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+        return CachedResponse(url, row[1], json.loads(row[0]))
+
+    def store(self, url: str, resp) -> bool:
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return False
+        # Only headers the callers read back (pagination links, validators)
+        kept = {k: v for k, v in resp.headers.items() if k.lower() in ("link", "etag", "last-modified", "content-type")}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(kept), resp.content, now, now),
+            )
+            self._counters["stored"] += 1
+            self._prune(conn)
+            conn.commit()
+        return True
+
+    def _prune(self, conn):
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE url IN "
+                "(SELECT url FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def get(self, session, url: str, params=None):
+        """
+        GET through `session` with conditional headers. Returns the live
+        response, or a CachedResponse when the server answered 304.
+        """
+        full_url = requests.Request("GET", url, params=params).prepare().url
+        resp = session.get(full_url, headers=self.validators(full_url))
+        if resp.status_code == 304:
+            cached = self.load(full_url)
+            if cached is not None:
+                with self._lock:
+                    self._counters["hits"] += 1
+                return cached
+            # Row pruned in between: ask again without validators
+            resp = session.get(full_url)
+        with self._lock:
+            self._counters["misses"] += 1
+        if resp.status_code == 200:
+            self.store(full_url, resp)
+        return resp
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+            ).fetchone()
+            return {**self._counters, "entries": entries, "body_bytes": size, "max_entries": self.max_entries}
+
+    def entries(self, limit: int = 20) -> list:
+        """Most recently used rows, for inspection."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT url, etag, last_modified, LENGTH(body), fetched_at, last_used "
+                "FROM responses ORDER BY last_used DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        keys = ("url", "etag", "last_modified", "bytes", "fetched_at", "last_used")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+# Process-wide instance shared by every fetcher in github_service
+http_cache = HttpCache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the GitHub conditional-request cache")
+    parser.add_argument("--clear", action="store_true", help="delete every cached response")
+    parser.add_argument("--limit", type=int, default=20, help="rows to list")
+    args = parser.parse_args()
+
+    if args.clear:
+        http_cache.clear()
+        print(f"🧹 Cleared {http_cache.path}")
+    print(json.dumps(http_cache.stats(), indent=2))
+    for entry in http_cache.entries(args.limit):
+        print(f"{entry['bytes']:>9}  {entry['etag'] or entry['last_modified']}  {entry['url']}")
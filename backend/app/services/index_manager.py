@@ -0,0 +1,312 @@
+import os
+import time
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import faiss
+from .sqlite_docstore import DOCSTORE_SUFFIX, open_docstore, read_vectors_stamp, write_docstore
+from .vector_backends import search_index_for
+from ..config import safe_float_env
+
+
+# Seconds between background checks for indexes rewritten by another process (0 disables)
+INDEX_WATCH_INTERVAL = safe_float_env("INDEX_WATCH_INTERVAL", 5.0)
+# How long a load waits for a save to finish swapping in its .faiss file
+PAIR_WAIT_RETRIES = 40
+PAIR_WAIT_DELAY = 0.05  # seconds
+
+
+# ======================================================
+# Loader
+# ======================================================
+def _read_mmap_index(faiss_path: str):
+    """Opens the vectors memory-mapped and read-only; falls back to a normal read."""
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    try:
+        return faiss.read_index(faiss_path, flags)
+    except RuntimeError:
+        # Older faiss builds can't map flat indexes
+        return faiss.read_index(faiss_path)
+
+
+def vectors_stamp(faiss_path: str):
+    """
+    Identifies one written .faiss file: its mtime and size, which a rename
+    keeps. The docstore saved with it records the same stamp.
+    """
+    try:
+        st = os.stat(faiss_path)
+    except FileNotFoundError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _read_pair(faiss_path: str, docstore_path: str, mmap: bool):
+    """
+    Reads vectors and documents written by the same save. A save swaps in
+    the docstore first and the .faiss file last, so a docstore whose stamp
+    does not match the .faiss file means a save is in progress: wait for it.
+    """
+    for _ in range(PAIR_WAIT_RETRIES):
+        expected = read_vectors_stamp(docstore_path)
+        stamp = vectors_stamp(faiss_path)
+        if expected is not None and expected != stamp:
+            time.sleep(PAIR_WAIT_DELAY)
+            continue
+        index = _read_mmap_index(faiss_path) if mmap else faiss.read_index(faiss_path)
+        docstore, index_to_docstore_id = open_docstore(docstore_path, lazy=mmap)
+        # Neither file may have been replaced while it was being opened
+        if vectors_stamp(faiss_path) == stamp and read_vectors_stamp(docstore_path) == expected:
+            return index, docstore, index_to_docstore_id
+        if hasattr(docstore, "close"):
+            docstore.close()
+
+    # A save that died between its two renames; serve what is there
+    print(f"⚠️ {faiss_path} and {docstore_path} come from different saves")
+    index = _read_mmap_index(faiss_path) if mmap else faiss.read_index(faiss_path)
+    docstore, index_to_docstore_id = open_docstore(docstore_path, lazy=mmap)
+    return index, docstore, index_to_docstore_id
+
+
+def read_legacy_docstore(pkl_path: str, ntotal: int):
+    """Unpickles a LangChain docstore, probing the layouts older versions wrote."""
+    with open(pkl_path, "rb") as f:
+        data = pickle.load(f)
+
+    # --- Handle different saved formats ---
+    docstore = None
+    index_to_docstore_id = None
+
+    # Case 1: Dict-based (modern)
+    if isinstance(data, dict):
+        docstore = data.get("docstore")
+        index_to_docstore_id = data.get("index_to_docstore_id")
+
+    # Case 2: Tuple (older LC versions)
+    elif isinstance(data, tuple):
+        for item in data:
+            from langchain_community.docstore.in_memory import InMemoryDocstore
+            if isinstance(item, InMemoryDocstore):
+                docstore = item
+            elif isinstance(item, dict):
+                index_to_docstore_id = item
+        if not index_to_docstore_id:
+            # fallback: use numeric mapping
+            index_to_docstore_id = {i: str(i) for i in range(ntotal)}
+
+    else:
+        raise ValueError(f"Unexpected FAISS pickle format: {type(data)}")
+
+    # --- Safety net ---
+    if not docstore:
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        docstore = InMemoryDocstore()
+
+    if not index_to_docstore_id:
+        index_to_docstore_id = {i: str(i) for i in range(ntotal)}
+
+    return docstore, index_to_docstore_id
+
+
+def load_flat_faiss(index_base_path: str, embeddings, mmap: bool = True):
+    """
+    Load FAISS index when stored as flat files:
+    <index_base_path>.faiss + <index_base_path>.docs.sqlite
+
+    Vectors are memory-mapped and documents are read lazily by id, so the
+    load is near-instant whatever the corpus size. The vectors are then
+    served by the search backend suited to the corpus size (see
+    vector_backends). Pass mmap=False for a fully in-memory flat copy that
+    can be modified (add/delete) and re-saved.
+
+    Indexes not migrated yet (<index_base_path>.pkl) are still supported.
+    """
+    faiss_path = index_base_path + ".faiss"
+    docstore_path = index_base_path + DOCSTORE_SUFFIX
+    pkl_path = index_base_path + ".pkl"
+
+    if not os.path.exists(faiss_path):
+        raise FileNotFoundError(f"Missing FAISS file: {faiss_path}")
+
+    if os.path.exists(docstore_path):
+        print(f"✅ Loading FAISS from: {faiss_path}")
+        index, docstore, index_to_docstore_id = _read_pair(faiss_path, docstore_path, mmap)
+    elif os.path.exists(pkl_path):
+        print(f"✅ Loading legacy pickled FAISS from: {faiss_path}")
+        index = faiss.read_index(faiss_path)
+        docstore, index_to_docstore_id = read_legacy_docstore(pkl_path, index.ntotal)
+    else:
+        raise FileNotFoundError(f"Missing docstore: {docstore_path} or {pkl_path}")
+
+    backend = "flat"
+    if mmap:
+        # Read-only copy: swap in the search backend for this corpus size
+        index, backend = search_index_for(index, index_base_path)
+
+    # --- Build FAISS object ---
+    from langchain_community.vectorstores import FAISS  # heavy; only needed once an index is loaded
+    db = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+    print(f"✅ Successfully reconstructed FAISS store — {index.ntotal} vectors loaded ({backend} search).")
+    return db
+
+
+def save_flat_faiss(db, index_base_path: str):
+    """
+    Saves a FAISS store as <index_base_path>.faiss + <index_base_path>.docs.sqlite.
+    Both files are written to temporaries and swapped in, the .faiss file
+    last; the docstore records which .faiss file it belongs to, so loads
+    never pair documents and vectors from different saves.
+    """
+    os.makedirs(os.path.dirname(index_base_path) or ".", exist_ok=True)
+    faiss_path = index_base_path + ".faiss"
+    faiss.write_index(db.index, faiss_path + ".tmp")
+    write_docstore(index_base_path + DOCSTORE_SUFFIX, db.docstore, db.index_to_docstore_id,
+                   vectors_stamp=vectors_stamp(faiss_path + ".tmp"))
+    os.replace(faiss_path + ".tmp", faiss_path)
+
+
+def resolve_index_base(base_dir: str, index_name: str):
+    """
+    Returns the base path (without extension) of a saved index, or None.
+    Prefers the folder layout written by `save_local`
+    (<base_dir>/<index_name>/index.faiss) over the older flat layout
+    (<base_dir>/<index_name>.faiss).
+    """
+    folder_base = os.path.join(base_dir, index_name, "index")
+    flat_base = os.path.join(base_dir, index_name)
+    for base in (folder_base, flat_base):
+        if os.path.exists(base + ".faiss"):
+            return base
+    return None
+
+
+def _file_signature(index_base_path: str):
+    """(mtime_ns, size) of every file making up the index; None if any is missing."""
+    docstore_ext = DOCSTORE_SUFFIX if os.path.exists(index_base_path + DOCSTORE_SUFFIX) else ".pkl"
+    signature = []
+    for ext in (".faiss", docstore_ext):
+        try:
+            st = os.stat(index_base_path + ext)
+        except FileNotFoundError:
+            return None
+        signature.append((st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+# ======================================================
+# Resident Index Manager
+# ======================================================
+class FaissIndexManager:
+    """
+    Keeps loaded FAISS stores resident in memory, keyed by index path and
+    the mtime/size of its files.
+
+    `get` is a dictionary lookup once an index is loaded: it never touches
+    the disk. Fresh versions are picked up in the background, either when
+    `notify_saved` is called after a save or when the watcher notices that
+    the files changed on disk.
+    """
+
+    def __init__(self, loader=load_flat_faiss, watch_interval: float = INDEX_WATCH_INTERVAL):
+        self._loader = loader
+        self._watch_interval = watch_interval
+        self._entries = {}  # abs path -> {"signature", "db", "embeddings"}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._reloader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="faiss-reload")
+        self._watcher = None
+        self._counters = {"hits": 0, "misses": 0, "reloads": 0, "reload_errors": 0}
+
+    def _load_lock(self, key):
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, index_base_path: str, embeddings):
+        """Returns the resident store for `index_base_path`, loading it on first use."""
+        key = os.path.abspath(index_base_path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._count("hits")
+            return entry["db"]
+
+        with self._load_lock(key):
+            # Someone else may have loaded it while we waited
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._count("hits")
+                return entry["db"]
+
+            self._count("misses")
+            signature = _file_signature(key)
+            db = self._loader(key, embeddings)
+            with self._lock:
+                self._entries[key] = {"signature": signature, "db": db, "embeddings": embeddings}
+
+        self._ensure_watcher()
+        return db
+
+    def notify_saved(self, index_base_path: str):
+        """Schedules a background reload of a resident index after it was rewritten."""
+        key = os.path.abspath(index_base_path)
+        if key in self._entries:
+            self._reloader.submit(self._reload_if_changed, key)
+
+    def _reload_if_changed(self, key):
+        with self._load_lock(key):
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            signature = _file_signature(key)
+            if signature is None or signature == entry["signature"]:
+                return
+
+            try:
+                db = self._loader(key, entry["embeddings"])
+            except Exception as e:
+                # Keep serving the previous version; the next save or watch tick retries
+                print(f"⚠️ Background reload failed for {key}: {e}")
+                self._count("reload_errors")
+                return
+            with self._lock:
+                self._entries[key] = {"signature": signature, "db": db, "embeddings": entry["embeddings"]}
+                self._counters["reloads"] += 1
+        print(f"🔁 Reloaded FAISS index: {key}")
+
+    def _ensure_watcher(self):
+        if self._watch_interval <= 0 or self._watcher is not None:
+            return
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, name="faiss-watch", daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        stop = threading.Event()
+        while not stop.wait(self._watch_interval):
+            for key in list(self._entries):
+                self._reload_if_changed(key)
+
+    def evict(self, index_base_path: str):
+        """Drops a resident index; the next `get` loads it again."""
+        with self._lock:
+            self._entries.pop(os.path.abspath(index_base_path), None)
+
+    def stats(self) -> dict:
+        """Hit/miss/reload counters plus the list of resident indexes."""
+        with self._lock:
+            return {**self._counters, "resident": sorted(self._entries)}
+
+
+# Process-wide instance shared by retrieval and the embedding writers
+index_manager = FaissIndexManager()
@@ -0,0 +1,221 @@
+# backend/app/services/intent_router.py
+#
+# Local intent router: picks resume / project / both / meeting by nearest
+# centroid over labelled example queries, using the shared MiniLM model.
+# Callers fall back to the LLM router when the confidence is too low.
+#
+# Accuracy report against the LLM router (run from the project root):
+#   python -m backend.app.services.intent_router [--no-llm]
+
+import os
+import sys
+import json
+import math
+import threading
+from .embedding_service import get_embedding_model
+from ..config import safe_float_env
+
+
+# Below this confidence the LLM router decides instead
+ROUTER_CONFIDENCE_THRESHOLD = safe_float_env("ROUTER_CONFIDENCE_THRESHOLD", 0.55)
+# Sharpness of the softmax over centroid similarities
+ROUTER_SOFTMAX_SCALE = safe_float_env("ROUTER_SOFTMAX_SCALE", 20.0)
+
+ROUTER_EVAL_PATH = os.path.join("data", "router_eval.json")
+
+ROUTE_EXAMPLES = {
+    "resume": [
+        "What is the candidate's CGPA?",
+        "Where did they study?",
+        "Which university did the candidate graduate from?",
+        "What is their email address?",
+        "Give me the candidate's phone number",
+        "What internships has the candidate done?",
+        "Tell me about their work experience",
+        "Which companies has the candidate worked at?",
+        "What achievements or awards do they have?",
+        "What programming languages does the candidate know?",
+        "What are the candidate's skills?",
+        "Summarize the candidate's education background",
+        "Is the candidate a good fit for a backend role?",
+        "What positions of responsibility have they held?",
+        "What is the candidate's LinkedIn profile?",
+    ],
+    "project": [
+        "What projects has the candidate built?",
+        "Explain the smart refrigerator project",
+        "Which GitHub repositories use React?",
+        "Tell me about their machine learning projects",
+        "What technologies were used in the chatbot project?",
+        "Describe the computer vision repository",
+        "Has the candidate built any full stack web apps?",
+        "What does the market price predictor project do?",
+        "List the features of their portfolio website",
+        "Which project uses LangChain?",
+        "What is the tech stack of the hackathon project?",
+        "Show me their open source work on GitHub",
+        "How was the object detection model trained in their repo?",
+        "Which of their projects are deployed with Docker?",
+    ],
+    "both": [
+        "Give me an overview of the candidate's education and projects",
+        "How do their projects relate to their work experience?",
+        "Summarize the whole profile including skills and projects",
+        "Does the candidate's project work back up the skills on the resume?",
+        "What experience and projects show they know Python?",
+        "Tell me everything about the candidate",
+        "Which internships and GitHub projects involve machine learning?",
+        "Compare their academic background with their practical projects",
+        "List their credentials and the projects they've built",
+        "Is the candidate strong in AI based on resume and projects?",
+    ],
+    "meeting": [
+        "Schedule a meeting with the candidate",
+        "Set up an interview for tomorrow",
+        "Book a call with them next week",
+        "I want to meet this candidate",
+        "Arrange an interview with HR",
+        "Can we schedule a meeting?",
+        "Please set up a call to discuss the role",
+        "Send a meeting invite to the candidate",
+        "Let's fix a time to talk",
+        "Organize a technical interview round",
+    ],
+}
+
+
+# ======================================================
+# Vector helpers (embeddings are plain lists of floats)
+# ======================================================
+def _normalize(vec):
+    norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+    return [x / norm for x in vec]
+
+
+def _dot(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+# ======================================================
+# Router
+# ======================================================
+class EmbeddingRouter:
+    """
+    Nearest-centroid classifier over labelled example queries.
+    Centroids are computed once, on the first call.
+    """
+
+    def __init__(self, examples: dict = None, embeddings=None):
+        self._examples = examples or ROUTE_EXAMPLES
+        self._embeddings = embeddings
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self):
+        return self._embeddings or get_embedding_model()
+
+    def _get_centroids(self):
+        if self._centroids is not None:
+            return self._centroids
+        with self._lock:
+            if self._centroids is None:
+                centroids = {}
+                for route, queries in self._examples.items():
+                    vectors = [_normalize(v) for v in self.embeddings.embed_documents(queries)]
+                    mean = [sum(col) / len(vectors) for col in zip(*vectors)]
+                    centroids[route] = _normalize(mean)
+                self._centroids = centroids
+        return self._centroids
+
+    def classify(self, user_query: str, query_vector=None) -> tuple:
+        """
+        Returns (route, confidence), confidence being the softmax probability
+        of the winning route over the cosine similarities to every centroid.
+        Pass `query_vector` when the query is already embedded.
+        """
+        if query_vector is None:
+            query_vector = self.embeddings.embed_query(user_query)
+        query_vector = _normalize(query_vector)
+
+        sims = {route: _dot(query_vector, c) for route, c in self._get_centroids().items()}
+        top = max(sims.values())
+        weights = {route: math.exp(ROUTER_SOFTMAX_SCALE * (s - top)) for route, s in sims.items()}
+        route = max(sims, key=sims.get)
+        return route, weights[route] / sum(weights.values())
+
+
+_router = None
+
+
+def get_intent_router() -> EmbeddingRouter:
+    """Process-wide router sharing the registry's embedding model."""
+    global _router
+    if _router is None:
+        _router = EmbeddingRouter()
+    return _router
+
+
+# ======================================================
+# Evaluation
+# ======================================================
+def evaluate_router(eval_path: str = ROUTER_EVAL_PATH, use_llm: bool = True) -> dict:
+    """
+    Scores the local router, the LLM router and the combined router
+    (local with LLM fallback) on a labelled set of {"query", "route"} items.
+    """
+    with open(eval_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+
+    router = get_intent_router()
+    if use_llm:
+        from .agentic_rag_service import route_query_llm
+
+    counts = {"local": 0, "llm": 0, "combined": 0, "fallbacks": 0, "agreement": 0}
+    misses = []
+    for item in items:
+        expected = item["route"]
+        local_route, confidence = router.classify(item["query"])
+        counts["local"] += local_route == expected
+
+        llm_route = route_query_llm(item["query"]) if use_llm else None
+        if use_llm:
+            counts["llm"] += llm_route == expected
+            counts["agreement"] += llm_route == local_route
+
+        if confidence >= ROUTER_CONFIDENCE_THRESHOLD or not use_llm:
+            combined = local_route
+        else:
+            combined = llm_route
+            counts["fallbacks"] += 1
+        counts["combined"] += combined == expected
+
+        if local_route != expected:
+            misses.append((item["query"], expected, local_route, round(confidence, 3)))
+
+    total = len(items)
+    report = {
+        "total": total,
+        "threshold": ROUTER_CONFIDENCE_THRESHOLD,
+        "local_accuracy": counts["local"] / total,
+        "combined_accuracy": counts["combined"] / total,
+        "llm_fallback_rate": counts["fallbacks"] / total,
+        "local_misses": misses,
+    }
+    if use_llm:
+        report["llm_accuracy"] = counts["llm"] / total
+        report["local_llm_agreement"] = counts["agreement"] / total
+    return report
+
+
+if __name__ == "__main__":
+    result = evaluate_router(use_llm="--no-llm" not in sys.argv[1:])
+    print(f"\n[INFO] Router evaluation on {result['total']} queries (threshold {result['threshold']})")
+    print(f"  Local router accuracy:    {result['local_accuracy']:.1%}")
+    if "llm_accuracy" in result:
+        print(f"  LLM router accuracy:      {result['llm_accuracy']:.1%}")
+        print(f"  Local/LLM agreement:      {result['local_llm_agreement']:.1%}")
+    print(f"  Combined accuracy:        {result['combined_accuracy']:.1%}")
+    print(f"  LLM fallback rate:        {result['llm_fallback_rate']:.1%}")
+    for query, expected, got, confidence in result["local_misses"]:
+        print(f"  [MISS] {query!r}: expected {expected}, got {got} ({confidence})")
@@ -0,0 +1,186 @@
+# backend/app/services/llm_cache.py
+#
+# Persistent LLM response cache used by groq_pool for invoke/ainvoke.
+# Entries are keyed by sha256(model, temperature, prompt), stored in SQLite,
+# expire after LLM_CACHE_TTL seconds and are evicted least-recently-used
+# once the stored text exceeds LLM_CACHE_MAX_BYTES. Identical requests in
+# flight at the same time are coalesced: one caller asks the model, the
+# others wait for its answer (single-flight).
+#
+# Inspect or clear it with:
+#   python -m backend.app.services.llm_cache [--clear]
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from concurrent.futures import Future
+from ..config import safe_float_env
+
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("data", "llm_cache.sqlite"))
+LLM_CACHE_TTL = safe_float_env("LLM_CACHE_TTL", 7 * 24 * 3600)                   # seconds
+LLM_CACHE_MAX_BYTES = int(safe_float_env("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+
+
+def _prompt_payload(prompt):
+    """Stable JSON-able form of a string, PromptValue or message list."""
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, (list, tuple)):
+        return [
+            [getattr(m, "type", "human"), getattr(m, "content", m)] if not isinstance(m, (list, tuple)) else list(m)
+            for m in prompt
+        ]
+    return str(prompt)
+
+
+def cache_key(model: str, temperature: float, prompt) -> str:
+    payload = json.dumps([model, temperature, _prompt_payload(prompt)], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LeaderAbandoned(Exception):
+    """Given to waiting callers when the caller asking the model was cancelled or interrupted."""
+
+
+class LLMResponseCache:
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._inflight = {}  # key -> Future shared by concurrent identical calls
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evicted": 0}
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       model TEXT NOT NULL,
+                       content TEXT NOT NULL,
+                       size INTEGER NOT NULL,
+                       created_at REAL NOT NULL,
+                       last_used REAL NOT NULL
+                   )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        return self._conn
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, size, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC").fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            freed += size
+            self._counters["evicted"] += 1
+
+    # ---------- single-flight ----------
+
+    def claim(self, key: str):
+        """
+        Returns (cached content, None) on a hit, (None, future) when another
+        caller is already asking for `key`, or (None, None) when the caller
+        should ask the model and then `finish` the key.
+        """
+        content = self.get(key)
+        with self._lock:
+            if content is not None:
+                self._counters["hits"] += 1
+                return content, None
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return None, future
+            self._inflight[key] = Future()
+            self._counters["misses"] += 1
+            return None, None
+
+    def finish(self, key: str, model: str, content=None, error=None):
+        """Publishes the leader's answer (or error) to waiting callers, then stores it."""
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            if error is None:
+                future.set_result(content)
+            elif isinstance(error, Exception):
+                future.set_exception(error)
+            else:
+                # CancelledError/KeyboardInterrupt belong to the leader; waiters ask again
+                future.set_exception(LeaderAbandoned(type(error).__name__))
+        if error is None and isinstance(content, str):
+            try:
+                self.put(key, model, content)
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {**self._counters, "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+# Process-wide instance shared by every pooled model
+llm_cache = LLMResponseCache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the LLM response cache")
+    parser.add_argument("--clear", action="store_true", help="delete every cached response")
+    args = parser.parse_args()
+
+    if args.clear:
+        llm_cache.clear()
+        print(f"🧹 Cleared {llm_cache.path}")
+    print(json.dumps(llm_cache.stats(), indent=2))
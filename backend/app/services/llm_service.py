@@ -1,29 +1,22 @@
 import os
 import json
-from langchain_groq import ChatGroq 
 from dotenv import load_dotenv
 from datetime import datetime
-import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .groq_pool import get_llm, get_pool
+from ..utils.tracing import bind, current_span, traced
 load_dotenv()
 
-API_KEYS = [
-    os.getenv("GROQ_API_KEY_1"),
-    os.getenv("GROQ_API_KEY_2"),
-    os.getenv("GROQ_API_KEY_3"),
-    os.getenv("GROQ_API_KEY_4"),
-    os.getenv("GROQ_API_KEY_5"),
-]
 
-def get_random_llm():
-    api_key = random.choice(API_KEYS)  # randomly pick a key
-    
-    # Initialize the LLM client with the selected key
-    llm = ChatGroq(
-        api_key= api_key,
-        model="openai/gpt-oss-20b",
-        temperature=0.7
-    )
-    return llm
+SUMMARY_MODEL = "openai/gpt-oss-20b"
+
+
+def _summary_concurrency() -> int:
+    """Repos summarized at once: SUMMARY_MAX_CONCURRENCY, else two per configured API key."""
+    try:
+        return max(1, int(os.getenv("SUMMARY_MAX_CONCURRENCY", "")))
+    except ValueError:
+        return max(1, 2 * len(get_pool().stats()))
 
 
 
@@ -46,8 +39,9 @@ os.makedirs(PROJECT_DETAILS_DIR, exist_ok=True)
 # -------------------------------------------------------------
 # SUB-FUNCTION 1: Generate Project Title
 # -------------------------------------------------------------
+@traced("summarize.title")
 def generate_project_title(repo_name, readme, files, llm):
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL)
     prompt = f"""
     You are an expert AI system that generates professional, descriptive project titles for GitHub repositories.
 
@@ -76,8 +70,9 @@ def generate_project_title(repo_name, readme, files, llm):
 # -------------------------------------------------------------
 # SUB-FUNCTION 2: Extract Technologies
 # -------------------------------------------------------------
+@traced("summarize.technologies")
 def extract_technologies(requirements, files, llm):
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL)
     prompt = f"""
     You are a specialized AI model that extracts technologies, frameworks, and libraries used in a project.
 
@@ -108,8 +103,9 @@ def extract_technologies(requirements, files, llm):
 # SUB-FUNCTION 3: Generate Project Features
 # -------------------------------------------------------------
 
+@traced("summarize.features")
 def generate_project_features(title, techs, readme, files, role, llm):
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL)
     prompt = f"""
     You are an expert technical resume writer with deep understanding of how to present projects attractively for recruiters.
 
@@ -170,11 +166,47 @@ def generate_project_features(title, techs, readme, files, role, llm):
     
 
 
+def _summary_path(repo_name):
+    safe_name = "".join(c for c in repo_name if c.isalnum() or c in ("-", "_")).rstrip()
+    return os.path.join(PROJECT_DETAILS_DIR, f"{safe_name}.json")
+
+
+def load_project_summary(repo, role):
+    """
+    Saved summary of `repo` if it was written from the repo's current head
+    SHA for the same `role` (the bullets are tailored to it), else None.
+    """
+    head_sha = repo.get("head_sha")
+    repo_name = repo.get("repository") or repo.get("repo") or repo.get("name") or "UnnamedRepo"
+    path = _summary_path(repo_name)
+    if not head_sha or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("head_sha") != head_sha or data.get("role") != role:
+        return None
+    return data
+
+
+@traced("summarize.project")
+def summarize_project_if_changed(repo, role):
+    """Reuses the saved summary when neither the repo nor the role changed; summarizes it otherwise."""
+    cached = load_project_summary(repo, role)
+    current_span().set(repository=repo.get("repository") or repo.get("name"), up_to_date=cached is not None)
+    if cached is not None:
+        print(f"[SKIP] 💤 Summary of '{cached.get('repository')}' is up to date.")
+        return cached
+    return summarize_project(repo, role)
+
+
 # -------------------------------------------------------------
 # MAIN FUNCTION: Summarize Project (modular composition)
 # -------------------------------------------------------------
 def summarize_project(repo,role, llm=None):
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL)
     if llm is None:
         from backend.app.services.llm_service import llm
 
@@ -183,11 +215,11 @@ def summarize_project(repo,role, llm=None):
     requirements = repo.get("requirements", "")
     files = repo.get("files_name", [])
 
-    # 1️⃣ Generate Project Title
-    title = generate_project_title(repo_name, readme, files, llm)
-
-    # 2️⃣ Extract Technologies
-    techs = extract_technologies(requirements, files, llm)
+    # 1️⃣ Generate Project Title and 2️⃣ Extract Technologies (independent, run together)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary-tech") as side:
+        techs_future = side.submit(bind(extract_technologies), requirements, files, llm)
+        title = generate_project_title(repo_name, readme, files, llm)
+        techs = techs_future.result()
 
     # 3️⃣ Generate 3 Features
     features = generate_project_features(title, requirements, readme, files,role, llm)
@@ -197,12 +229,15 @@ def summarize_project(repo,role, llm=None):
         "title": title,
         "technologies": techs,
         "date": "",
-        "features": features
+        "features": features,
+        # Commit the summary was written from, so unchanged repos are not re-summarized
+        "repository": repo_name,
+        "head_sha": repo.get("head_sha"),
+        "role": role,
     }
 
     # 5️⃣ Save to Disk
-    safe_name = "".join(c for c in repo_name if c.isalnum() or c in ("-", "_")).rstrip()
-    out_path = os.path.join(PROJECT_DETAILS_DIR, f"{safe_name}.json")
+    out_path = _summary_path(repo_name)
     try:
         with open(out_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
@@ -213,8 +248,40 @@ def summarize_project(repo,role, llm=None):
     return data
 
 
+@traced("summarize.request")
+def summarize_projects(repos, role, max_workers=None, on_progress=None):
+    """
+    Summarizes many repos concurrently, at most `max_workers` at a time
+    (default: `_summary_concurrency()`), reusing up-to-date summaries.
+
+    `on_progress(done, total, repo_name, error)` is called from the calling
+    thread after each repo finishes, so it may safely update a UI.
+    Returns the summaries in the order of `repos`; failed repos are left out.
+    """
+    if not repos:
+        return []
+    workers = min(max_workers or _summary_concurrency(), len(repos))
+    current_span().set(repositories=len(repos), workers=workers, role=role)
+    results = [None] * len(repos)
+    project = bind(summarize_project_if_changed)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary") as pool:
+        futures = {pool.submit(project, r, role): i for i, r in enumerate(repos)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            repo_name = repos[i].get("repository") or repos[i].get("name") or "UnnamedRepo"
+            error = None
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                error = e
+                print(f"[ERROR] Summary failed for {repo_name}: {e}")
+            if on_progress:
+                on_progress(done, len(repos), repo_name, error)
+    return [r for r in results if r is not None]
+
+
 def refine_project(features: list[str],role, user_msg: str):
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL, cache=False)  # asking again should give a new rewrite
     """
     Refines only the list of project features based on user feedback.
     Returns a refined features list (same structure, no type errors).
@@ -253,7 +320,7 @@ def refine_project(features: list[str],role, user_msg: str):
 
 def fix_latex_syntax_with_llm(latex_code: str) -> str:
     """Send LaTeX code to LLM to fix only syntax issues (balanced braces, etc.)."""
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL)
     prompt = f"""
     You are a LaTeX syntax validator and fixer.
     Check only for missing or extra braces, unbalanced environments,
@@ -291,7 +358,7 @@ def fix_latex_syntax_with_llm(latex_code: str) -> str:
         return latex_code
 
 def refine_text(data, user_msg):
-    llm = get_random_llm()
+    llm = get_llm(model=SUMMARY_MODEL, cache=False)  # asking again should give a new rewrite
     """
     Refine any structured content (project, achievement, etc.) using AI.
     Keeps the same JSON structure.
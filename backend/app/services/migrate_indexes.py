@@ -0,0 +1,78 @@
+# backend/app/services/migrate_indexes.py
+#
+# Converts pickled FAISS indexes (<base>.faiss + <base>.pkl) to the
+# pickle-free format read by load_flat_faiss (<base>.faiss + <base>.docs.sqlite),
+# and builds the BM25 keyword index (<base>.bm25.json) when it is missing.
+#
+# Run from the project root:
+#   python -m backend.app.services.migrate_indexes [--remove-legacy] [index_base ...]
+
+import os
+import sys
+import faiss
+from .index_manager import read_legacy_docstore, resolve_index_base, vectors_stamp
+from .sqlite_docstore import DOCSTORE_SUFFIX, write_docstore
+from .bm25_index import BM25_SUFFIX, BM25Index
+
+EMBEDDINGS_DIR = os.path.join("data", "embeddings")
+DEFAULT_INDEXES = [
+    (os.path.join(EMBEDDINGS_DIR, "resume"), "resume_index"),
+    (os.path.join(EMBEDDINGS_DIR, "projects"), "projects_index"),
+]
+
+
+def migrate_index(index_base_path: str, remove_legacy: bool = False) -> bool:
+    """
+    Writes <index_base_path>.docs.sqlite from the pickled docstore.
+    The .faiss file is already in the target format and is left as is.
+    """
+    faiss_path = index_base_path + ".faiss"
+    pkl_path = index_base_path + ".pkl"
+    if not (os.path.exists(faiss_path) and os.path.exists(pkl_path)):
+        print(f"[SKIP] 💤 No pickled index at {index_base_path}")
+        return False
+
+    index = faiss.read_index(faiss_path)
+    docstore, index_to_docstore_id = read_legacy_docstore(pkl_path, index.ntotal)
+    if len(index_to_docstore_id) != index.ntotal:
+        print(f"[WARN] {index_base_path}: {index.ntotal} vectors but {len(index_to_docstore_id)} ids")
+
+    write_docstore(index_base_path + DOCSTORE_SUFFIX, docstore, index_to_docstore_id,
+                   vectors_stamp=vectors_stamp(faiss_path))
+    print(f"[SAVED] 💾 {index_base_path}{DOCSTORE_SUFFIX} ({len(index_to_docstore_id)} documents)")
+
+    if not os.path.exists(index_base_path + BM25_SUFFIX):
+        bm25 = BM25Index()
+        for doc_id in index_to_docstore_id.values():
+            doc = docstore.search(doc_id)
+            if hasattr(doc, "page_content"):
+                bm25.add(doc_id, doc.page_content, doc.metadata)
+        bm25.save(index_base_path + BM25_SUFFIX)
+        print(f"[SAVED] 💾 {index_base_path}{BM25_SUFFIX} ({len(bm25)} documents)")
+
+    if remove_legacy:
+        os.remove(pkl_path)
+        print(f"[INFO] Removed {pkl_path}")
+    return True
+
+
+def migrate_default_indexes(remove_legacy: bool = False):
+    """Migrates the resume and projects indexes under data/embeddings."""
+    migrated = []
+    for base_dir, index_name in DEFAULT_INDEXES:
+        base = resolve_index_base(base_dir, index_name)
+        if base and migrate_index(base, remove_legacy):
+            migrated.append(base)
+    return migrated
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    remove = "--remove-legacy" in args
+    targets = [a for a in args if a != "--remove-legacy"]
+
+    if targets:
+        done = [t for t in targets if migrate_index(t, remove)]
+    else:
+        done = migrate_default_indexes(remove)
+    print(f"\n[INFO] Migrated {len(done)} index(es).")
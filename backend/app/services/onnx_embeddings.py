@@ -0,0 +1,279 @@
+# backend/app/services/onnx_embeddings.py
+#
+# CPU embedding backend running an int8-quantized ONNX export of a
+# sentence-transformers model (all-MiniLM-L6-v2 by default) on
+# onnxruntime, without importing torch. Selected with
+# EMBEDDING_BACKEND=onnx; see embedding_service.get_embedding_model.
+#
+# Export once (needs torch, sentence-transformers and onnx), then check
+# cosine agreement with the torch model:
+#   python -m backend.app.services.onnx_embeddings export [--model NAME]
+#   python -m backend.app.services.onnx_embeddings parity [--model NAME]
+
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import Future
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..config import safe_float_env, safe_int_env
+
+
+ONNX_MODELS_DIR = os.getenv("ONNX_MODELS_DIR", os.path.join("data", "models", "onnx"))
+ONNX_BATCH_SIZE = safe_int_env("ONNX_BATCH_SIZE", 32)
+ONNX_THREADS = safe_int_env("ONNX_THREADS", 0)                      # 0 = onnxruntime default
+ONNX_QUERY_WAIT_MS = safe_float_env("ONNX_QUERY_WAIT_MS", 0.0)      # extra wait for queries to share a run
+ONNX_PARITY_MIN_COSINE = safe_float_env("ONNX_PARITY_MIN_COSINE", 0.99)
+
+MODEL_FILE = "model_int8.onnx"
+FP32_MODEL_FILE = "model.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "embedding_config.json"
+
+PARITY_TEXTS = [
+    "Built a retrieval-augmented chatbot with LangGraph, FAISS and Groq.",
+    "Skills: Python, C++, React, Node.js, PostgreSQL, Docker, Kubernetes.",
+    "Bachelor of Technology in Computer Science, 2021 - 2025, CGPA 8.7",
+    "Which projects use computer vision?",
+    "Tell me about the internship at a fintech startup.",
+    "Designed REST APIs serving 10k requests per minute with p95 under 80 ms.",
+    "MERN stack e-commerce site with Stripe payments and JWT authentication.",
+    "Can we schedule a meeting next week?",
+    "Trained a YOLOv8 model for defect detection on factory images.",
+    "Hackathon winner — built an anomaly detector for industrial sensor data.",
+]
+
+
+def onnx_model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_MODELS_DIR, model_name.split("/")[-1])
+
+
+class _QueryBatcher:
+    """
+    Coalesces concurrent embed_query calls: a caller that finds no run in
+    progress encodes every pending query (up to the batch size) in one
+    session run; callers arriving meanwhile wait and are served by the
+    next run.
+    """
+
+    def __init__(self, encode, max_batch: int, wait_s: float):
+        self._encode = encode
+        self._max_batch = max_batch
+        self._wait_s = wait_s
+        self._lock = threading.Lock()
+        self._pending = []  # (text, Future)
+        self._running = False
+
+    def embed(self, text: str):
+        future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            lead = not self._running
+            self._running = True
+        if lead:
+            self._drain()
+        return future.result()
+
+    def _drain(self):
+        batch = []
+        try:
+            if self._wait_s > 0:
+                time.sleep(self._wait_s)
+            while True:
+                with self._lock:
+                    batch, self._pending = self._pending[:self._max_batch], self._pending[self._max_batch:]
+                    if not batch:
+                        self._running = False
+                        return
+                try:
+                    vectors = self._encode([text for text, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        future.set_exception(e)
+                    continue
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector.tolist())
+        except BaseException as e:
+            # Interrupted leader: hand leadership back and fail whoever was waiting on it
+            with self._lock:
+                self._running = False
+                stranded, self._pending = self._pending, []
+            for _, future in batch + stranded:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Same vectors as HuggingFaceEmbeddings (mean pooling, optional L2
+    normalisation, newlines replaced by spaces) from the ONNX export in
+    `model_dir`. Documents are sorted by length and encoded in batches of
+    ONNX_BATCH_SIZE, each padded only to its own longest text.
+    """
+
+    def __init__(self, model_name: str, model_dir: str = None, model_file: str = MODEL_FILE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = model_dir or onnx_model_dir(model_name)
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"No ONNX export at {model_path}; run "
+                f"`python -m backend.app.services.onnx_embeddings export --model {model_name}`"
+            )
+        with open(os.path.join(model_dir, CONFIG_FILE), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+
+        self.model_name = model_name
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(self.config["max_length"])
+        self._tokenizer.enable_padding(pad_id=self.config["pad_id"], pad_token=self.config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+        self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._inputs = {i.name for i in self._session.get_inputs()}
+        self._queries = _QueryBatcher(self._encode, ONNX_BATCH_SIZE, ONNX_QUERY_WAIT_MS / 1000)
+
+    def _encode(self, texts) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch([t.replace("\n", " ") for t in texts])
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self._session.run(None, feeds)[0]
+
+        if self.config["pooling"] == "cls":
+            vectors = hidden[:, 0]
+        else:
+            weights = mask[:, :, None].astype(np.float32)
+            vectors = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.config["normalize"]:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors.astype(np.float32)
+
+    def embed_documents(self, texts):
+        # Similar lengths share a batch, so little compute goes to padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), ONNX_BATCH_SIZE):
+            batch = order[start:start + ONNX_BATCH_SIZE]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str):
+        return self._queries.embed(text)
+
+
+# ======================================================
+# Export and parity check
+# ======================================================
+def export_model(model_name: str, out_dir: str = None) -> str:
+    """
+    Exports a sentence-transformers model to ONNX (fp32), quantizes the
+    weights to int8 (dynamic quantization) and saves the fast tokenizer
+    and pooling settings next to it. Returns the output directory.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    out_dir = out_dir or onnx_model_dir(model_name)
+    os.makedirs(out_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer, tokenizer = st_model[0].auto_model.eval(), st_model.tokenizer
+
+    modules = list(st_model)
+    pooling = next((m.get_config_dict() for m in modules if type(m).__name__ == "Pooling"), {})
+    # Older sentence-transformers use one flag per mode, newer ones a "pooling_mode" string
+    cls_pooling = pooling.get("pooling_mode") == "cls" or pooling.get("pooling_mode_cls_token", False)
+    config = {
+        "model_name": model_name,
+        "max_length": st_model.max_seq_length,
+        "pooling": "cls" if cls_pooling else "mean",
+        "normalize": any(type(m).__name__ == "Normalize" for m in modules),
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+    }
+
+    sample = tokenizer(["export sample", "a somewhat longer export sample"], padding=True, return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic = {n: {0: "batch", 1: "sequence"} for n in input_names + ["last_hidden_state"]}
+    fp32_path = os.path.join(out_dir, FP32_MODEL_FILE)
+    print(f"📦 Exporting {model_name} to {fp32_path}")
+
+    class HiddenStates(torch.nn.Module):
+        # Named inputs in, last_hidden_state out, whatever the model's forward() order
+        def __init__(self):
+            super().__init__()
+            self.model = transformer
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(),
+            tuple(sample[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=17,
+            dynamo=False,
+        )
+
+    int8_path = os.path.join(out_dir, MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+    with open(os.path.join(out_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    size_mb = {p: os.path.getsize(os.path.join(out_dir, p)) / 1e6 for p in (FP32_MODEL_FILE, MODEL_FILE)}
+    print(f"✅ Saved {MODEL_FILE} ({size_mb[MODEL_FILE]:.1f} MB, fp32 {size_mb[FP32_MODEL_FILE]:.1f} MB) in {out_dir}")
+    return out_dir
+
+
+def parity_check(model_name: str, texts=None, reference=None, candidate=None) -> dict:
+    """
+    Cosine similarity between torch (HuggingFaceEmbeddings) and ONNX
+    vectors of the same texts, through both embed_documents and
+    embed_query. Passes when every pair reaches ONNX_PARITY_MIN_COSINE.
+    """
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    texts = texts or PARITY_TEXTS
+    reference = reference or HuggingFaceEmbeddings(model_name=model_name)
+    candidate = candidate or OnnxEmbeddings(model_name)
+    a = np.asarray(reference.embed_documents(texts) + [reference.embed_query(texts[0])], dtype=np.float32)
+    b = np.asarray(candidate.embed_documents(texts) + [candidate.embed_query(texts[0])], dtype=np.float32)
+    cosines = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {
+        "texts": len(texts),
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+        "threshold": ONNX_PARITY_MIN_COSINE,
+        "passed": bool(cosines.min() >= ONNX_PARITY_MIN_COSINE),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or check the ONNX embedding backend")
+    parser.add_argument("command", choices=("export", "parity"))
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+    parser.add_argument("--out", help="export directory (default: ONNX_MODELS_DIR/<model>)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_model(args.model, args.out)
+    else:
+        report = parity_check(args.model)
+        print(json.dumps(report, indent=2))
+        print("✅ Parity OK" if report["passed"] else "❌ ONNX vectors drift from torch")
@@ -6,22 +6,25 @@ import json
 import smtplib
 from datetime import datetime
 from email.message import EmailMessage
-import streamlit as st
-import sys
 
-sys.path.append(r"C:\Users\Harsh\Downloads\Q_A_Chatbot_Using_Agentic_RAG_Architecture\q_a_chatbot\backend\app\services")
+from .user_data_service import load_user_data, save_user_data
 
-from user_data_service import load_user_data, save_user_data
+
+def print_message(level: str, text: str):
+    """Default `on_message`: headless callers just log. The Streamlit app passes st.* instead."""
+    print(text)
 
 
 # -----------------------------------
 # ✉️ EMAIL FUNCTION (GMAIL APP PASSWORD)
 # -----------------------------------
-def send_email_gmail(subject: str, body: str):
+def send_email_gmail(subject: str, body: str, on_message=print_message):
     """
     Send email to candidate using Gmail App Password.
     - Receiver email is automatically fetched from user_data.json
     - Sender details are stored in .env
+    Status messages go to on_message(level, text), level being
+    "success", "info", "warning" or "error".
     """
     # Load candidate data
     user_data = load_user_data()
@@ -32,7 +35,7 @@ def send_email_gmail(subject: str, body: str):
 
 
     if not receiver_email:
-        st.error("❌ Candidate email not found in user_data.json — cannot send email.")
+        on_message("error", "❌ Candidate email not found in user_data.json — cannot send email.")
         return False
 
     # Load sender credentials
@@ -41,7 +44,7 @@ def send_email_gmail(subject: str, body: str):
     FROM_EMAIL = os.getenv("FROM_EMAIL", EMAIL_USER)
 
     if not EMAIL_USER or not EMAIL_PASS:
-        st.error("❌ Missing EMAIL_USER or EMAIL_PASS in .env — cannot send email.")
+        on_message("error", "❌ Missing EMAIL_USER or EMAIL_PASS in .env — cannot send email.")
         return False
 
     msg = EmailMessage()
@@ -55,20 +58,22 @@ def send_email_gmail(subject: str, body: str):
             smtp.starttls()
             smtp.login(EMAIL_USER, EMAIL_PASS)
             smtp.send_message(msg)
-        st.success(f"📧 Email sent to {receiver_email}")
+        on_message("success", f"📧 Email sent to {receiver_email}")
         return True
     except Exception as e:
-        st.error(f"❌ Failed to send email: {e}")
+        on_message("error", f"❌ Failed to send email: {e}")
         return False
 
 
 # -----------------------------------
 # 🤖 QUALIFICATION CHECK FUNCTION
 # -----------------------------------
-def verify_and_notify_qualification(parsed_data: dict, cgpa: str, skill: str, llm, threshold: int = 60):
+def verify_and_notify_qualification(parsed_data: dict, cgpa: str, skill: str, llm, threshold: int = 60,
+                                    on_message=print_message):
     """
     Verifies that CGPA and skill match the resume contents using LLM.
     Saves result, sends email if valid, returns result dict.
+    Status messages go to on_message(level, text); see send_email_gmail.
     """
     resume_text = json.dumps(parsed_data, ensure_ascii=False, indent=2)
 
@@ -96,18 +101,17 @@ def verify_and_notify_qualification(parsed_data: dict, cgpa: str, skill: str, ll
     # --------------------------
     # Step 1: Run LLM grading
     # --------------------------
-    with st.spinner("🤖 Checking qualifications using AI..."):
-        try:
-            resp = llm.invoke(prompt)
-            text = getattr(resp, "content", str(resp))
-            match = re.search(r'\{[\s\S]*\}', text)
-            data = json.loads(match.group(0)) if match else json.loads(text)
-            decision = data.get("decision", "").title()
-            score = int(data.get("score", 0))
-            reason = data.get("reason", "")
-        except Exception as e:
-            st.error(f"❌ LLM verification failed: {e}")
-            return None
+    try:
+        resp = llm.invoke(prompt)
+        text = getattr(resp, "content", str(resp))
+        match = re.search(r'\{[\s\S]*\}', text)
+        data = json.loads(match.group(0)) if match else json.loads(text)
+        decision = data.get("decision", "").title()
+        score = int(data.get("score", 0))
+        reason = data.get("reason", "")
+    except Exception as e:
+        on_message("error", f"❌ LLM verification failed: {e}")
+        return None
 
     # --------------------------
     # Step 2: Save Result
@@ -120,10 +124,9 @@ def verify_and_notify_qualification(parsed_data: dict, cgpa: str, skill: str, ll
         "checked_at": datetime.utcnow().isoformat() + "Z"
     }
     save_user_data(user_data)
-    st.session_state["user_data"] = user_data
 
-    st.success(f"✅ Qualification Check: {decision} (Score: {score})")
-    st.info(reason)
+    on_message("success", f"✅ Qualification Check: {decision} (Score: {score})")
+    on_message("info", reason)
 
     # --------------------------
     # Step 3: Send Email (if passed)
@@ -144,9 +147,9 @@ def verify_and_notify_qualification(parsed_data: dict, cgpa: str, skill: str, ll
             Warm regards,  
             The Agentic Resume Team
             """
-        send_email_gmail(subject, body)
+        send_email_gmail(subject, body, on_message)
     else:
-        st.warning("❌ Qualification not in accordance. No email sent.")
+        on_message("warning", "❌ Qualification not in accordance. No email sent.")
 
     return {
         "decision": decision,
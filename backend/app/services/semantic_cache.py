@@ -0,0 +1,137 @@
+# backend/app/services/semantic_cache.py
+#
+# Semantic answer cache in front of agentic_rag_pipeline: a new query whose
+# embedding is close enough to an earlier one gets the earlier answer back.
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from .user_data_service import USER_DATA_PATH
+from ..config import safe_float_env
+
+
+SEMANTIC_CACHE_THRESHOLD = safe_float_env("SEMANTIC_CACHE_THRESHOLD", 0.92)  # cosine similarity
+SEMANTIC_CACHE_TTL = safe_float_env("SEMANTIC_CACHE_TTL", 3600)              # seconds
+SEMANTIC_CACHE_MAX_ENTRIES = int(safe_float_env("SEMANTIC_CACHE_MAX_ENTRIES", 256))
+
+
+def _unit(vector):
+    vec = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _file_signature(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _file_digest(path: str):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class SemanticAnswerCache:
+    """
+    Stores (query embedding, source, answer) entries, bounded by LRU size
+    and per-entry TTL.
+
+    The cache empties itself when the data answers were built from changes:
+    embedding_service calls `invalidate` after rebuilding an index, and
+    every lookup checks whether any watched file (user_data.json) changed.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL,
+                 max_entries=SEMANTIC_CACHE_MAX_ENTRIES, watched_paths=(USER_DATA_PATH,)):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # path -> (stat signature, content digest)
+        self._watched = {path: (_file_signature(path), _file_digest(path)) for path in watched_paths}
+        self._entries = OrderedDict()  # id -> {"vector", "source", "answer", "cost", "stored_at"}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0, "saved_seconds": 0.0}
+
+    def _check_watched(self):
+        for path, (signature, digest) in self._watched.items():
+            current = _file_signature(path)
+            if current == signature:
+                continue
+            # The Streamlit app rewrites user_data.json on every rerun; only content changes count
+            current_digest = _file_digest(path)
+            self._watched[path] = (current, current_digest)
+            if current_digest != digest:
+                self._clear(f"{path} changed")
+
+    def _clear(self, reason: str):
+        if self._entries:
+            print(f"🧹 Semantic cache cleared: {reason}")
+        self._entries.clear()
+        self._counters["invalidations"] += 1
+
+    def lookup(self, query_vector):
+        """Returns the closest fresh entry above the threshold, or None."""
+        query = _unit(query_vector)
+        now = time.time()
+        with self._lock:
+            self._check_watched()
+
+            best_id, best_sim = None, self.threshold
+            for entry_id, entry in list(self._entries.items()):
+                if now - entry["stored_at"] > self.ttl:
+                    del self._entries[entry_id]
+                    continue
+                sim = float(np.dot(query, entry["vector"]))
+                if sim >= best_sim:
+                    best_id, best_sim = entry_id, sim
+
+            if best_id is None:
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            entry = self._entries[best_id]
+            self._counters["hits"] += 1
+            self._counters["saved_seconds"] += entry["cost"]
+            return {"source": entry["source"], "answer": entry["answer"], "similarity": best_sim}
+
+    def store(self, query_vector, source: str, answer: str, cost_seconds: float = 0.0):
+        """Adds an answer; `cost_seconds` is what producing it took, counted as saved on hits."""
+        with self._lock:
+            self._entries[self._next_id] = {
+                "vector": _unit(query_vector),
+                "source": source,
+                "answer": answer,
+                "cost": cost_seconds,
+                "stored_at": time.time(),
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, reason: str = "manual"):
+        with self._lock:
+            self._clear(reason)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide instance shared by the pipeline and the embedding writers
+semantic_cache = SemanticAnswerCache()
@@ -0,0 +1,182 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+from langchain_core.documents import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+
+DOCSTORE_SUFFIX = ".docs.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    page_content TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    position INTEGER PRIMARY KEY,
+    doc_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _connect(path: str, read_only: bool):
+    if read_only:
+        uri = f"file:{os.path.abspath(path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# ======================================================
+# Docstore
+# ======================================================
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    LangChain docstore backed by a single SQLite file.
+
+    Documents are fetched by id on demand instead of being unpickled up
+    front, so opening a store costs the same for 10 or 100k documents.
+    """
+
+    def __init__(self, path: str, read_only: bool = True):
+        self.path = path
+        self._conn = _connect(path, read_only)
+        self._lock = threading.Lock()
+
+    def search(self, search: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_content, metadata FROM documents WHERE doc_id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            # Same contract as InMemoryDocstore
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: dict):
+        rows = [
+            (doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False))
+            for doc_id, doc in texts.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (doc_id, page_content, metadata) VALUES (?, ?, ?)", rows
+            )
+
+    def delete(self, ids: list):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM documents WHERE doc_id = ?", [(i,) for i in ids])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteIndexMapping(Mapping):
+    """
+    Read-only `index_to_docstore_id` mapping (FAISS position -> doc id)
+    that looks positions up in the docstore file instead of holding them all.
+    """
+
+    def __init__(self, docstore: SQLiteDocstore):
+        self._docstore = docstore
+
+    def __getitem__(self, position):
+        with self._docstore._lock:
+            row = self._docstore._conn.execute(
+                "SELECT doc_id FROM positions WHERE position = ?", (int(position),)
+            ).fetchone()
+        if row is None:
+            raise KeyError(position)
+        return row[0]
+
+    def __iter__(self):
+        with self._docstore._lock:
+            rows = self._docstore._conn.execute("SELECT position FROM positions ORDER BY position").fetchall()
+        return iter(r[0] for r in rows)
+
+    def __len__(self):
+        with self._docstore._lock:
+            return self._docstore._conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+
+def open_docstore(path: str, lazy: bool = True):
+    """
+    Opens a SQLite docstore and returns (docstore, index_to_docstore_id).
+
+    lazy=True keeps both on disk (read-only). lazy=False copies them into
+    an InMemoryDocstore and a plain dict, which FAISS can modify in place.
+    """
+    docstore = SQLiteDocstore(path, read_only=True)
+    if lazy:
+        return docstore, SQLiteIndexMapping(docstore)
+
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    with docstore._lock:
+        rows = docstore._conn.execute(
+            "SELECT p.position, d.doc_id, d.page_content, d.metadata "
+            "FROM positions p JOIN documents d ON d.doc_id = p.doc_id ORDER BY p.position"
+        ).fetchall()
+    docstore.close()
+
+    index_to_docstore_id = {position: doc_id for position, doc_id, _, _ in rows}
+    documents = {
+        doc_id: Document(page_content=content, metadata=json.loads(metadata))
+        for _, doc_id, content, metadata in rows
+    }
+    return InMemoryDocstore(documents), index_to_docstore_id
+
+
+# ======================================================
+# Writer
+# ======================================================
+def write_docstore(path: str, docstore, index_to_docstore_id, vectors_stamp: str = None):
+    """
+    Writes every document referenced by `index_to_docstore_id` into a new
+    SQLite docstore at `path`, replacing any previous file atomically.
+    `vectors_stamp` identifies the .faiss file the documents belong to
+    (see index_manager.vectors_stamp).
+    """
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = _connect(tmp_path, read_only=False)
+    try:
+        with conn:
+            for position, doc_id in index_to_docstore_id.items():
+                doc = docstore.search(doc_id)
+                if not isinstance(doc, Document):
+                    raise ValueError(f"Document {doc_id} missing from docstore")
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents (doc_id, page_content, metadata) VALUES (?, ?, ?)",
+                    (doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False)),
+                )
+                conn.execute("INSERT INTO positions (position, doc_id) VALUES (?, ?)", (int(position), doc_id))
+            if vectors_stamp is not None:
+                conn.execute("INSERT INTO meta (key, value) VALUES ('vectors_stamp', ?)", (vectors_stamp,))
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+
+def read_vectors_stamp(path: str):
+    """The `vectors_stamp` a docstore was written with; None for older files."""
+    try:
+        conn = _connect(path, read_only=True)
+    except sqlite3.Error:
+        return None
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'vectors_stamp'").fetchone()
+    except sqlite3.Error:
+        return None  # written before the meta table existed
+    finally:
+        conn.close()
+    return row[0] if row else None
@@ -0,0 +1,185 @@
+# backend/app/services/vector_backends.py
+#
+# Search-side vector index chosen by corpus size. Indexes are always
+# written as exact flat FAISS (it supports add/delete, which incremental
+# updates need); the read-only copy used for queries is swapped for:
+#   numpy  brute-force matrix product held in RAM, for tiny corpora
+#   flat   the memory-mapped flat FAISS index itself
+#   hnsw   FAISS HNSW graph, for large corpora
+#   ivf    FAISS inverted lists (IVF-Flat), for large corpora
+# Built HNSW/IVF indexes are cached next to the flat index
+# (<index_base>.<backend>.faiss) until the flat file changes.
+#
+# Defaults follow benchmarks/vector_backends.py: flat FAISS answers a
+# single query at least as fast as numpy even on 15 vectors, so numpy is
+# off unless VECTOR_NUMPY_MAX is raised; on 100k synthetic MiniLM-sized
+# vectors IVF kept ~0.95 recall@8 where HNSW fell well below.
+
+import os
+import json
+import math
+import time
+import numpy as np
+import faiss
+from ..config import safe_int_env
+
+
+BACKENDS = ("numpy", "flat", "hnsw", "ivf")
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "auto")            # "auto" or one of BACKENDS
+VECTOR_NUMPY_MAX = safe_int_env("VECTOR_NUMPY_MAX", 0)         # up to this many vectors: numpy
+VECTOR_FLAT_MAX = safe_int_env("VECTOR_FLAT_MAX", 50000)       # up to this many vectors: flat
+VECTOR_LARGE_BACKEND = os.getenv("VECTOR_LARGE_BACKEND", "ivf")  # beyond VECTOR_FLAT_MAX
+HNSW_M = safe_int_env("HNSW_M", 32)
+HNSW_EF_CONSTRUCTION = safe_int_env("HNSW_EF_CONSTRUCTION", 80)
+HNSW_EF_SEARCH = safe_int_env("HNSW_EF_SEARCH", 64)
+IVF_NPROBE = safe_int_env("IVF_NPROBE", 16)
+
+
+def select_backend(ntotal: int, backend: str = None) -> str:
+    """Backend for a corpus of `ntotal` vectors; `backend` (or VECTOR_BACKEND) overrides "auto"."""
+    backend = backend or VECTOR_BACKEND
+    if backend != "auto":
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown vector backend '{backend}', expected one of {BACKENDS}")
+        return backend
+    if ntotal <= VECTOR_NUMPY_MAX:
+        return "numpy"
+    if ntotal <= VECTOR_FLAT_MAX:
+        return "flat"
+    return VECTOR_LARGE_BACKEND
+
+
+class NumpyIndex:
+    """
+    Exact search over an in-memory float32 matrix. Implements the part of
+    the faiss Index interface retrieval uses: search, reconstruct,
+    reconstruct_n, ntotal, d and metric_type.
+    """
+
+    def __init__(self, vectors, metric_type=faiss.METRIC_L2):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.ntotal, self.d = self.vectors.shape
+        self.metric_type = metric_type
+        self._sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    def search(self, queries, k: int):
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.d)
+        inner = self.metric_type == faiss.METRIC_INNER_PRODUCT
+        top = min(k, self.ntotal)
+
+        dots = queries @ self.vectors.T
+        # Ranking only needs |x|² - 2q·x; |q|² is added to the returned distances
+        scores = -dots if inner else self._sq_norms - 2 * dots
+        if self.ntotal <= 1024:
+            # A full sort of a small row is cheaper than partition + sort
+            labels = np.argsort(scores, axis=1)[:, :top]
+        else:
+            part = np.argpartition(scores, top - 1, axis=1)[:, :top]
+            labels = np.take_along_axis(part, np.argsort(np.take_along_axis(scores, part, axis=1), axis=1), axis=1)
+        best = scores[np.arange(len(labels))[:, None], labels]
+        distances = -best if inner else np.maximum(best + (queries * queries).sum(1, keepdims=True), 0)
+
+        if top < k:
+            # faiss pads missing neighbours with label -1
+            fill = -np.inf if inner else np.inf
+            distances = np.pad(distances, ((0, 0), (0, k - top)), constant_values=fill)
+            labels = np.pad(labels, ((0, 0), (0, k - top)), constant_values=-1)
+        return distances.astype(np.float32), labels.astype(np.int64)
+
+    def reconstruct(self, i: int):
+        return self.vectors[int(i)].copy()
+
+    def reconstruct_n(self, i0: int, n: int):
+        return self.vectors[i0:i0 + n].copy()
+
+
+def index_vectors(index) -> np.ndarray:
+    """Every vector of a faiss (or Numpy) index as an (ntotal, d) float32 matrix."""
+    if index.ntotal == 0:
+        return np.zeros((0, index.d), dtype=np.float32)
+    return np.asarray(index.reconstruct_n(0, index.ntotal), dtype=np.float32)
+
+
+def _tune(index, backend: str):
+    # Query-time parameters aren't fixed at build time; set them on every load
+    if backend == "hnsw":
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif backend == "ivf":
+        index.nprobe = min(IVF_NPROBE, index.nlist)
+    return index
+
+
+def build_index(vectors, backend: str, metric_type=faiss.METRIC_L2):
+    """A search index of type `backend` over `vectors` (n x d), positions kept in order."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, d = vectors.shape
+    if backend == "numpy":
+        return NumpyIndex(vectors, metric_type)
+    if backend == "flat":
+        index = faiss.IndexFlat(d, metric_type)
+    elif backend == "hnsw":
+        index = faiss.IndexHNSWFlat(d, HNSW_M, metric_type)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif backend == "ivf":
+        # ~4·sqrt(n) lists, with enough training points per list for k-means
+        nlist = max(1, min(int(4 * math.sqrt(n)), n // 39))
+        index = faiss.IndexIVFFlat(faiss.IndexFlat(d, metric_type), d, nlist, metric_type)
+        index.train(vectors)
+    else:
+        raise ValueError(f"Unknown vector backend '{backend}', expected one of {BACKENDS}")
+    index.add(vectors)
+    if backend == "ivf":
+        index.make_direct_map()  # so retrieval can reconstruct hit vectors
+    return _tune(index, backend)
+
+
+def _flat_signature(index_base_path: str):
+    st = os.stat(index_base_path + ".faiss")
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _load_cached(index_base_path: str, backend: str):
+    meta_path = f"{index_base_path}.{backend}.json"
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("flat_signature") != _flat_signature(index_base_path):
+            return None
+        return _tune(faiss.read_index(f"{index_base_path}.{backend}.faiss"), backend)
+    except (OSError, ValueError, RuntimeError):
+        return None
+
+
+def _save_cached(index, index_base_path: str, backend: str):
+    path = f"{index_base_path}.{backend}.faiss"
+    try:
+        faiss.write_index(index, path + ".tmp")
+        os.replace(path + ".tmp", path)
+        with open(f"{index_base_path}.{backend}.json", "w", encoding="utf-8") as f:
+            json.dump({"flat_signature": _flat_signature(index_base_path), "ntotal": index.ntotal}, f)
+    except (OSError, RuntimeError) as e:
+        print(f"⚠️ Could not cache {backend} index for {index_base_path}: {e}")
+
+
+def search_index_for(flat_index, index_base_path: str = None, backend: str = None):
+    """
+    The search-side index for a loaded flat index: the flat index itself,
+    or a numpy/HNSW/IVF copy chosen by `select_backend`. HNSW and IVF
+    builds are cached next to `index_base_path`. Returns (index, backend).
+    """
+    chosen = select_backend(flat_index.ntotal, backend)
+    if chosen == "flat":
+        return flat_index, chosen
+
+    if chosen != "numpy" and index_base_path:
+        cached = _load_cached(index_base_path, chosen)
+        if cached is not None and cached.ntotal == flat_index.ntotal:
+            return cached, chosen
+
+    started = time.perf_counter()
+    index = build_index(index_vectors(flat_index), chosen, flat_index.metric_type)
+    if chosen != "numpy":
+        print(f"🏗️ Built {chosen} index over {index.ntotal} vectors in {time.perf_counter() - started:.2f}s")
+        if index_base_path:
+            _save_cached(index, index_base_path, chosen)
+    return index, chosen
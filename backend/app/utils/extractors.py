@@ -0,0 +1,123 @@
+import re
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w/.])\+?\(?\d[\d\s().-]{8,16}\d(?![\w/])")
+URL_RE = re.compile(r"(?:https?://|www\.)[^\s,;|)\]>]+", re.IGNORECASE)
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_%-]+/?", re.IGNORECASE)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9-]+/?", re.IGNORECASE)
+CGPA_RE = re.compile(
+    r"\b(?:C?GPA|CPI)\b\s*(?:of|:|-|=)?\s*(\d{1,2}(?:\.\d{1,2})?)\s*(?:/\s*(10|4)(?:\.0+)?)?",
+    re.IGNORECASE,
+)
+# Degree names near a GPA tell undergraduate from postgraduate ones
+PG_DEGREE_RE = re.compile(
+    r"\bM\.?\s?Tech\b|\bM\.E\.|\bM\.?S(?:c)?\b\.?|\bMBA\b|\bMCA\b|\bPh\.?D\b|\bPG\b"
+    r"|(?i:\bmaster'?s?\b|\bpost[-\s]?graduat\w*)"
+)
+UG_DEGREE_RE = re.compile(
+    r"\bB\.?\s?Tech\b|\bB\.E\.|\bB\.?S(?:c)?\b\.?|\bBCA\b|\bUG\b"
+    r"|(?i:\bbachelor'?s?\b|\bunder[-\s]?graduat\w*)"
+)
+
+NOT_MENTIONED = "Not mentioned"
+CONTACT_FIELDS = ("phone_number", "email_id", "linkedin", "github")
+
+
+def _unique(values):
+    seen = []
+    for v in values:
+        if v not in seen:
+            seen.append(v)
+    return seen
+
+
+def _normalize_url(url: str) -> str:
+    url = url.rstrip("/.")
+    return url if url.lower().startswith("http") else f"https://{url}"
+
+
+def _pick_email(text):
+    emails = _unique(e.lower() for e in EMAIL_RE.findall(text))
+    gmail = [e for e in emails if e.endswith("@gmail.com")]
+    if len(gmail) == 1:
+        return gmail[0], emails
+    return (emails[0] if len(emails) == 1 else None), emails
+
+
+def _pick_phone(text):
+    phones = []
+    for match in PHONE_RE.findall(text):
+        digits = re.sub(r"\D", "", match)
+        # 10 local digits, optionally with a country code
+        if 10 <= len(digits) <= 13:
+            phones.append(match.strip())
+    phones = _unique(phones)
+    return (phones[0] if len(phones) == 1 else None), phones
+
+
+def _pick_profile(regex, text):
+    links = _unique(_normalize_url(m) for m in regex.findall(text))
+    return (links[0] if len(links) == 1 else None), links
+
+
+def _is_postgraduate(text, match):
+    """True if the degree named on the GPA's line (or, failing that, the line above) is a PG one."""
+    line_start = text.rfind("\n", 0, match.start()) + 1
+    line_end = text.find("\n", match.end())
+    line = text[line_start:line_end if line_end != -1 else len(text)]
+    previous = text[text.rfind("\n", 0, max(line_start - 1, 0)) + 1:max(line_start - 1, 0)]
+    for context in (line, previous):
+        if PG_DEGREE_RE.search(context):
+            return True
+        if UG_DEGREE_RE.search(context):
+            return False
+    return False
+
+
+def _pick_cgpa(text):
+    values, settled = [], []
+    for match in CGPA_RE.finditer(text):
+        value, scale = match.groups()
+        cgpa = float(value)
+        if cgpa > (4 if scale == "4" else 10):
+            continue
+        values.append(cgpa)
+        # ug_cgpa is on the 10-point scale; 4-point and PG grades are left to the LLM
+        if scale != "4" and not _is_postgraduate(text, match):
+            settled.append(cgpa)
+    values, settled = _unique(values), _unique(settled)
+    # Several different GPAs (e.g. UG + PG) need judgement about which is undergraduate
+    return (settled[0] if len(values) == 1 and settled else None), values
+
+
+def extract_resume_fields(text: str) -> dict:
+    """
+    Deterministic pass over resume text.
+
+    Returns {"fields": {...}, "unresolved": {field: candidates}} where
+    `fields` holds every value the patterns settled unambiguously and
+    `unresolved` lists fields that were missing (no candidates) or
+    ambiguous (several candidates) and still need the LLM.
+    """
+    fields, unresolved = {}, {}
+
+    pickers = {
+        "email_id": _pick_email,
+        "phone_number": _pick_phone,
+        "linkedin": lambda t: _pick_profile(LINKEDIN_RE, t),
+        "github": lambda t: _pick_profile(GITHUB_RE, t),
+        "ug_cgpa": _pick_cgpa,
+    }
+    for field, pick in pickers.items():
+        value, candidates = pick(text)
+        if value is not None:
+            fields[field] = value
+        else:
+            unresolved[field] = candidates
+
+    # Portfolio, blog and similar links; LinkedIn/GitHub are covered above
+    fields["other_links"] = [
+        url for url in _unique(_normalize_url(u) for u in URL_RE.findall(text))
+        if "linkedin.com" not in url.lower() and "github.com" not in url.lower()
+    ]
+    return {"fields": fields, "unresolved": unresolved}
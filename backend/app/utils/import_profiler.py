@@ -0,0 +1,129 @@
+# backend/app/utils/import_profiler.py
+#
+# Startup report: imports the modules of an entry point in a fresh
+# interpreter under `python -X importtime` and lists what they cost,
+# per directly imported module (cumulative) and per top-level package
+# (self time summed over all its submodules).
+#
+# Run from the project root:
+#   python -m backend.app.utils.import_profiler                 # app and headless worker
+#   python -m backend.app.utils.import_profiler MODULE [...]    # any modules
+#   python -m backend.app.utils.import_profiler --top 15 --json startup.json
+
+import os
+import re
+import sys
+import ast
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+APP_SCRIPT = os.path.join(ROOT_DIR, "frontend", "streamlit_app.py")
+WORKER_MODULES = ["backend.app.services.agentic_rag_service"]
+# Loaded only on first use; a report that lists them shows a regression,
+# unless the target imports the package itself (the app needs streamlit)
+HEAVY_PACKAGES = ("torch", "sentence_transformers", "transformers", "streamlit", "fitz", "onnxruntime")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def script_imports(path: str) -> list:
+    """Modules imported at the top level of a script, in order."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def profile_imports(modules) -> dict:
+    """
+    Imports `modules` in a child interpreter and parses its -X importtime
+    log. Returns wall time, the per-module entries and the package totals
+    (all times in milliseconds).
+    """
+    code = (
+        "import time, sys\n"
+        "started = time.perf_counter()\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + "print(time.perf_counter() - started)\n"
+        + f"print(','.join(m for m in {HEAVY_PACKAGES!r} if m in sys.modules))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+
+    packages = defaultdict(float)
+    for e in entries:
+        packages[e["module"].split(".")[0]] += e["self_ms"]
+
+    wall_s, heavy = proc.stdout.splitlines()[-2:]
+    requested = {m.split(".")[0] for m in modules}
+    return {
+        "modules": list(modules),
+        "wall_ms": float(wall_s) * 1000,
+        "heavy_loaded": [m for m in heavy.split(",") if m and m not in requested],
+        "direct": sorted((e for e in entries if e["module"] in modules),
+                         key=lambda e: e["cumulative_ms"], reverse=True),
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)),
+        "entries": entries,
+    }
+
+
+def print_report(name: str, report: dict, top: int):
+    print(f"\n⏱️ {name}: {report['wall_ms']:.0f} ms to import {len(report['modules'])} modules")
+    if report["heavy_loaded"]:
+        print(f"   ⚠️ heavy packages loaded at import: {', '.join(report['heavy_loaded'])}")
+    print("   by module (cumulative):")
+    for e in report["direct"][:top]:
+        print(f"     {e['cumulative_ms']:>9.1f} ms  {e['module']}")
+    print("   by package (self):")
+    for package, ms in list(report["packages"].items())[:top]:
+        print(f"     {ms:>9.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import cost per module")
+    parser.add_argument("modules", nargs="*", help="modules to import (default: app and headless worker)")
+    parser.add_argument("--top", type=int, default=10, help="rows per table")
+    parser.add_argument("--json", help="write the full reports to this file")
+    args = parser.parse_args()
+
+    if args.modules:
+        targets = {"modules": args.modules}
+    else:
+        targets = {
+            "streamlit app": script_imports(APP_SCRIPT),
+            "headless worker": WORKER_MODULES,
+        }
+
+    reports = {}
+    for name, modules in targets.items():
+        reports[name] = profile_imports(modules)
+        print_report(name, reports[name], args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n[SAVED] 💾 {args.json}")
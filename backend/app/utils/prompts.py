@@ -1,4 +1,4 @@
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 resume_answer_prompt = PromptTemplate(
     template="""
@@ -37,39 +37,43 @@ grading_prompt = PromptTemplate(
     input_variables=["question", "document"],
 )
 
-contact_prompt = PromptTemplate(
+batch_grading_prompt = PromptTemplate(
     template="""
-     You are an information extraction assistant.
-     From the resume text below, extract ONLY:
-     - phone_number
-     - email_id (prefer Gmail if multiple emails)
-     - linkedin (profile link)
-     - github (profile link)
-     - other_links (any portfolio, website, or other professional links)
-
-     Rules:
-     - If not found, write "Not mentioned".
-     - For `other_links`, return a JSON array of strings (URLs).
-     - Output ONLY valid JSON. Do not add explanations.
-
-     Resume Text:
-     {resume}
+    You are checking which retrieved pieces of a resume contain information relevant to the given question.
+
+    Judge every document on its own.
+    Return only a JSON array with one entry per document, in order: "yes" if relevant, otherwise "no".
+    Example for three documents: ["yes", "no", "yes"]
+
+    Documents:
+    {documents}
+
+    Question: {question}
     """,
-    input_variables=["resume"],
+    input_variables=["question", "documents"],
 )
 
-
-cgpa_prompt = PromptTemplate(
+missing_details_prompt = PromptTemplate(
     template="""
-    From the following resume text, extract ONLY the undergraduate CGPA.
-    - If multiple GPAs are mentioned, choose the undergraduate one.
-    - Return only the numeric value (e.g., 9.2).
-    - If not mentioned, return "0".
+    You are an information extraction assistant.
+    From the resume text below, extract ONLY these fields: {fields}
+
+    Field meanings:
+    - phone_number
+    - email_id (prefer Gmail if multiple emails)
+    - linkedin (profile link)
+    - github (profile link)
+    - ug_cgpa (the undergraduate CGPA as a number, e.g. 9.2; if multiple GPAs are mentioned, choose the undergraduate one; give it on a 10-point scale, converting a 4-point GPA by multiplying by 2.5)
+
+    Candidates already found by pattern matching (may be empty or ambiguous):
+    {candidates}
+
+    Rules:
+    - If a field is not found, write "Not mentioned" (for ug_cgpa write 0).
+    - Output ONLY a valid JSON object with exactly the requested keys. Do not add explanations.
 
     Resume Text:
     {resume}
-
-    Output should be just cgpa (e.g., 8.01, 9.12)
     """,
-    input_variables=["resume"],
+    input_variables=["fields", "candidates", "resume"],
 )
@@ -0,0 +1,360 @@
+# backend/app/utils/tracing.py
+#
+# Per-request tracing: nested spans with durations and attributes (route,
+# retrieval scores, API-key slot, token counts, cache hits...). The span
+# opened with no span around it is the root of a new trace; spans follow
+# the request through asyncio tasks and asyncio.to_thread, and through
+# thread pools when the submitted function is wrapped with `bind`.
+#
+# Off unless TRACE_EXPORTER is set:
+#   jsonl  one JSON object per span, appended to TRACE_JSONL_PATH
+#   otlp   OTLP/HTTP JSON posted to TRACE_OTLP_ENDPOINT (an OpenTelemetry
+#          collector, Jaeger, Tempo...)
+# Finished traces are kept with probability TRACE_SAMPLE_RATE; traces
+# slower than TRACE_SLOW_MS, or that raised, are always kept so the tail
+# is never sampled away. Export runs on a background thread.
+#
+# Where the time goes, from a JSONL file (run from the project root):
+#   python -m backend.app.utils.tracing [data/traces.jsonl] [--slowest N]
+
+import os
+import json
+import time
+import queue
+import random
+import atexit
+import secrets
+import inspect
+import argparse
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+from ..config import safe_float_env
+
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # "none" | "jsonl" | "otlp"
+TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", os.path.join("data", "traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "agentic-rag-chatbot")
+TRACE_SAMPLE_RATE = safe_float_env("TRACE_SAMPLE_RATE", 1.0)
+TRACE_SLOW_MS = safe_float_env("TRACE_SLOW_MS", 0.0)  # 0 disables always-keep of slow traces
+
+# Summed over a trace's spans onto its root
+ROOT_TOTALS = ("input_tokens", "output_tokens")
+
+_current = contextvars.ContextVar("tracing_span", default=None)
+
+
+# ======================================================
+# Spans
+# ======================================================
+class Span:
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "_started")
+
+    def __init__(self, trace, name: str, parent_id, attributes: dict):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter()
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def add(self, key: str, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is off, so call sites never check."""
+
+    def set(self, **attributes):
+        return self
+
+    def add(self, key: str, amount=1):
+        return self
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans = []
+        self.lock = threading.Lock()
+
+
+def current_span():
+    """The innermost open span, or a no-op span outside any trace."""
+    return _current.get() or NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times the block as a child of the current span (a new trace if there is none)."""
+    if _exporter is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current.get()
+    trace = parent.trace if parent is not None else _Trace()
+    s = Span(trace, name, parent.span_id if parent is not None else None, attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except GeneratorExit:
+        raise  # a streaming consumer stopped early; not an error
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # A generator holding the span was closed from another context (e.g. at GC)
+            pass
+        s.end_ns = s.start_ns + int((time.perf_counter() - s._started) * 1e9)
+        with trace.lock:
+            trace.spans.append(s)
+        if parent is None:
+            _finish_trace(trace, s)
+
+
+def traced(name: str = None, **attributes):
+    """Decorator: runs every call (sync or async) inside `span(name)`."""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def run_async(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await fn(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+        return run
+    return decorate
+
+
+def bind(fn):
+    """`fn` running under the current span, for ThreadPoolExecutor.submit and the like."""
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def _finish_trace(trace: _Trace, root: Span):
+    with trace.lock:
+        spans = list(trace.spans)
+    for key in ROOT_TOTALS:
+        total = sum(s.attributes.get(key, 0) for s in spans if s is not root)
+        if total:
+            root.attributes[key] = root.attributes.get(key, 0) + total
+    root.attributes["spans"] = len(spans)
+
+    slow = TRACE_SLOW_MS > 0 and root.duration_ms >= TRACE_SLOW_MS
+    failed = any(s.error for s in spans)
+    if slow or failed or random.random() < TRACE_SAMPLE_RATE:
+        _exporter.submit(spans)
+
+
+# ======================================================
+# Exporters
+# ======================================================
+class _BackgroundExporter:
+    """Queues finished traces and writes them from one daemon thread."""
+
+    def __init__(self, write):
+        self._write = write
+        self._queue = queue.Queue(maxsize=10000)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, spans):
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass  # never slow a request down for its trace
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty() and len(batch) < 100:
+                batch.append(self._queue.get_nowait())
+            try:
+                self._write([s for spans in batch for s in spans])
+            except Exception as e:
+                print(f"⚠️ Trace export failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        self._queue.join()
+
+
+def _write_jsonl(spans):
+    os.makedirs(os.path.dirname(TRACE_JSONL_PATH) or ".", exist_ok=True)
+    with open(TRACE_JSONL_PATH, "a", encoding="utf-8") as f:
+        for s in spans:
+            f.write(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans) -> dict:
+    """Spans as an OTLP/JSON ExportTraceServiceRequest."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": [
+                {
+                    "traceId": s.trace.trace_id,
+                    "spanId": s.span_id,
+                    **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                    "name": s.name,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(s.start_ns),
+                    "endTimeUnixNano": str(s.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                    "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                }
+                for s in spans
+            ],
+        }],
+    }]}
+
+
+def _post_otlp(spans):
+    import httpx
+
+    httpx.post(TRACE_OTLP_ENDPOINT, json=otlp_payload(spans), timeout=5.0).raise_for_status()
+
+
+def _make_exporter(kind: str):
+    if kind == "jsonl":
+        return _BackgroundExporter(_write_jsonl)
+    if kind == "otlp":
+        return _BackgroundExporter(_post_otlp)
+    if kind not in ("", "none"):
+        print(f"⚠️ Unknown TRACE_EXPORTER '{kind}' (expected jsonl, otlp or none); tracing is off")
+    return None
+
+
+_exporter = _make_exporter(TRACE_EXPORTER)
+
+
+def flush():
+    """Blocks until every finished trace has been exported."""
+    if _exporter is not None:
+        _exporter.flush()
+
+
+# ======================================================
+# Report
+# ======================================================
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def load_spans(path: str = TRACE_JSONL_PATH) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def span_stats(spans) -> dict:
+    """p50/p95/p99 milliseconds per span name."""
+    durations = defaultdict(list)
+    for s in spans:
+        durations[s["name"]].append(s["duration_ms"])
+    stats = {}
+    for name, values in durations.items():
+        ordered = sorted(values)
+        stats[name] = {
+            "n": len(ordered),
+            **{f"p{p}_ms": _percentile(ordered, p) for p in (50, 95, 99)},
+        }
+    return dict(sorted(stats.items(), key=lambda item: item[1]["p99_ms"], reverse=True))
+
+
+def print_slowest(spans, n: int):
+    """The `n` slowest traces, each as an indented span tree."""
+    by_trace = defaultdict(list)
+    for s in spans:
+        by_trace[s["trace_id"]].append(s)
+    roots = sorted((s for s in spans if s["parent_id"] is None), key=lambda s: s["duration_ms"], reverse=True)
+
+    def show(s, children, depth):
+        flag = "  ❌ " + s["error"] if s.get("error") else ""
+        print(f"   {'  ' * depth}{s['duration_ms']:>9.1f} ms  {s['name']}{flag}")
+        for child in sorted(children.get(s["span_id"], []), key=lambda c: c["start"]):
+            show(child, children, depth + 1)
+
+    for root in roots[:n]:
+        children = defaultdict(list)
+        for s in by_trace[root["trace_id"]]:
+            children[s["parent_id"]].append(s)
+        print(f"\n🐢 trace {root['trace_id']}  {json.dumps(root['attributes'], default=str)[:160]}")
+        show(root, children, 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency per span name from a JSONL trace file")
+    parser.add_argument("path", nargs="?", default=TRACE_JSONL_PATH)
+    parser.add_argument("--slowest", type=int, default=3, help="slowest traces to print as trees")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    print(f"{'span':<36}{'n':>6}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for name, row in span_stats(spans).items():
+        print(f"{name:<36}{row['n']:>6}{row['p50_ms']:>9.1f}ms{row['p95_ms']:>9.1f}ms{row['p99_ms']:>9.1f}ms")
+    print_slowest(spans, args.slowest)
@@ -1,8 +1,8 @@
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from app import config
+from app.services.embedding_service import get_embedding_model
 
 def load_vectorstore(pdf_path="./data/sample_resume.pdf"):
     try:
@@ -15,7 +15,7 @@ def load_vectorstore(pdf_path="./data/sample_resume.pdf"):
         )
         splits = text_splitter.split_documents(docs)
 
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        embeddings = get_embedding_model()
         vectorstore = FAISS.from_documents(documents=splits, embedding=embeddings)
         return vectorstore.as_retriever()
     except Exception as e:
@@ -7,8 +7,9 @@ def visualize_workflow():
     nodes = [
         "retrieve",
         "grade_documents",
-        "extract_contact",
-        "extract_cgpa",
+        "extract_details",
+        "analyze_github",
+        "debug",
         "check_cgpa",
         "send_email",
         "generate",
@@ -20,10 +21,11 @@ def visualize_workflow():
     # Edges
     edges = [
         ("retrieve", "grade_documents"),
-        ("grade_documents", "extract_contact", "if route == 'generate'"),
+        ("grade_documents", "extract_details", "if route == 'generate'"),
         ("grade_documents", "retrieve", "if route == 'retrieve'"),
-        ("extract_contact", "extract_cgpa"),
-        ("extract_cgpa", "check_cgpa"),
+        ("extract_details", "analyze_github"),
+        ("analyze_github", "debug"),
+        ("debug", "check_cgpa"),
         ("check_cgpa", "send_email", "if route == 'send_email'"),
         ("check_cgpa", "generate", "if route == 'generate'"),
         ("send_email", "generate"),
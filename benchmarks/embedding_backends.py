@@ -0,0 +1,102 @@
+# benchmarks/embedding_backends.py
+#
+# Throughput and latency of the torch (sentence-transformers) and ONNX
+# int8 embedding backends on the same texts: model load time, documents
+# per second through embed_documents, single-query p50/p95, queries per
+# second from concurrent callers, and the cosine agreement between the
+# two. The ONNX model must be exported first:
+#   python -m backend.app.services.onnx_embeddings export
+#
+# Run from the project root:
+#   python -m benchmarks.embedding_backends [--docs N] [--queries N] [--threads T] [--json out.json]
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.app.services.embedding_service import DEFAULT_EMBEDDING_MODEL, get_embedding_model
+from backend.app.services.onnx_embeddings import PARITY_TEXTS, parity_check
+
+BACKENDS = ("torch", "onnx")
+
+
+def synthetic_texts(n: int, seed: int = 0):
+    """Resume/project-like sentences of mixed length, built from the parity texts."""
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(PARITY_TEXTS, rng.randint(1, 4))) for _ in range(n)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(backend: str, model_name: str, docs, queries, threads: int):
+    started = time.perf_counter()
+    model = get_embedding_model(model_name, backend)
+    model.embed_query("warm-up")
+    load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model.embed_documents(docs)
+    docs_s = time.perf_counter() - started
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        model.embed_query(query)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(model.embed_query, queries))
+    concurrent_s = time.perf_counter() - started
+
+    return model, {
+        "backend": backend,
+        "load_s": load_s,
+        "docs_per_s": len(docs) / docs_s,
+        "query_p50_ms": percentile(latencies, 50) * 1000,
+        "query_p95_ms": percentile(latencies, 95) * 1000,
+        f"queries_per_s_{threads}_threads": len(queries) / concurrent_s,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the torch and ONNX embedding backends")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--docs", type=int, default=512, help="documents embedded in one call")
+    parser.add_argument("--queries", type=int, default=200, help="single queries timed")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent query callers")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    docs = synthetic_texts(args.docs)
+    queries = synthetic_texts(args.queries, seed=1)
+    models, results = {}, []
+    for backend in BACKENDS:
+        models[backend], row = measure(backend, args.model, docs, queries, args.threads)
+        results.append(row)
+        print(
+            f"{backend:<6} load {row['load_s']:.2f}s   {row['docs_per_s']:.0f} docs/s   "
+            f"query p50 {row['query_p50_ms']:.2f} ms  p95 {row['query_p95_ms']:.2f} ms   "
+            f"{row[f'queries_per_s_{args.threads}_threads']:.0f} queries/s ({args.threads} threads)"
+        )
+
+    parity = parity_check(args.model, docs[:64], reference=models["torch"], candidate=models["onnx"])
+    print(f"cosine torch vs onnx: mean {parity['mean_cosine']:.4f}, min {parity['min_cosine']:.4f}"
+          + ("" if parity["passed"] else "  ❌ below threshold"))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"backends": results, "parity": parity}, f, indent=2)
+        print(f"\n[SAVED] 💾 {args.json}")
@@ -0,0 +1,544 @@
+# benchmarks/offline_stages.py
+#
+# Per-stage latency of the agentic RAG pipeline, the LangGraph resume
+# workflow, the GitHub sync and the project summaries, with no network:
+# - every LLM call goes through the real Groq pool to a deterministic stub
+#   chat model with configurable latency (answers are picked by prompt)
+# - GitHub is served from local fixtures (the analyses in
+#   data/github_repos/*.json by default) through a requests adapter
+# - embeddings are hash-based unless --embeddings model is given
+# Everything is written to a temporary workspace, never to data/.
+#
+# Reports p50/p95 per stage. --json saves the run (with the git commit and
+# settings) and --compare prints the change against a saved run.
+#
+# Run from the project root:
+#   python -m benchmarks.offline_stages [--queries N] [--rounds R] [--llm-latency-ms MS]
+#       [--fail-rate F] [--suites rag,workflow,github,summarize] [--json out.json] [--compare old.json]
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# The LangGraph nodes import `app.…`, so every backend module is imported
+# through that root here: one copy of each, and the stubs reach all of them
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+EVAL_PATH = os.path.join(ROOT_DIR, "data", "router_eval.json")
+USER_DATA_PATH = os.path.join(ROOT_DIR, "data", "user_data.json")
+FIXTURES_DIR = os.path.join(ROOT_DIR, "data", "github_repos")
+SUITES = ("rag", "workflow", "github", "summarize")
+FIXTURE_USER = "fixture-user"
+FIXTURE_PUSHED_AT = "2024-01-01T00:00:00Z"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _unit(text: str) -> float:
+    """Deterministic value in [0, 1) for `text`."""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16) / 0x100000000
+
+
+# ======================================================
+# Stage timer
+# ======================================================
+class StageTimer:
+    """
+    Wall time per named stage. Stages wrapped with `exclusive=True` report
+    their own time only: stages nested inside them (on the same thread)
+    are subtracted.
+    """
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.samples[name].append(seconds)
+
+    def wrap(self, name: str, fn, exclusive: bool = False):
+        def timed(*args, **kwargs):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.record(name, elapsed - nested if exclusive else elapsed)
+        return timed
+
+    def summary(self) -> dict:
+        return {
+            name: {
+                "runs": len(values),
+                "mean_ms": statistics.mean(values) * 1000,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+            }
+            for name, values in sorted(self.samples.items())
+        }
+
+
+# ======================================================
+# Stub chat model
+# ======================================================
+class StubResponses:
+    """
+    Picks the stub's answer from the prompt, so every parser downstream
+    gets the shape it expects. Routes come from the router evaluation set;
+    answers whose question hashes below `fail_rate` are graded "fail", so
+    the revise stage runs for a fixed share of queries.
+    """
+
+    def __init__(self, routes: dict, fail_rate: float):
+        self.routes = routes
+        self.fail_rate = fail_rate
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def __call__(self, prompt: str) -> str:
+        if "routing AI" in prompt:
+            self._count("route")
+            match = re.search(r'Query: "(.*)"', prompt)
+            return self.routes.get(match.group(1) if match else "", "both")
+        if "evaluator checking" in prompt:
+            self._count("grade")
+            match = re.search(r"Question: (.*)", prompt)
+            if _unit(match.group(1).strip() if match else prompt) < self.fail_rate:
+                return json.dumps({"grade": "fail", "feedback": "The answer leaves out details from the context."})
+            return json.dumps({"grade": "pass", "feedback": "Accurate and complete."})
+        if "did not meet expectations" in prompt:
+            self._count("revise")
+            return "Revised answer: " + self._answer(prompt)
+        if "one entry per document" in prompt:
+            self._count("grade_documents")
+            return json.dumps(["yes"] * max(1, len(re.findall(r"^\s*\[\d+\]", prompt, re.MULTILINE))))
+        if 'Return only "yes"' in prompt:
+            self._count("grade_documents")
+            return "yes"
+        if "extract ONLY these fields" in prompt:
+            self._count("extract")
+            fields = re.search(r"extract ONLY these fields: (.*)", prompt).group(1).split(", ")
+            return json.dumps({f.strip(): 0 if f.strip() == "ug_cgpa" else "Not mentioned" for f in fields})
+        if "project titles" in prompt:
+            self._count("summarize")
+            return "Offline Fixture Project using Python"
+        if "extracts technologies" in prompt:
+            self._count("summarize")
+            return json.dumps(["Python", "LangChain", "FAISS"])
+        if "resume writer" in prompt:
+            self._count("summarize")
+            return json.dumps({"features": [
+                "Designed a modular pipeline with clear stage boundaries.",
+                "Implemented data processing and model serving components.",
+                "Measured and reduced latency across the request path.",
+            ]})
+        self._count("answer")
+        return self._answer(prompt)
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        # ~60 words, stable for a given prompt
+        words = re.findall(r"[A-Za-z]{4,}", prompt)[-200:] or ["answer"]
+        offset = int(_unit(prompt) * len(words))
+        return " ".join(words[(offset + i * 7) % len(words)] for i in range(60)) + "."
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model answering through `responder(prompt)` after `latency_ms`
+    plus a deterministic share of `jitter_ms`. Reports rough token usage
+    (4 characters per token).
+    """
+
+    responder: Any
+    latency_ms: float = 300.0
+    jitter_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline-stub"
+
+    def _reply(self, messages):
+        prompt = "\n".join(str(m.content) for m in messages)
+        content = self.responder(prompt)
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        delay = (self.latency_ms + self.jitter_ms * _unit(prompt)) / 1000
+        return delay, ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, result = self._reply(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, result = self._reply(messages)
+        await asyncio.sleep(delay)
+        return result
+
+
+# ======================================================
+# GitHub fixtures
+# ======================================================
+class GitHubFixtures(BaseAdapter):
+    """
+    Answers the GitHub API and raw.githubusercontent.com requests that
+    github_service makes from saved repository analyses: any user owns
+    every fixture repo. Responses carry an ETag and conditional requests
+    get a 304, like the real API. Every request waits `latency_ms`.
+    """
+
+    def __init__(self, analyses, latency_ms: float = 0.0):
+        super().__init__()
+        self.repos = {a["repository"]: self._with_root_files(a) for a in analyses}
+        self.latency_s = latency_ms / 1000
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _with_root_files(analysis):
+        files = list(analysis.get("files_name", []))
+        roots = {f.lower() for f in files if "/" not in f}
+        if analysis.get("readme") and not roots & {"readme.md", "readme.rst", "readme.txt", "readme"}:
+            files.append("README.md")
+        if analysis.get("requirements") and not roots & {"requirements.txt", "setup.py", "pyproject.toml"}:
+            files.append("requirements.txt")
+        return {**analysis, "files_name": files}
+
+    def _sha(self, name: str) -> str:
+        return hashlib.sha1(json.dumps(self.repos[name], sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _route(self, url):
+        parts = [p for p in url.path.split("/") if p]
+        if url.netloc == "raw.githubusercontent.com" and len(parts) >= 4 and parts[1] in self.repos:
+            repo, path = self.repos[parts[1]], "/".join(parts[3:])
+            name = path.lower()
+            if name.startswith("readme"):
+                return repo.get("readme", "")
+            if name in ("requirements.txt", "setup.py", "pyproject.toml"):
+                return repo.get("requirements", "")
+            return f"# {path}\n"
+        if parts[:1] == ["users"] and parts[2:] == ["repos"]:
+            return [{"name": name, "default_branch": "main", "pushed_at": FIXTURE_PUSHED_AT} for name in self.repos]
+        if parts[:1] == ["repos"] and len(parts) >= 3 and parts[2] in self.repos:
+            name, rest = parts[2], parts[3:]
+            if not rest:
+                return {"name": name, "default_branch": "main"}
+            if rest[0] == "branches":
+                return {"name": rest[1], "commit": {"sha": self._sha(name)}}
+            if rest[:2] == ["git", "trees"]:
+                tree = [{"path": f, "type": "blob", "size": 1000} for f in self.repos[name]["files_name"]]
+                return {"sha": self._sha(name), "tree": tree, "truncated": False}
+        return None
+
+    def send(self, request, **kwargs):
+        time.sleep(self.latency_s)
+        url = urlparse(request.url)
+        body = self._route(url)
+        with self._lock:
+            self.requests["found" if body is not None else "not_found"] += 1
+
+        resp = requests.Response()
+        resp.request, resp.url, resp.encoding = request, request.url, "utf-8"
+        resp.headers = CaseInsensitiveDict()
+        if body is None:
+            resp.status_code, resp.reason, resp._content = 404, "Not Found", b'{"message": "Not Found"}'
+            return resp
+        content = (body if isinstance(body, str) else json.dumps(body)).encode("utf-8")
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        resp.headers["ETag"] = etag
+        if request.headers.get("If-None-Match") == etag:
+            resp.status_code, resp.reason, resp._content = 304, "Not Modified", b""
+            with self._lock:
+                self.requests["not_modified"] += 1
+        else:
+            resp.status_code, resp.reason, resp._content = 200, "OK", content
+        return resp
+
+    def close(self):
+        pass
+
+
+def load_fixtures(fixtures_dir: str):
+    analyses = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        if name.endswith(".json"):
+            with open(os.path.join(fixtures_dir, name), "r", encoding="utf-8") as f:
+                analysis = json.load(f)
+            if analysis.get("repository"):
+                analyses.append(analysis)
+    return analyses
+
+
+# ======================================================
+# Environment
+# ======================================================
+def prepare_workspace(args) -> str:
+    """
+    Moves into a fresh temporary directory (every data/ path in the backend
+    is relative) and sets the environment the backend reads at import time.
+    """
+    workspace = tempfile.mkdtemp(prefix="offline-stages-")
+    os.makedirs(os.path.join(workspace, "data"))
+    shutil.copy(USER_DATA_PATH, os.path.join(workspace, "data", "user_data.json"))
+    os.chdir(workspace)
+    os.environ["LLM_CACHE_ENABLED"] = "0"   # every call must reach the stub
+    os.environ["CONTEXT_LOG_PATH"] = ""
+    os.environ.pop("GITHUB_TOKEN", None)
+    return workspace
+
+
+def install_stubs(args, responses: StubResponses, analyses):
+    """Stub LLM behind the real pool, fixture GitHub, and (optionally) hash embeddings."""
+    from app.services import groq_pool, github_service
+    from app.services.embedding_service import register_embedding_model
+
+    stub = StubChatModel(responder=responses, latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms)
+    keys = [f"offline-key-{i}" for i in range(1, args.keys + 1)]
+    groq_pool.set_pool(groq_pool.GroqClientPool(keys, client_factory=lambda slot, model, temperature: stub))
+
+    fixtures = GitHubFixtures(analyses, args.github_latency_ms)
+    github_service.session.mount("https://", fixtures)
+
+    if args.embeddings == "hash":
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        register_embedding_model(DeterministicFakeEmbedding(size=384))
+    return fixtures
+
+
+def build_indexes(analyses):
+    """Resume, project and unified indexes in the workspace, from user_data.json and the fixtures."""
+    from app.services.embedding_service import (
+        embed_project_summaries, embed_repository_code, embed_resume_text,
+    )
+
+    with open("data/user_data.json", "r", encoding="utf-8") as f:
+        embed_resume_text(json.load(f))
+    projects = [
+        {"title": a["repository"].replace("-", " ").replace("_", " "), "repository": a["repository"],
+         "technologies": [], "features": [a.get("readme", "")[:300] or ", ".join(a.get("files_name", [])[:10])]}
+        for a in analyses
+    ]
+    embed_project_summaries(projects)
+    embed_repository_code(analyses)
+
+
+def load_queries(limit: int):
+    """Non-meeting queries from the router evaluation set, and every query's expected route."""
+    with open(EVAL_PATH, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    routes = {item["query"]: item["route"] for item in items}
+    return [item["query"] for item in items if item["route"] != "meeting"][:limit], routes
+
+
+# ======================================================
+# Suites
+# ======================================================
+def run_rag(timer: StageTimer, queries, rounds: int):
+    from app.services import agentic_rag_service as rag
+
+    rag.route_query = timer.wrap("rag.route", rag.route_query)
+    rag.retrieve = timer.wrap("rag.retrieve", rag.retrieve)
+    # Answer = context packing + LLM call, without the retrieval nested in it
+    rag.retrieve_answer = timer.wrap("rag.answer", rag.retrieve_answer, exclusive=True)
+    rag.grade_answer = timer.wrap("rag.grade", rag.grade_answer)
+    rag.revise_answer = timer.wrap("rag.revise", rag.revise_answer)
+    # A query the local router sends to "meeting" must not send mail
+    rag.meeting_scheduler_node = timer.wrap("rag.meeting", lambda: None)
+
+    sequential = timer.wrap("rag.pipeline_sequential", rag.agentic_rag_pipeline_sequential)
+    concurrent = timer.wrap("rag.pipeline_async", lambda q: asyncio.run(rag.agentic_rag_pipeline_async(q, use_cache=False)))
+    for _ in range(rounds):
+        for query in queries:
+            sequential(query, use_cache=False)
+            concurrent(query)
+
+
+def run_workflow(timer: StageTimer, queries, rounds: int):
+    from langchain_core.documents import Document
+    from langchain_core.runnables import RunnableLambda
+    import app.workflow as workflow
+    import app.nodes.email_node as email_node
+    from app.services.agentic_rag_service import search_index
+
+    for name in ("retrieve_docs", "grade_documents", "extract_resume_details", "analyze_github_node",
+                 "print_state", "check_cgpa", "send_email_node", "generate_answer"):
+        setattr(workflow, name, timer.wrap(f"workflow.{name}", getattr(workflow, name)))
+    email_node.send_email = lambda recipient, subject, body: None
+
+    retriever = RunnableLambda(
+        lambda question: [Document(page_content=c["text"]) for c in search_index("resume", question) or []]
+    )
+    graph = timer.wrap("workflow.total", workflow.build_workflow(retriever).invoke)
+    for _ in range(rounds):
+        for query in queries:
+            graph({"question": query})
+
+
+def run_github(timer: StageTimer, rounds: int):
+    from app.services import github_service
+    from app.services.http_cache import http_cache
+
+    github_service.analyze_repository = timer.wrap("github.analyze_repository", github_service.analyze_repository)
+    for _ in range(rounds):
+        shutil.rmtree(github_service.OUTPUT_DIR, ignore_errors=True)
+        http_cache.clear()
+        timer.wrap("github.sync_cold", github_service.sync_github_repos)(FIXTURE_USER)
+        # Nothing pushed since: every repo is skipped without a request per repo
+        timer.wrap("github.sync_warm", github_service.sync_github_repos)(FIXTURE_USER)
+
+
+def run_summarize(timer: StageTimer, analyses, rounds: int, role: str):
+    from app.services import llm_service
+
+    llm_service.summarize_project = timer.wrap("summarize.project", llm_service.summarize_project)
+    for _ in range(rounds):
+        shutil.rmtree(llm_service.PROJECT_DETAILS_DIR, ignore_errors=True)
+        os.makedirs(llm_service.PROJECT_DETAILS_DIR, exist_ok=True)
+        timer.wrap("summarize.all", llm_service.summarize_projects)(analyses, role)
+
+
+# ======================================================
+# Report
+# ======================================================
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_stages(stages: dict, previous: dict = None):
+    print(f"\n{'stage':<38}{'runs':>6}{'p50':>11}{'p95':>11}" + ("   Δp50     Δp95" if previous else ""))
+    for name, row in stages.items():
+        line = f"{name:<38}{row['runs']:>6}{row['p50_ms']:>9.1f}ms{row['p95_ms']:>9.1f}ms"
+        old = (previous or {}).get(name)
+        if old:
+            line += "".join(
+                f"{(row[key] - old[key]) / old[key] * 100:>+8.1f}%" if old[key] else f"{'n/a':>9}"
+                for key in ("p50_ms", "p95_ms")
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline per-stage latency with a stub LLM and GitHub fixtures")
+    parser.add_argument("--queries", type=int, default=8, help="queries from the router evaluation set")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--suites", default=",".join(SUITES), help="comma-separated subset of " + ", ".join(SUITES))
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="stub LLM latency per call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0, help="extra 0..N ms, fixed per prompt")
+    parser.add_argument("--fail-rate", type=float, default=0.25, help="share of answers graded 'fail'")
+    parser.add_argument("--keys", type=int, default=2, help="API key slots in the stub pool")
+    parser.add_argument("--github-latency-ms", type=float, default=30.0, help="fixture latency per GitHub request")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="directory of repository analyses (*.json)")
+    parser.add_argument("--embeddings", choices=("hash", "model"), default="hash",
+                        help="hash: no model needed; model: the configured embedding model")
+    parser.add_argument("--role", default="Software Engineer", help="role used for project summaries")
+    parser.add_argument("--json", help="write the run to this file")
+    parser.add_argument("--compare", help="saved run to compare against")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suites.split(",")]
+    json_path = os.path.abspath(args.json) if args.json else None
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    queries, routes = load_queries(args.queries)
+    analyses = load_fixtures(os.path.abspath(args.fixtures))
+    workspace = prepare_workspace(args)
+    responses = StubResponses(routes, args.fail_rate)
+    fixtures = install_stubs(args, responses, analyses)
+    print(f"📦 Workspace {workspace}: {len(queries)} queries, {len(analyses)} fixture repos")
+    build_indexes(analyses)
+
+    timer, skipped = StageTimer(), {}
+    started = time.perf_counter()
+    try:
+        for suite in suites:
+            print(f"\n========== {suite.upper()} ==========")
+            try:
+                if suite == "rag":
+                    run_rag(timer, queries, args.rounds)
+                elif suite == "workflow":
+                    run_workflow(timer, queries, args.rounds)
+                elif suite == "github":
+                    run_github(timer, args.rounds)
+                elif suite == "summarize":
+                    run_summarize(timer, analyses, args.rounds, args.role)
+                else:
+                    raise ValueError(f"Unknown suite '{suite}', expected one of {SUITES}")
+            except ImportError as e:
+                # e.g. the LangGraph nodes need the `langchain.prompts` shim
+                skipped[suite] = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Skipping {suite}: {skipped[suite]}")
+    finally:
+        os.chdir(ROOT_DIR)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "wall_s": time.perf_counter() - started,
+        "stages": timer.summary(),
+        "llm_calls": dict(responses.calls),
+        "github_requests": dict(fixtures.requests),
+        "skipped": skipped,
+    }
+    print_stages(result["stages"], previous and previous.get("stages"))
+    print(f"\nLLM calls: {dict(responses.calls)}   GitHub requests: {dict(fixtures.requests)}")
+    for suite, reason in skipped.items():
+        print(f"skipped {suite}: {reason}")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n[SAVED] 💾 {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/pipeline_latency.py
+#
+# End-to-end latency of the sequential agentic RAG pipeline vs the async one
+# (speculative retrieval while routing). Uses the real Groq models, so the
+# GROQ_API_KEY_* variables must be set. The semantic cache is bypassed.
+#
+# Run from the project root:
+#   python -m benchmarks.pipeline_latency [--queries N] [--rounds R]
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.app.services.agentic_rag_service import (
+    agentic_rag_pipeline_async,
+    agentic_rag_pipeline_sequential,
+)
+
+EVAL_PATH = os.path.join("data", "router_eval.json")
+
+
+def load_queries(limit: int):
+    """Non-meeting queries from the router evaluation set (meetings send email)."""
+    with open(EVAL_PATH, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    return [item["query"] for item in items if item["route"] != "meeting"][:limit]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, timings):
+    return {
+        "pipeline": name,
+        "runs": len(timings),
+        "mean_s": statistics.mean(timings),
+        "p50_s": percentile(timings, 50),
+        "p95_s": percentile(timings, 95),
+    }
+
+
+def run(queries, rounds):
+    timings = {"sequential": [], "async": []}
+    runners = {
+        "sequential": lambda q: agentic_rag_pipeline_sequential(q, use_cache=False),
+        "async": lambda q: asyncio.run(agentic_rag_pipeline_async(q, use_cache=False)),
+    }
+    for _ in range(rounds):
+        for i, query in enumerate(queries):
+            # Alternate order so neither path always runs on a warmer connection
+            order = list(runners) if i % 2 == 0 else list(reversed(runners))
+            for name in order:
+                start = time.perf_counter()
+                runners[name](query)
+                timings[name].append(time.perf_counter() - start)
+    return [summarize(name, values) for name, values in timings.items()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sequential vs async agentic RAG latency")
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+
+    results = run(load_queries(args.queries), args.rounds)
+    print(f"\n{'pipeline':<12}{'runs':>6}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for r in results:
+        print(f"{r['pipeline']:<12}{r['runs']:>6}{r['mean_s']:>9.2f}s{r['p50_s']:>9.2f}s{r['p95_s']:>9.2f}s")
+    baseline, candidate = results
+    print(f"\nAsync speed-up on mean latency: {baseline['mean_s'] / candidate['mean_s']:.2f}x")
@@ -0,0 +1,103 @@
+# benchmarks/vector_backends.py
+#
+# Recall@k and single-query latency of each vector search backend
+# (numpy, flat, hnsw, ivf) on synthetic clustered corpora shaped like
+# MiniLM sentence embeddings. Recall is measured against exact search.
+# No model or API key needed.
+#
+# Run from the project root:
+#   python -m benchmarks.vector_backends [--sizes 15,1000,20000,100000] [--queries N] [--json out.json]
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.app.services.embedding_service import make_vector_index
+from backend.app.services.vector_backends import BACKENDS, select_backend
+
+DIM = 384  # all-MiniLM-L6-v2
+
+
+def synthetic_corpus(n: int, n_queries: int, dim: int = DIM, seed: int = 0):
+    """Unit vectors around ~sqrt(n) topic centres; queries are noisy copies of corpus points."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, int(np.sqrt(n))), dim)).astype(np.float32)
+    corpus = centres[rng.integers(len(centres), size=n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = corpus[rng.integers(n, size=n_queries)] + 0.3 * rng.normal(size=(n_queries, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return corpus, queries
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(corpus, queries, truth, backend: str, k: int):
+    started = time.perf_counter()
+    index, _ = make_vector_index(corpus, backend)
+    build_s = time.perf_counter() - started
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        _, labels = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        hits += len(set(labels[0].tolist()) & set(expected.tolist()))
+    return {
+        "backend": backend,
+        "build_s": build_s,
+        f"recall@{k}": hits / (len(queries) * min(k, len(corpus))),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def run(sizes, n_queries: int, k: int, backends):
+    results = []
+    for n in sizes:
+        corpus, queries = synthetic_corpus(n, n_queries)
+        # Ground truth: exact nearest neighbours (L2 on unit vectors = cosine order)
+        truth = np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+        auto = select_backend(n, "auto")
+        print(f"\n📦 {n} vectors (auto picks: {auto})")
+        for backend in backends:
+            row = {"size": n, "auto": backend == auto, **measure(corpus, queries, truth, backend, k)}
+            results.append(row)
+            print(
+                f"   {backend:<6} recall@{k} {row[f'recall@{k}']:.3f}   "
+                f"p50 {row['p50_ms']:.3f} ms   p95 {row['p95_ms']:.3f} ms   build {row['build_s']:.2f}s"
+                + ("   ← auto" if row["auto"] else "")
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vector search backends on synthetic corpora")
+    parser.add_argument("--sizes", default="15,1000,20000,100000", help="comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=200, help="queries per corpus")
+    parser.add_argument("--k", type=int, default=8, help="neighbours per query")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated backends to compare")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = run(
+        [int(s) for s in args.sizes.split(",")],
+        args.queries,
+        args.k,
+        [b.strip() for b in args.backends.split(",")],
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n[SAVED] 💾 {args.json}")
@@ -2,10 +2,6 @@ import streamlit as st
 import os, json, random, re, tempfile, subprocess, base64, shutil
 from datetime import datetime
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-import fitz
 
 import sys
 import os
@@ -15,13 +11,19 @@ sys.path.append(r"C:\Users\Harsh\Downloads\Q_A_Chatbot_Using_Agentic_RAG_Archite
 
 
 # ===== Backend Imports =====
-from backend.app.services.github_service import fetch_and_analyze_github
-from backend.app.services.llm_service import summarize_project, fix_latex_syntax_with_llm
+from backend.app.services.github_service import sync_github_repos
+from backend.app.services.llm_service import summarize_projects, fix_latex_syntax_with_llm
 from backend.app.services.latex_service import generate_resume_latex
-from backend.app.services.embedding_service import embed_resume_text, embed_project_summaries
+from backend.app.services.embedding_service import (
+    embed_repository_code,
+    embed_resume_text,
+    embed_project_summaries,
+    warm_up_in_background,
+)
 from backend.app.services.qualification_service import verify_and_notify_qualification
 # from backend.app.services.chatbot_service import query_rag_response 
-from backend.app.services.agentic_rag_service import agentic_rag_pipeline
+from backend.app.services.agentic_rag_service import agentic_rag_pipeline_stream
+from backend.app.services.groq_pool import get_llm
 
 # ===== Setup =====
 load_dotenv()
@@ -31,13 +33,9 @@ EMBED_DIR = os.path.join(DATA_DIR, "embeddings")
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(EMBED_DIR, exist_ok=True)
 
-
-
-API_KEYS = [os.getenv(f"GROQ_API_KEY_{i}") for i in range(1, 6)]
-
-def get_random_llm():
-    key = random.choice([k for k in API_KEYS if k])
-    return ChatGroq(api_key=key, model="openai/gpt-oss-120b", temperature=0.7)
+# Load the shared embedding model once per process instead of on the first chat turn,
+# off the main thread so the page renders while torch loads
+warm_up_in_background()
 
 def load_user_data():
     if os.path.exists(USER_DATA_PATH):
@@ -49,6 +47,19 @@ def save_user_data(data):
     with open(USER_DATA_PATH, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def stream_phase(events, phase, pending):
+    """
+    Yields the text of `phase` events from the pipeline stream.
+    Stops at the first event of another phase and leaves it in `pending`.
+    """
+    if pending and pending[0][0] == phase:
+        yield pending.pop()[1]
+    for kind, text in events:
+        if kind != phase:
+            pending.append((kind, text))
+            return
+        yield text
+
 # ===== Streamlit UI =====
 st.set_page_config(page_title="Agentic Resume Chatbot", layout="wide")
 st.title("🤖 Agentic Resume RAG Builder + Chatbot")
@@ -57,7 +68,7 @@ if "user_data" not in st.session_state:
     st.session_state["user_data"] = load_user_data()
 
 user_data = st.session_state["user_data"]
-llm = get_random_llm()
+llm = get_llm()
 
 # ==========================================================
 # 🔹 SECTION SELECTOR
@@ -97,6 +108,7 @@ if page == "📄 Resume & Project Builder":
         st.success(f"✅ Uploaded {uploaded.name}")
 
         with st.spinner("🔍 Extracting text from resume..."):
+            import fitz  # PyMuPDF, only needed once a resume is uploaded
             pdf_doc = fitz.open(save_path)
             pdf_text = "".join(page.get_text("text") for page in pdf_doc)
             pdf_doc.close()
@@ -117,7 +129,12 @@ if page == "📄 Resume & Project Builder":
         st.session_state["user_data"] = user_data
         st.success("✅ Resume extracted and saved!")
 
-        verify_and_notify_qualification(parsed_data, cgpa, skill, llm)
+        with st.spinner("🤖 Checking qualifications using AI..."):
+            result = verify_and_notify_qualification(
+                parsed_data, cgpa, skill, llm, on_message=lambda level, text: getattr(st, level)(text)
+            )
+        if result is not None:
+            st.session_state["user_data"] = load_user_data()
 
         with st.expander("🧾 Extracted Data"):
             st.json(parsed_data)
@@ -147,22 +164,35 @@ if page == "📄 Resume & Project Builder":
         else:
             with st.spinner("📥 Fetching repositories..."):
                 try:
-                    repos = fetch_and_analyze_github(uname)
+                    sync = sync_github_repos(uname)
                 except Exception as e:
                     st.error(f"❌ GitHub fetch failed: {e}")
-                    repos = []
+                    sync = {"repos": [], "changed": []}
+                repos, changed = sync["repos"], sync["changed"]
 
             if repos:
-                st.success(f"✅ Retrieved {len(repos)} repositories!")
-                with st.spinner("🧠 Summarizing via LLM..."):
-                    summaries = []
-                    for r in repos:
-                        try:
-                            summaries.append(summarize_project(r, user_data.get("role", "")))
-                        except Exception as e:
-                            st.warning(f"⚠️ Skipped one repo: {e}")
-                    st.session_state["summaries"] = summaries
-                    st.success(f"✅ Summarized {len(summaries)} projects!")
+                st.success(f"✅ Retrieved {len(repos)} repositories ({len(changed)} changed)!")
+                progress = st.progress(0.0, text="🧠 Summarizing via LLM...")
+
+                def report(done, total, repo_name, error):
+                    if error is not None:
+                        st.warning(f"⚠️ Skipped '{repo_name}': {error}")
+                    progress.progress(done / total, text=f"🧠 Summarized {done}/{total} — {repo_name}")
+
+                # Only repos whose head SHA moved reach the LLM
+                summaries = summarize_projects(repos, user_data.get("role", ""), on_progress=report)
+                st.session_state["summaries"] = summaries
+                st.success(f"✅ Summarized {len(summaries)} projects!")
+
+                # Always synced: a summary can be regenerated without its repo
+                # moving (new role); unchanged documents are not re-embedded
+                with st.spinner("📚 Generating project embeddings..."):
+                    try:
+                        path = embed_project_summaries(summaries)
+                        embed_repository_code(repos)
+                        st.success(f"✅ Project embeddings saved at {path}")
+                    except Exception as e:
+                        st.error(f"❌ Failed to embed project summaries: {e}")
 
                 with st.expander("🧩 Project Summaries"):
                     st.json(summaries)
@@ -183,6 +213,17 @@ elif page == "💬 RAG Chatbot":
             st.markdown(user_query)
 
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                answer = agentic_rag_pipeline(user_query)
-                st.markdown(answer)
+            events = agentic_rag_pipeline_stream(user_query)
+            pending = []
+            # Routing and retrieval run before the first token; show they're underway
+            with st.spinner("🔍 Searching your resume and projects..."):
+                first = next(events, None)
+            if first is not None:
+                pending.append(first)
+            st.write_stream(stream_phase(events, "answer", pending))
+
+            # Grading failed: the revised answer follows as its own stream
+            if pending:
+                st.markdown("---")
+                st.caption("🔁 The first answer didn't pass review — revised answer:")
+                st.write_stream(stream_phase(events, "revision", pending))
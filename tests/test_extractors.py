@@ -0,0 +1,91 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from app.utils.extractors import extract_resume_fields  # noqa: E402
+
+
+def extract(text):
+    return extract_resume_fields(text)
+
+
+def test_single_email_is_settled():
+    result = extract("Contact: Jane.Doe@example.com")
+    assert result["fields"]["email_id"] == "jane.doe@example.com"
+    assert "email_id" not in result["unresolved"]
+
+
+def test_gmail_is_preferred_over_other_emails():
+    result = extract("jane@college.edu | jane.doe@gmail.com")
+    assert result["fields"]["email_id"] == "jane.doe@gmail.com"
+
+
+def test_several_non_gmail_emails_are_unresolved():
+    result = extract("jane@college.edu, jane@work.io")
+    assert result["unresolved"]["email_id"] == ["jane@college.edu", "jane@work.io"]
+
+
+def test_missing_email_is_unresolved_without_candidates():
+    assert extract("No contact details here")["unresolved"]["email_id"] == []
+
+
+def test_phone_with_country_code():
+    result = extract("Phone: +91 98765 43210")
+    assert result["fields"]["phone_number"] == "+91 98765 43210"
+
+
+def test_dates_and_short_numbers_are_not_phones():
+    result = extract("2021 - 2025, Roll No 123456")
+    assert result["unresolved"]["phone_number"] == []
+
+
+def test_profile_urls_are_normalized():
+    result = extract("linkedin.com/in/jane-doe/ github.com/janedoe")
+    assert result["fields"]["linkedin"] == "https://linkedin.com/in/jane-doe"
+    assert result["fields"]["github"] == "https://github.com/janedoe"
+
+
+def test_other_links_exclude_linkedin_and_github():
+    result = extract("https://github.com/janedoe https://janedoe.dev www.blog.janedoe.dev")
+    assert result["fields"]["other_links"] == ["https://janedoe.dev", "https://www.blog.janedoe.dev"]
+
+
+def test_undergraduate_cgpa_is_settled():
+    result = extract("B.Tech in Computer Science, 2021 - 2025\nCGPA: 8.7/10")
+    assert result["fields"]["ug_cgpa"] == 8.7
+
+
+def test_cgpa_without_degree_is_settled():
+    assert extract("CGPA 9.1")["fields"]["ug_cgpa"] == 9.1
+
+
+def test_lone_postgraduate_cgpa_goes_to_llm():
+    result = extract("M.Tech in Data Science, IIT Delhi — CGPA 8.9")
+    assert "ug_cgpa" not in result["fields"]
+    assert result["unresolved"]["ug_cgpa"] == [8.9]
+
+
+def test_postgraduate_degree_on_previous_line_goes_to_llm():
+    result = extract("Master of Science, Computer Science\nGPA: 9.0")
+    assert result["unresolved"]["ug_cgpa"] == [9.0]
+
+
+def test_undergraduate_line_below_postgraduate_one_is_settled():
+    result = extract("MBA (pursuing)\nB.E. Mechanical, 2019\nCGPA: 7.8")
+    assert result["fields"]["ug_cgpa"] == 7.8
+
+
+def test_four_point_gpa_goes_to_llm():
+    result = extract("Bachelor of Science, 2022\nGPA: 3.8/4.0")
+    assert "ug_cgpa" not in result["fields"]
+    assert result["unresolved"]["ug_cgpa"] == [3.8]
+
+
+def test_several_gpas_go_to_llm():
+    result = extract("B.Tech CGPA 8.2\nM.Tech CGPA 9.0")
+    assert result["unresolved"]["ug_cgpa"] == [8.2, 9.0]
+
+
+def test_out_of_range_gpa_is_ignored():
+    assert extract("GPA 42")["unresolved"]["ug_cgpa"] == []